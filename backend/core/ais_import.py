@@ -0,0 +1,180 @@
+import csv
+import json
+import os
+from datetime import datetime, timezone as dt_timezone
+
+from core import nmea
+
+# -------------------------
+# HISTORICAL AIS FILE PARSING
+# -------------------------
+# Runs inside the import_ais process pool, so nothing here touches Django.
+# Files are cut into chunks of whole lines by `read_chunks`; a chunk never
+# ends in the middle of a multi-sentence NMEA message.
+
+CSV_COLUMNS = {
+    "mmsi": ("mmsi",),
+    "timestamp": ("basedatetime", "timestamp", "time", "datetime", "base_date_time"),
+    "lat": ("lat", "latitude"),
+    "lon": ("lon", "long", "longitude"),
+    "speed": ("sog", "speed"),
+    "course": ("cog", "course"),
+    "name": ("vesselname", "vessel_name", "shipname", "name"),
+}
+
+
+def detect_format(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                return "nmea" if "!AIVD" in line else "csv"
+    return "csv"
+
+
+def _resolve_header(header_line):
+    header = [h.strip().lower() for h in next(csv.reader([header_line]))]
+    columns = {}
+    for key, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in header:
+                columns[key] = header.index(alias)
+                break
+    missing = {"mmsi", "timestamp", "lat", "lon"} - set(columns)
+    if missing:
+        raise ValueError(f"CSV header is missing required columns: {', '.join(sorted(missing))}")
+    return columns
+
+
+def read_chunks(path, fmt, start_offset=0, lines_per_chunk=50000):
+    """
+    Yields (end_offset, header, lines) chunks starting at `start_offset`.
+    For CSV the header line is always read from the top of the file and
+    passed along with every chunk.
+    """
+    with open(path, "rb") as fh:
+        header = None
+        if fmt == "csv":
+            header = fh.readline().decode("utf-8", errors="replace")
+            start_offset = max(start_offset, fh.tell())
+        fh.seek(start_offset)
+
+        lines = []
+        for raw in iter(fh.readline, b""):
+            line = raw.decode("utf-8", errors="replace")
+            lines.append(line)
+            if len(lines) >= lines_per_chunk and (fmt != "nmea" or nmea.is_final_fragment(line.strip())):
+                yield fh.tell(), header, lines
+                lines = []
+        if lines:
+            yield fh.tell(), header, lines
+
+
+def _float(value):
+    try:
+        return float(value) if value not in ("", None) else None
+    except ValueError:
+        return None
+
+
+def _epoch(value):
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=dt_timezone.utc)
+        return moment.timestamp()
+
+
+def parse_csv_lines(header, lines):
+    columns = _resolve_header(header)
+    positions, names, rejected = [], {}, 0
+    for row in csv.reader(lines):
+        try:
+            mmsi = int(row[columns["mmsi"]])
+            ts = _epoch(row[columns["timestamp"]])
+            lat = float(row[columns["lat"]])
+            lon = float(row[columns["lon"]])
+        except (ValueError, IndexError):
+            rejected += 1
+            continue
+        if abs(lat) > 90 or abs(lon) > 180:
+            rejected += 1
+            continue
+        speed = _float(row[columns["speed"]]) if "speed" in columns else None
+        course = _float(row[columns["course"]]) if "course" in columns else None
+        positions.append((mmsi, ts, lat, lon, speed, course))
+        if "name" in columns and row[columns["name"]].strip():
+            names[mmsi] = row[columns["name"]].strip()
+    return positions, names, rejected
+
+
+def parse_nmea_lines(lines, assume_time=None):
+    reassembler = nmea.Reassembler()
+    positions, names, rejected = [], {}, 0
+    last_ts = assume_time
+    for line in lines:
+        ts, sentence = nmea.split_line(line)
+        parsed = nmea.parse_sentence(sentence)
+        if parsed is None:
+            if line.strip():
+                rejected += 1
+            continue
+        if ts is not None:
+            last_ts = ts
+        complete = reassembler.feed(parsed)
+        if complete is None:
+            continue
+        message = nmea.decode(*complete)
+        if message is None:
+            continue
+        if message["kind"] == "static":
+            if message["name"]:
+                names[message["mmsi"]] = message["name"]
+        elif last_ts is None:
+            rejected += 1  # no timestamp for this report
+        else:
+            positions.append((message["mmsi"], last_ts, message["lat"], message["lon"],
+                              message["speed"], message["course"]))
+    return positions, names, rejected
+
+
+def parse_chunk(fmt, header, lines, assume_time=None):
+    """Process-pool entry point: returns (positions, names, rejected)."""
+    if fmt == "csv":
+        return parse_csv_lines(header, lines)
+    return parse_nmea_lines(lines, assume_time)
+
+
+# -------------------------
+# CHECKPOINTS
+# -------------------------
+
+def checkpoint_path(path):
+    return f"{path}.import-checkpoint.json"
+
+
+def load_checkpoint(path):
+    """
+    Returns the saved state if it belongs to this exact file (same size
+    and mtime), otherwise None.
+    """
+    try:
+        with open(checkpoint_path(path)) as fh:
+            state = json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return None
+    stat = os.stat(path)
+    if state.get("size") != stat.st_size or state.get("mtime") != stat.st_mtime:
+        return None
+    return state
+
+
+def save_checkpoint(path, offset, rows):
+    stat = os.stat(path)
+    tmp = checkpoint_path(path) + ".tmp"
+    with open(tmp, "w") as fh:
+        json.dump({"size": stat.st_size, "mtime": stat.st_mtime, "offset": offset, "rows": rows}, fh)
+    os.replace(tmp, checkpoint_path(path))
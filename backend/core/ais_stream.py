@@ -7,6 +7,8 @@ import django
 from asgiref.sync import sync_to_async
 from django.utils import timezone
 from core.models import Vessel, VoyageTrack 
+from core.rollups import record_track_points
+from core import dashboard, metrics
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
 django.setup()
@@ -44,7 +46,7 @@ def update_vessel_in_db(mmsi, ship_name, lat, lon, speed, course):
             vessel.save()
 
         
-        VoyageTrack.objects.create(
+        track = VoyageTrack.objects.create(
             vessel=vessel,
             latitude=lat,
             longitude=lon,
@@ -52,11 +54,15 @@ def update_vessel_in_db(mmsi, ship_name, lat, lon, speed, course):
             course=course,
             timestamp=timezone.now()
         )
+        record_track_points([(vessel.id, track.timestamp, lat, lon, speed, course)])
+        metrics.inc("ingest_positions_total", source="stream")
+        dashboard.maybe_refresh()
 
         return True
 
     except Exception as e:
         print(f"❌ DB Error for MMSI {mmsi}: {e}")
+        metrics.inc("ingest_errors_total", source="stream")
         return False
 
 
@@ -90,6 +96,7 @@ async def connect_ais_stream():
 
                
                 if not mmsi or lat is None or lon is None:
+                    metrics.inc("ingest_rejected_total", source="stream")
                     continue
 
                 await update_vessel_in_db(
@@ -0,0 +1,489 @@
+import hashlib
+import re
+import threading
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Avg, Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import AlertDailyStats, Notification, Port
+from core.search import reset_memory_index
+
+# -------------------------
+# ALERT FIELDS
+# -------------------------
+# Notifications carry their severity, category, port and wait time as
+# indexed columns, set when the alert is written. Writers that know these
+# values (UNCTAD loader, event detectors) pass them to build_alert() or
+# raise_alert(); any other ORM write has them derived from the message by
+# the receiver below, and `backfill_alerts` does the same for rows written
+# before the columns.
+
+SEVERITIES = ["critical", "warning", "info"]
+
+CATEGORIES = {
+    "Congestion Alert": "congestion",
+    "Alert": "vessel_event",
+}
+DEFAULT_CATEGORY = "general"
+
+_WAIT_RE = re.compile(r"Wait time (\d+\.?\d*)h")
+_PORT_RE = re.compile(r"CRITICAL: (.*?) congestion")
+
+
+def classify(message):
+    """Severity from the message text (the rule the alerts view used to apply per row)."""
+    upper = (message or "").upper()
+    if "CRITICAL" in upper or "SOS" in upper:
+        return "critical"
+    if "INFO" in upper:
+        return "info"
+    return "warning"
+
+
+def category_of(notification_type):
+    return CATEGORIES.get(notification_type, DEFAULT_CATEGORY)
+
+
+def parse_message(message, port_ids=None):
+    """
+    (port_id, wait_hours) found in a legacy message. `port_ids` maps port
+    name -> id; it is loaded when not given.
+    """
+    message = message or ""
+    wait = _WAIT_RE.search(message)
+    port = _PORT_RE.search(message)
+    port_id = None
+    if port:
+        if port_ids is None:
+            port_id = Port.objects.filter(name=port.group(1)).values_list("id", flat=True).first()
+        else:
+            port_id = port_ids.get(port.group(1))
+    return port_id, float(wait.group(1)) if wait else None
+
+
+def build_alert(message, type, severity=None, port=None, wait_hours=None, **fields):
+    """
+    An unsaved Notification with its structured fields filled in.
+    Extra keyword arguments (user, vessel, event, timestamp, ...) are
+    passed to the model.
+    """
+    notification = Notification(
+        message=message,
+        type=type,
+        severity=severity or classify(message),
+        category=category_of(type),
+        port=port,
+        wait_hours=wait_hours,
+        **fields,
+    )
+    if port is not None and not notification.region_id:
+        notification.region_id = port.region_id
+    return notification
+
+
+@receiver(pre_save, sender=Notification)
+def _fill_alert_fields(sender, instance, raw=False, **kwargs):
+    if raw or instance.severity:
+        return
+    instance.severity = classify(instance.message)
+    instance.category = category_of(instance.type)
+    if instance.port_id is None and instance.wait_hours is None:
+        instance.port_id, instance.wait_hours = parse_message(instance.message)
+
+
+# -------------------------
+# DEDUPLICATION
+# -------------------------
+# raise_alert() writes an alert unless one with the same (category,
+# subject, severity) was raised within the category's suppression window
+# (ALERT_SUPPRESSION_MINUTES); a repeat bumps `occurrences` and `last_seen`
+# on that alert instead of adding a row. Windows run from the first
+# occurrence, so a condition that persists is raised again once per window.
+#
+# Alerts are raised by every web worker and by the job workers, so the
+# table decides: the open alert for a key is looked up by (subject,
+# timestamp) under a per-key advisory lock (PostgreSQL), and two processes
+# cannot both insert it. Each process caches the alerts it has seen, so a
+# repeat it already knows costs one UPDATE; an entry whose alert has since
+# been resolved or deleted matches no row and falls back to the lookup.
+
+_recent = {}
+_recent_lock = threading.Lock()
+_PRUNE_AT = 10_000
+_DEDUP_LOCK = 0x616C7274  # "alrt"
+
+
+def subject_of(notification):
+    """What an alert is about: its port, else its vessel, else its text."""
+    if notification.port_id is not None:
+        return f"port:{notification.port_id}"
+    if notification.vessel_id is not None:
+        return f"vessel:{notification.vessel_id}"
+    return "text:" + hashlib.sha1((notification.message or "").encode()).hexdigest()
+
+
+def _window(category):
+    minutes = settings.ALERT_SUPPRESSION_MINUTES.get(category, 0)
+    return timedelta(minutes=minutes) if minutes > 0 else None
+
+
+def _lock_keys(keys):
+    """Transaction-scoped advisory locks on dedup keys, taken in a fixed order."""
+    if connection.vendor != "postgresql" or not keys:
+        return
+    names = sorted({"|".join(key) for key in keys})
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(%s, hashtext(name)) FROM unnest(%s::text[]) AS name ORDER BY name",
+            [_DEDUP_LOCK, names],
+        )
+
+
+def _open_alerts(keys, now):
+    """key -> (id, first seen) of the newest unresolved alert in each key's open window."""
+    longest = max(_window(key[0]) for key in keys)
+    rows = (
+        Notification.objects.filter(subject__in={key[1] for key in keys}, timestamp__gte=now - longest)
+        .exclude(status="resolved").order_by("timestamp")
+        .values_list("id", "category", "subject", "severity", "timestamp")
+    )
+    found = {}
+    for pk, category, subject, severity, moment in rows:
+        key = (category, subject, severity)
+        if key in keys and now - moment < _window(category):
+            found[key] = (pk, moment)
+    return found
+
+
+def _prune(now):
+    for key, (_, moment) in list(_recent.items()):
+        window = _window(key[0])
+        if window is None or now - moment >= window:
+            del _recent[key]
+
+
+def reset_recent_alerts():
+    """Drops this process's cache of open alerts."""
+    with _recent_lock:
+        _recent.clear()
+
+
+def _bump(pks, count, now):
+    return Notification.objects.filter(pk__in=pks).exclude(status="resolved").update(
+        occurrences=F("occurrences") + count, last_seen=now
+    )
+
+
+def raise_alert(message, type, subject=None, **fields):
+    """
+    Writes an alert built by build_alert() unless it repeats a recent one.
+    `subject` names what the alert is about (defaults to subject_of()).
+    Returns the new Notification, or None when it was folded into an
+    existing alert.
+    """
+    notification = build_alert(message, type, **fields)
+    notification.subject = subject or subject_of(notification)
+    window = _window(notification.category)
+    if window is None:
+        notification.save()
+        return notification
+
+    key = (notification.category, notification.subject, notification.severity)
+    now = timezone.now()
+    with _recent_lock:
+        entry = _recent.get(key)
+        if entry is not None and now - entry[1] < window and _bump([entry[0]], 1, now):
+            return None
+        with transaction.atomic():
+            _lock_keys([key])
+            entry = _open_alerts({key}, now).get(key)
+            if entry is not None and _bump([entry[0]], 1, now):
+                _recent[key] = entry
+                return None
+            notification.save()
+        _recent[key] = (notification.pk, notification.timestamp)
+        if len(_recent) > _PRUNE_AT:
+            _prune(now)
+    return notification
+
+
+def raise_alerts(notifications):
+    """
+    raise_alert() for many alerts built by build_alert(). Repeats, within
+    the batch or of open alerts, are counted in one UPDATE per distinct
+    count and the rest inserted with one bulk_create. Save receivers do not
+    run; the stats rollup and search index are updated here instead.
+    Returns (inserted Notifications, number folded into other alerts).
+    """
+    now = timezone.now()
+    groups = {}
+    for n in notifications:
+        n.subject = n.subject or subject_of(n)
+        key = (n.category, n.subject, n.severity) if _window(n.category) else id(n)
+        if key in groups:
+            groups[key][1] += 1
+        else:
+            groups[key] = [n, 1]
+    keys = {key for key in groups if isinstance(key, tuple)}
+
+    with _recent_lock, transaction.atomic():
+        _lock_keys(keys)
+        open_alerts = _open_alerts(keys, now) if keys else {}
+        by_count = defaultdict(list)
+        for key, (pk, _) in open_alerts.items():
+            by_count[groups[key][1]].append(pk)
+        for count, pks in by_count.items():
+            _bump(pks, count, now)
+
+        rows = []
+        for key, (n, count) in groups.items():
+            if key in open_alerts:
+                continue
+            n.occurrences = count
+            if count > 1:
+                n.last_seen = now
+            rows.append(n)
+        created = Notification.objects.bulk_create(rows, batch_size=1000)
+
+        _recent.update(open_alerts)
+        for n in created:
+            if n.pk is not None and _window(n.category):
+                _recent[(n.category, n.subject, n.severity)] = (n.pk, n.timestamp)
+        if len(_recent) > _PRUNE_AT:
+            _prune(now)
+
+    if created:
+        apply_alerts(created)
+        transaction.on_commit(reset_memory_index)
+    return created, len(notifications) - len(created)
+
+
+# -------------------------
+# LIFECYCLE
+# -------------------------
+# Alerts move new -> acknowledged -> resolved. set_status() changes any
+# number of alerts in one UPDATE and stamps status_changed_at, which is the
+# change feed streamed to clients (status_changes()).
+
+STATUSES = ["new", "acknowledged", "resolved"]
+MAX_STATUS_BATCH = 1000
+
+
+def set_status(ids, status):
+    """Moves the alerts in `ids` to `status`. Returns the number changed."""
+    if status not in STATUSES:
+        raise ValueError(f"Unknown status '{status}'")
+    changed = (
+        Notification.objects.filter(id__in=ids).exclude(status=status)
+        .update(status=status, status_changed_at=timezone.now())
+    )
+    if changed:
+        _bump_version()
+    return changed
+
+
+def status_changes(after, limit=500):
+    """
+    Status changes after the (moment, id) position `after`, oldest first,
+    grouped into {"status", "changed_at", "ids"} batches. Returns
+    (batches, position of the last change or `after`).
+    """
+    moment, pk = after
+    rows = (
+        Notification.objects.filter(Q(status_changed_at__gt=moment) | Q(status_changed_at=moment, id__gt=pk))
+        .order_by("status_changed_at", "id")
+        .values_list("id", "status", "status_changed_at")[:limit]
+    )
+    batches = []
+    for pk, status, changed_at in rows:
+        if batches and batches[-1]["status"] == status and batches[-1]["changed_at"] == changed_at:
+            batches[-1]["ids"].append(pk)
+        else:
+            batches.append({"status": status, "changed_at": changed_at, "ids": [pk]})
+        after = (changed_at, pk)
+    return batches, after
+
+
+# -------------------------
+# ALERT STATISTICS
+# -------------------------
+# AlertDailyStats counts notifications per (day, region, severity, port)
+# and is kept current by the receivers below, so totals and insights for
+# the unsearched alert list are sums over a few small rows. Results are
+# cached per filter; every write bumps a version that is part of the cache
+# key, so the writing process never serves stale stats and other workers
+# catch up within ALERT_STATS_CACHE_SECONDS.
+
+SEVERITY_FILTERS = {
+    "critical": Q(severity="critical"),
+    # "warning" keeps its old meaning of everything that is not critical,
+    # including rows whose severity has not been backfilled yet (NULL)
+    "warning": ~Q(severity="critical"),
+}
+
+_VERSION_KEY = "alerts:stats:version"
+
+_UPSERT_SQL = f"""
+    INSERT INTO {AlertDailyStats._meta.db_table} (
+        date, region_id, severity, port_id, count, wait_sum, wait_count
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (date, region_id, severity, port_id) DO UPDATE SET
+        count = {AlertDailyStats._meta.db_table}.count + excluded.count,
+        wait_sum = {AlertDailyStats._meta.db_table}.wait_sum + excluded.wait_sum,
+        wait_count = {AlertDailyStats._meta.db_table}.wait_count + excluded.wait_count
+"""
+
+
+def _bump_version():
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.set(_VERSION_KEY, 1, None)
+
+
+def apply_alerts(notifications, sign=1):
+    """Adds (sign=1) or removes (sign=-1) notifications from the daily rollup."""
+    deltas = defaultdict(lambda: [0, 0.0, 0])
+    for n in notifications:
+        key = (
+            n.timestamp.astimezone(dt_timezone.utc).date(), n.region_id or 0, n.severity or "", n.port_id or 0,
+        )
+        acc = deltas[key]
+        acc[0] += sign
+        if n.wait_hours is not None:
+            acc[1] += sign * n.wait_hours
+            acc[2] += sign
+    if deltas:
+        with connection.cursor() as cursor:
+            cursor.executemany(_UPSERT_SQL, [(*key, *acc) for key, acc in deltas.items()])
+        _bump_version()
+    return len(deltas)
+
+
+@receiver(post_save, sender=Notification)
+def _alert_saved(sender, instance, created=False, raw=False, **kwargs):
+    # Only inserts change the counters; alert fields are fixed once written
+    if created and not raw:
+        apply_alerts([instance])
+
+
+@receiver(post_delete, sender=Notification)
+def _alert_deleted(sender, instance, **kwargs):
+    apply_alerts([instance], sign=-1)
+
+
+def rebuild_alert_stats():
+    """Recomputes the rollup from notifications. Returns the number of rows written."""
+    grouped = (
+        Notification.objects.annotate(day=TruncDate("timestamp", tzinfo=dt_timezone.utc))
+        .values("day", "region_id", "severity", "port_id")
+        .annotate(count=Count("id"), wait_sum=Sum("wait_hours"), wait_count=Count("wait_hours"))
+    )
+    rows = [
+        AlertDailyStats(
+            date=row["day"],
+            region_id=row["region_id"] or 0,
+            severity=row["severity"] or "",
+            port_id=row["port_id"] or 0,
+            count=row["count"],
+            wait_sum=row["wait_sum"] or 0,
+            wait_count=row["wait_count"],
+        )
+        for row in grouped.iterator()
+    ]
+    with transaction.atomic():
+        AlertDailyStats.objects.all().delete()
+        AlertDailyStats.objects.bulk_create(rows, batch_size=5000)
+    _bump_version()
+    return len(rows)
+
+
+def _worst_port(port_counts):
+    """Name of the port with the most alerts, without its "Port of " prefix."""
+    port_counts = [(port_id, count) for port_id, count in port_counts if port_id]
+    if not port_counts:
+        return "None"
+    port_id = max(port_counts, key=lambda pc: pc[1])[0]
+    name = Port.objects.filter(pk=port_id).values_list("name", flat=True).first()
+    return name.removeprefix("Port of ") if name else "None"
+
+
+def _rollup_stats(severity_q, region_id, since):
+    stats = AlertDailyStats.objects.all()
+    if region_id is not None:
+        stats = stats.filter(region_id=region_id)
+    if severity_q is not None:
+        stats = stats.filter(severity_q)
+
+    totals = stats.aggregate(
+        total=Sum("count"),
+        critical=Sum("count", filter=Q(severity="critical")),
+        warning=Sum("count", filter=SEVERITY_FILTERS["warning"]),
+        wait_sum=Sum("wait_sum", filter=Q(date__gte=since)),
+        wait_count=Sum("wait_count", filter=Q(date__gte=since)),
+    )
+    recent_ports = (
+        stats.filter(date__gte=since).exclude(port_id=0)
+        .values("port_id").annotate(n=Sum("count")).values_list("port_id", "n")
+    )
+    wait_count = totals["wait_count"] or 0
+    return {
+        "critical": totals["critical"] or 0,
+        "warning": totals["warning"] or 0,
+        "avg_wait": round(totals["wait_sum"] / wait_count, 1) if wait_count else 0,
+        "worst_port": _worst_port(recent_ports),
+        "total": totals["total"] or 0,
+    }
+
+
+def _search_stats(notifications, since):
+    """Same figures for a searched or status-filtered list, in one conditional aggregate."""
+    totals = notifications.aggregate(
+        total=Count("id"),
+        critical=Count("id", filter=Q(severity="critical")),
+        warning=Count("id", filter=SEVERITY_FILTERS["warning"]),
+        avg_wait=Avg("wait_hours", filter=Q(timestamp__gte=since)),
+    )
+    recent_ports = (
+        notifications.filter(timestamp__gte=since, port__isnull=False).order_by()
+        .values("port_id").annotate(n=Count("id")).values_list("port_id", "n")
+    )
+    return {
+        "critical": totals["critical"],
+        "warning": totals["warning"],
+        "avg_wait": round(totals["avg_wait"], 1) if totals["avg_wait"] is not None else 0,
+        "worst_port": _worst_port(recent_ports) if totals["total"] else "None",
+        "total": totals["total"],
+    }
+
+
+def alert_stats(notifications, search="", severity="all", region_id=None, status="all"):
+    """
+    Counters and insights for a filtered alert list: critical, warning,
+    total, plus average wait and worst port over the last
+    ALERT_INSIGHT_DAYS days. `notifications` is the filtered queryset and
+    is only queried when `search` or `status` is set (the rollup does not
+    track status); cached per filter.
+    """
+    version = cache.get_or_set(_VERSION_KEY, 1, None)
+    digest = hashlib.sha1(f"{search}|{severity}|{region_id}|{status}".encode()).hexdigest()
+    key = f"alerts:stats:{version}:{digest}"
+    stats = cache.get(key)
+    if stats is not None:
+        return stats
+
+    since = timezone.now() - timedelta(days=settings.ALERT_INSIGHT_DAYS)
+    if search or status != "all":
+        stats = _search_stats(notifications, since)
+    else:
+        stats = _rollup_stats(SEVERITY_FILTERS.get(severity), region_id, since.date())
+    cache.set(key, stats, settings.ALERT_STATS_CACHE_SECONDS)
+    return stats
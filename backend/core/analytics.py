@@ -0,0 +1,326 @@
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import FleetComposition, FlowDailyStats, Port, Vessel, Voyage, VoyageDailyStats
+
+# -------------------------
+# ANALYTICS ROLLUPS
+# -------------------------
+# VoyageDailyStats holds one row per (arrival date, vessel type, region),
+# so any `days` window of the analyst dashboard sums at most a few rows per
+# day. Single voyage writes through the ORM are applied by the signal
+# receivers below; bulk loaders call apply_voyages() themselves, and
+# `rebuild_analytics` recomputes everything from voyages.
+#
+# Removals subtract the destination port's current wait time, so wait sums
+# drift slightly when port waits change; the nightly rebuild corrects it.
+#
+# FlowDailyStats is the trade-lane (origin-destination) counterpart, keyed by
+# departure date, port pair and vessel type, and maintained by the same
+# paths. Matrices built from it are cached for ANALYTICS_FLOWS_CACHE_SECONDS.
+#
+# FleetComposition (vessels per type/cargo) changes slowly and is rebuilt
+# with one GROUP BY at most every ANALYTICS_FLEET_MAX_AGE seconds.
+
+_UPSERT_SQL = f"""
+    INSERT INTO {VoyageDailyStats._meta.db_table} (
+        date, vessel_type, region_id, arrivals, in_transit, wait_sum, wait_count
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (date, vessel_type, region_id) DO UPDATE SET
+        arrivals = {VoyageDailyStats._meta.db_table}.arrivals + excluded.arrivals,
+        in_transit = {VoyageDailyStats._meta.db_table}.in_transit + excluded.in_transit,
+        wait_sum = {VoyageDailyStats._meta.db_table}.wait_sum + excluded.wait_sum,
+        wait_count = {VoyageDailyStats._meta.db_table}.wait_count + excluded.wait_count
+"""
+
+_FLOW_UPSERT_SQL = f"""
+    INSERT INTO {FlowDailyStats._meta.db_table} (
+        date, port_from, port_to, vessel_type, voyages, transit_hours_sum, transit_count
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (date, port_from, port_to, vessel_type) DO UPDATE SET
+        voyages = {FlowDailyStats._meta.db_table}.voyages + excluded.voyages,
+        transit_hours_sum = {FlowDailyStats._meta.db_table}.transit_hours_sum + excluded.transit_hours_sum,
+        transit_count = {FlowDailyStats._meta.db_table}.transit_count + excluded.transit_count
+"""
+
+
+def _region_of(voyage):
+    """Voyages are counted under their destination region."""
+    return voyage.region_to
+
+
+def _utc_date(moment):
+    return moment.astimezone(dt_timezone.utc).date()
+
+
+def _apply_flows(voyages, vessel_types, sign):
+    """Flow rollup deltas for voyages with a departure time and both ports."""
+    deltas = defaultdict(lambda: [0, 0.0, 0])
+    for voyage in voyages:
+        if voyage.departure_time is None or not voyage.port_from_id or not voyage.port_to_id:
+            continue
+        key = (
+            _utc_date(voyage.departure_time), voyage.port_from_id, voyage.port_to_id,
+            vessel_types.get(voyage.vessel_id, ""),
+        )
+        acc = deltas[key]
+        acc[0] += sign
+        if voyage.arrival_time is not None:
+            acc[1] += sign * (voyage.arrival_time - voyage.departure_time).total_seconds() / 3600
+            acc[2] += sign
+    if deltas:
+        with connection.cursor() as cursor:
+            cursor.executemany(_FLOW_UPSERT_SQL, [(*key, *acc) for key, acc in deltas.items()])
+
+
+def apply_voyages(voyages, sign=1):
+    """
+    Adds (sign=1) or removes (sign=-1) the contribution of `voyages` to the
+    daily and flow rollups. Voyages without an arrival time are not counted
+    in the daily rollup; voyages without a departure time or either port
+    are not counted as flows.
+    """
+    voyages = list(voyages)
+    if not voyages:
+        return 0
+
+    vessel_types = dict(
+        Vessel.objects.filter(id__in={v.vessel_id for v in voyages if v.vessel_id}).values_list("id", "type")
+    )
+    _apply_flows(voyages, vessel_types, sign)
+
+    voyages = [v for v in voyages if v.arrival_time is not None]
+    if not voyages:
+        return 0
+    waits = dict(
+        Port.objects.filter(id__in={v.port_to_id for v in voyages if v.port_to_id}).values_list("id", "avg_wait_time")
+    )
+
+    deltas = defaultdict(lambda: [0, 0, 0.0, 0])
+    for voyage in voyages:
+        day = _utc_date(voyage.arrival_time)
+        key = (day, vessel_types.get(voyage.vessel_id, ""), _region_of(voyage))
+        acc = deltas[key]
+        acc[0] += sign
+        if voyage.status == "In Transit":
+            acc[1] += sign
+        wait = waits.get(voyage.port_to_id)
+        if wait is not None:
+            acc[2] += sign * wait
+            acc[3] += sign
+
+    with connection.cursor() as cursor:
+        cursor.executemany(_UPSERT_SQL, [(*key, *acc) for key, acc in deltas.items()])
+    return len(deltas)
+
+
+@receiver(pre_save, sender=Voyage)
+def _remember_previous_voyage(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        instance._analytics_previous = None
+        return
+    instance._analytics_previous = (
+        Voyage.objects.filter(pk=instance.pk)
+        .only("vessel_id", "port_from_id", "port_to_id", "departure_time", "arrival_time", "status", "region_to")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Voyage)
+def _voyage_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_analytics_previous", None)
+    if previous is not None:
+        apply_voyages([previous], sign=-1)
+    apply_voyages([instance])
+
+
+@receiver(post_delete, sender=Voyage)
+def _voyage_deleted(sender, instance, **kwargs):
+    apply_voyages([instance], sign=-1)
+
+
+def rebuild_voyage_stats(since=None):
+    """
+    Recomputes the daily rollup from voyages, for arrival dates on or after
+    `since` (a date) or for all history. Returns the number of rows written.
+    """
+    voyages = Voyage.objects.filter(arrival_time__isnull=False)
+    stats = VoyageDailyStats.objects.all()
+    if since is not None:
+        voyages = voyages.filter(arrival_time__date__gte=since)
+        stats = stats.filter(date__gte=since)
+
+    grouped = (
+        voyages.annotate(day=TruncDate("arrival_time", tzinfo=dt_timezone.utc))
+        .values("day", "vessel__type", "region_to")
+        .annotate(
+            arrivals=Count("id"),
+            in_transit=Count("id", filter=Q(status="In Transit")),
+            wait_sum=Sum("port_to__avg_wait_time"),
+            wait_count=Count("port_to__avg_wait_time"),
+        )
+    )
+    rows = [
+        VoyageDailyStats(
+            date=row["day"],
+            vessel_type=row["vessel__type"] or "",
+            region_id=row["region_to"],
+            arrivals=row["arrivals"],
+            in_transit=row["in_transit"],
+            wait_sum=row["wait_sum"] or 0,
+            wait_count=row["wait_count"],
+        )
+        for row in grouped.iterator()
+    ]
+    with transaction.atomic():
+        stats.delete()
+        VoyageDailyStats.objects.bulk_create(rows, batch_size=5000)
+    return len(rows)
+
+
+def rebuild_flow_stats(since=None):
+    """
+    Recomputes the flow rollup from voyages, for departure dates on or after
+    `since` (a date) or for all history. Returns the number of rows written.
+    """
+    voyages = Voyage.objects.filter(
+        departure_time__isnull=False, port_from__isnull=False, port_to__isnull=False
+    )
+    stats = FlowDailyStats.objects.all()
+    if since is not None:
+        voyages = voyages.filter(departure_time__date__gte=since)
+        stats = stats.filter(date__gte=since)
+
+    transit = ExpressionWrapper(F("arrival_time") - F("departure_time"), output_field=DurationField())
+    grouped = (
+        voyages.annotate(day=TruncDate("departure_time", tzinfo=dt_timezone.utc))
+        .values("day", "port_from_id", "port_to_id", "vessel__type")
+        .annotate(
+            voyages=Count("id"),
+            transit=Sum(transit),
+            transit_count=Count("arrival_time"),
+        )
+    )
+    rows = [
+        FlowDailyStats(
+            date=row["day"],
+            port_from_id=row["port_from_id"],
+            port_to_id=row["port_to_id"],
+            vessel_type=row["vessel__type"] or "",
+            voyages=row["voyages"],
+            transit_hours_sum=row["transit"].total_seconds() / 3600 if row["transit"] else 0,
+            transit_count=row["transit_count"],
+        )
+        for row in grouped.iterator()
+    ]
+    with transaction.atomic():
+        stats.delete()
+        FlowDailyStats.objects.bulk_create(rows, batch_size=5000)
+    return len(rows)
+
+
+def refresh_fleet_composition():
+    now = timezone.now()
+    rows = [
+        FleetComposition(
+            vessel_type=row["type"],
+            cargo_type=row["cargo_type"],
+            region_id=row["region_id"],
+            vessel_count=row["count"],
+            refreshed_at=now,
+        )
+        for row in Vessel.objects.values("type", "cargo_type", "region_id").annotate(count=Count("id"))
+    ]
+    with transaction.atomic():
+        FleetComposition.objects.all().delete()
+        FleetComposition.objects.bulk_create(rows)
+    return rows
+
+
+def fleet_composition():
+    """Composition rows, rebuilt first when missing or stale."""
+    rows = list(FleetComposition.objects.all())
+    max_age = timedelta(seconds=settings.ANALYTICS_FLEET_MAX_AGE)
+    if not rows or timezone.now() - rows[0].refreshed_at > max_age:
+        rows = refresh_fleet_composition()
+    return rows
+
+
+def voyage_window(start_date, vessel_type=None, region_id=None):
+    """
+    Per-day totals on or after `start_date` as a date-ordered list of
+    dicts with arrivals, in_transit, wait_sum and wait_count.
+    """
+    stats = VoyageDailyStats.objects.filter(date__gte=start_date)
+    if vessel_type:
+        stats = stats.filter(vessel_type=vessel_type)
+    if region_id is not None:
+        stats = stats.filter(region_id=region_id)
+    return list(
+        stats.values("date")
+        .annotate(
+            arrivals=Sum("arrivals"),
+            in_transit=Sum("in_transit"),
+            wait_sum=Sum("wait_sum"),
+            wait_count=Sum("wait_count"),
+        )
+        .order_by("date")
+    )
+
+
+def flow_matrix(start_date, vessel_type=None, region_id=None):
+    """
+    Trade lanes with voyages departing on or after `start_date`: voyage
+    counts, mean transit hours and vessel-type mix per port pair, heaviest
+    lanes first. `region_id` keeps lanes with either end in that region.
+    Cached for ANALYTICS_FLOWS_CACHE_SECONDS per argument set.
+    """
+    key = f"analytics:flows:{start_date}:{vessel_type}:{region_id}"
+    matrix = cache.get(key)
+    if matrix is not None:
+        return matrix
+
+    stats = FlowDailyStats.objects.filter(date__gte=start_date)
+    if vessel_type:
+        stats = stats.filter(vessel_type=vessel_type)
+    if region_id is not None:
+        stats = stats.filter(Q(port_from__region_id=region_id) | Q(port_to__region_id=region_id))
+
+    lanes = {}
+    for row in (
+        stats.values("port_from_id", "port_to_id", "vessel_type")
+        .annotate(voyages=Sum("voyages"), transit_sum=Sum("transit_hours_sum"), transit_count=Sum("transit_count"))
+    ):
+        if not row["voyages"]:
+            continue
+        lane = lanes.setdefault((row["port_from_id"], row["port_to_id"]), {
+            "from": row["port_from_id"], "to": row["port_to_id"],
+            "voyages": 0, "transit_sum": 0.0, "transit_count": 0, "vessel_types": {},
+        })
+        lane["voyages"] += row["voyages"]
+        lane["transit_sum"] += row["transit_sum"] or 0
+        lane["transit_count"] += row["transit_count"] or 0
+        lane["vessel_types"][row["vessel_type"] or "Unknown"] = row["voyages"]
+
+    flows = []
+    for lane in sorted(lanes.values(), key=lambda l: l["voyages"], reverse=True):
+        transit_sum, transit_count = lane.pop("transit_sum"), lane.pop("transit_count")
+        lane["avg_transit_hours"] = round(transit_sum / transit_count, 1) if transit_count else None
+        flows.append(lane)
+
+    port_ids = {l["from"] for l in flows} | {l["to"] for l in flows}
+    ports = list(Port.objects.filter(id__in=port_ids).values("id", "name", "country", "region_id").order_by("name"))
+    matrix = {"ports": ports, "flows": flows}
+    cache.set(key, matrix, settings.ANALYTICS_FLOWS_CACHE_SECONDS)
+    return matrix
@@ -1,23 +1,12 @@
 from django.apps import AppConfig
-import threading
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
 
     def ready(self):
-        # Prevent double execution (Django reloads twice)
-        import os
-        if os.environ.get("RUN_MAIN") != "true":
-            return
-
-        try:
-            from core.ais_fetcher import run_enrichment_loop
-            thread = threading.Thread(
-                target=run_enrichment_loop,
-                daemon=True
-            )
-            thread.start()
-            print("🚀 Vessel enrichment thread started")
-        except Exception as e:
-            print("❌ Enrichment startup error:", e)
+        # Alert fields, region tagging and analytics rollup signal receivers.
+        # Alerts first: region tagging of a notification may use its port.
+        # Background work (enrichment, refreshes, retention) runs in
+        # `manage.py run_workers`, not in web processes.
+        from core import alerts, analytics, regions, search  # noqa: F401
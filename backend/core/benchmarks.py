@@ -0,0 +1,334 @@
+import json
+import random
+import statistics
+import subprocess
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, reset_queries, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.alerts import category_of, classify, rebuild_alert_stats, reset_recent_alerts
+from core.models import Event, Notification, Port, Voyage
+from core.search import reset_memory_index
+from core.synthetic import clear_synthetic, generate_fleet, synthetic_vessels
+
+# -------------------------
+# API BENCHMARK SUITE
+# -------------------------
+# Seeds a deterministic dataset tier, then times every GET route under
+# /api/ through the full middleware stack and records p50/p95 latency and
+# SQL query counts. Results are JSON files that can be diffed between
+# commits with `bench_api --compare`.
+
+TIERS = {
+    "small": {"vessels": 1_000, "points": 100},
+    "medium": {"vessels": 50_000, "points": 200},
+    "large": {"vessels": 500_000, "points": 200},
+}
+
+# Extra query strings timed on top of the bare route
+VARIANTS = {
+    "analytics/": ["?days=30", "?days=7&type=Container Ship", "?days=30&region=Asia Pacific"],
+    "dashboard/": ["?region=Europe"],
+    "analytics/flows/": ["?days=365", "?days=365&region=Europe"],
+    "alerts/": ["?severity=critical", "?search=congestion", "?region=Europe", "?status=new"],
+    "alerts/search/": ["?q=rott", "?q=critical+cong&region=Europe"],
+}
+
+# Long-lived responses (server-sent events) are not benchmarked
+STREAMING_ROUTES = {"alerts/stream/"}
+
+# Upper bound on SQL queries per request; exceeding it is a regression.
+# Authenticated routes include the JWT user lookup.
+QUERY_BUDGETS = {
+    "": 0,
+    "metrics": 0,
+    "login/": 3,
+    "vessels/": 3,
+    "ports/": 2,
+    "voyages/": 3,
+    "events/": 3,
+    "voyage-track/<int:voyage_id>/": 4,
+    "dashboard/": 2,
+    "risks/": 2,
+    "analytics/": 5,
+    "analytics/flows/": 3,
+    "users/": 2,
+    "audit-logs/": 3,
+    "alerts/": 5,
+    "alerts/search/": 2,
+}
+
+BENCH_USER = "bench_admin"
+BENCH_PASSWORD = "bench-password-1"
+
+# Seeded notifications carry this subject so a reseed deletes only them;
+# real alerts have a port:/vessel:/text: subject (core.alerts.subject_of)
+BENCH_SUBJECT = "bench:seed"
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+CONGESTION_MESSAGE = "CRITICAL: {port} congestion at {score}%. Wait time {wait}h."
+EVENT_TYPES = ["Port Arrival", "Port Departure", "Speed Drop", "Route Deviation", "Bunker Stop"]
+
+
+def is_local_database():
+    """True for SQLite and for PostgreSQL on this machine."""
+    db = settings.DATABASES["default"]
+    return connection.vendor == "sqlite" or (db.get("HOST") or "localhost") in LOCAL_HOSTS
+
+
+def _seed_notifications(count, seed, log):
+    """
+    Inserts `count` alert notifications spread over the last 90 days.
+    Raw INSERTs are used because Notification.timestamp is auto_now_add.
+    """
+    rng = random.Random(seed)
+    port_rows = {name: (port_id, region_id) for port_id, name, region_id in Port.objects.values_list("id", "name", "region_id")}
+    port_rows = port_rows or {"Port of Singapore": (None, 0)}
+    ports = list(port_rows)
+    vessel_regions = dict(synthetic_vessels().values_list("id", "region_id")[:10_000])
+    vessel_ids = list(vessel_regions)
+    now = timezone.now()
+    table = Notification._meta.db_table
+    sql = (
+        f'INSERT INTO {table} (user_id, vessel_id, event_id, message, type, "timestamp", region_id, '
+        "severity, category, port_id, wait_hours, subject, occurrences, status) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 1, 'new')"
+    )
+
+    for start in range(0, count, 10_000):
+        rows = []
+        for _ in range(min(10_000, count - start)):
+            # Raw cursors skip Django's value adaptation (SQLite would store the UTC offset)
+            moment = connection.ops.adapt_datetimefield_value(now - timedelta(seconds=rng.randint(0, 90 * 86400)))
+            if rng.random() < 0.6:
+                port = rng.choice(ports)
+                port_id, region_id = port_rows[port]
+                wait = round(rng.uniform(2.5, 72.0), 1)
+                message = CONGESTION_MESSAGE.format(port=port, score=rng.randint(86, 99), wait=wait)
+                rows.append((None, None, None, message, "Congestion Alert", moment, region_id,
+                             "critical", category_of("Congestion Alert"), port_id, wait, BENCH_SUBJECT))
+            else:
+                event_type = rng.choice(EVENT_TYPES)
+                vessel_id = rng.choice(vessel_ids) if vessel_ids else None
+                message = f"Alert: {event_type} detected for vessel {vessel_id}"
+                rows.append((None, vessel_id, None, message, "Alert", moment, vessel_regions.get(vessel_id, 0),
+                             classify(message), category_of("Alert"), None, None, BENCH_SUBJECT))
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+        log(f"Seeded {start + len(rows)}/{count} notifications...")
+
+
+def _seed_events(count, seed):
+    rng = random.Random(seed)
+    vessel_ids = list(synthetic_vessels().values_list("id", flat=True)[:10_000])
+    Event.objects.bulk_create([
+        Event(
+            vessel_id=rng.choice(vessel_ids) if vessel_ids else None,
+            event_type=rng.choice(EVENT_TYPES),
+            location=f"{rng.uniform(-60, 60):.4f}, {rng.uniform(-180, 180):.4f}",
+            details="Synthetic benchmark event",
+        )
+        for _ in range(count)
+    ], batch_size=5000)
+
+
+def seed_tier(tier, seed=42, reseed=False, log=print):
+    """
+    Loads the dataset for `tier` unless a matching one is already present.
+    """
+    spec = TIERS[tier]
+    present = synthetic_vessels().count()
+    if present == spec["vessels"] and not reseed:
+        log(f"Tier '{tier}' already seeded ({present} vessels).")
+        return False
+
+    log(f"Seeding tier '{tier}': {spec['vessels']} vessels x {spec['points']} points...")
+    clear_synthetic()
+    # Plain DELETE: per-row alert receivers would load every notification;
+    # the alert rollup is rebuilt after seeding instead
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {Notification._meta.db_table} WHERE subject = %s", [BENCH_SUBJECT])
+    Event.objects.filter(details="Synthetic benchmark event").delete()
+
+    end = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    generate_fleet(spec["vessels"], spec["points"], seed=seed, end=end, chunk_size=2000, log=log)
+    _seed_notifications(spec["vessels"] * 2, seed, log)
+    rebuild_alert_stats()
+    reset_recent_alerts()
+    reset_memory_index()
+    _seed_events(min(spec["vessels"], 50_000), seed)
+    return True
+
+
+def _iter_patterns(patterns, prefix=""):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iter_patterns(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            yield prefix + str(pattern.pattern), str(pattern.pattern), pattern.callback
+
+
+def discover_routes():
+    """
+    Returns (benchmarkable, skipped) for every route under /api/.
+    GET routes are benchmarked, plus login; other write routes are skipped.
+    """
+    routes, skipped = [], []
+    for full, route, callback in _iter_patterns(get_resolver().url_patterns):
+        if not full.startswith("api/"):
+            continue
+        view_class = getattr(callback, "cls", None) or getattr(callback, "view_class", None)
+        if "<" in route and route not in QUERY_BUDGETS:
+            skipped.append(full)  # no sample value for the path parameter
+        elif route in STREAMING_ROUTES:
+            skipped.append(full)
+        elif view_class is None or hasattr(view_class, "get"):
+            routes.append(("GET", full, route))
+        elif route == "login/":
+            routes.append(("POST", full, route))
+        else:
+            skipped.append(full)
+    return routes, skipped
+
+
+def _bench_user():
+    User = get_user_model()
+    user, created = User.objects.get_or_create(
+        username=BENCH_USER, defaults={"is_staff": True, "is_superuser": True, "role": "Admin"}
+    )
+    if created:
+        user.set_password(BENCH_PASSWORD)
+        user.save()
+    return user
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def bench_client():
+    """Django test client authenticated as the benchmark admin via JWT."""
+    token = str(RefreshToken.for_user(_bench_user()).access_token)
+    return Client(HTTP_AUTHORIZATION=f"Bearer {token}", SERVER_NAME="localhost")
+
+
+def bench_urls():
+    """Returns (method, route, url) for every benchmarked request, variants included."""
+    voyage_id = Voyage.objects.order_by("-departure_time").values_list("id", flat=True).first() or 0
+    routes, _ = discover_routes()
+    urls = []
+    for method, full, route in routes:
+        path = "/" + full.replace("<int:voyage_id>", str(voyage_id))
+        for suffix in [""] + VARIANTS.get(route, []):
+            urls.append((method, route, path + suffix))
+    return urls
+
+
+def send(client, method, url):
+    if method == "POST":
+        return client.post(url, {"username": BENCH_USER, "password": BENCH_PASSWORD},
+                           content_type="application/json")
+    return client.get(url)
+
+
+def run_benchmarks(tier, iterations=20, warmup=2, log=print):
+    client = bench_client()
+    _, skipped = discover_routes()
+    results = []
+    for method, route, url in bench_urls():
+        def request():
+            return send(client, method, url)
+
+        for _ in range(warmup):
+            request()
+
+        # One captured request for the query profile, then clean timings.
+        # The query log is a bounded deque; clear it so seeding under
+        # DEBUG cannot leave it full and hide this request's queries.
+        reset_queries()
+        with CaptureQueriesContext(connection) as captured:
+            response = request()
+        sql_ms = sum(float(q["time"]) for q in captured.captured_queries) * 1000
+
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            request()
+            samples.append((time.perf_counter() - started) * 1000)
+
+        budget = QUERY_BUDGETS.get(route)
+        entry = {
+            "method": method,
+            "route": route,
+            "url": url,
+            "status": response.status_code,
+            "bytes": len(response.content),
+            "queries": len(captured.captured_queries),
+            "query_budget": budget,
+            "over_budget": budget is not None and len(captured.captured_queries) > budget,
+            "sql_ms": round(sql_ms, 2),
+            "p50_ms": round(_percentile(samples, 50), 2),
+            "p95_ms": round(_percentile(samples, 95), 2),
+            "mean_ms": round(statistics.fmean(samples), 2),
+            "max_ms": round(max(samples), 2),
+        }
+        results.append(entry)
+        log(f"{method:4} {url:60} p50 {entry['p50_ms']:8.1f}ms  p95 {entry['p95_ms']:8.1f}ms  "
+            f"{entry['queries']:3} queries{'  OVER BUDGET' if entry['over_budget'] else ''}")
+
+    return {
+        "tier": tier,
+        "dataset": TIERS[tier],
+        "revision": _git_revision(),
+        "database": connection.vendor,
+        "iterations": iterations,
+        "timestamp": timezone.now().isoformat(),
+        "skipped_routes": ["/" + r for r in skipped],
+        "results": results,
+    }
+
+
+def save_report(report, output_dir):
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"{report['tier']}-{timezone.now():%Y%m%d-%H%M%S}-{report['revision']}.json"
+    path.write_text(json.dumps(report, indent=2))
+    return path
+
+
+def compare_reports(baseline, current, threshold=0.2):
+    """
+    Returns human-readable regression lines: p95 slower by more than
+    `threshold` (fractional) or more SQL queries than the baseline.
+    """
+    previous = {r["url"]: r for r in baseline["results"]}
+    regressions = []
+    for entry in current["results"]:
+        before = previous.get(entry["url"])
+        if before is None:
+            continue
+        if before["p95_ms"] and entry["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{entry['url']}: p95 {before['p95_ms']}ms → {entry['p95_ms']}ms")
+        if entry["queries"] > before["queries"]:
+            regressions.append(f"{entry['url']}: queries {before['queries']} → {entry['queries']}")
+    return regressions
@@ -0,0 +1,175 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from core.models import DashboardStats, Port, RiskZone, Vessel, Voyage
+
+# -------------------------
+# DASHBOARD COUNTERS
+# -------------------------
+# The dashboard is polled by every open browser, so its counters live in a
+# single materialized row. Writers (ingest, UNCTAD loader) refresh it at
+# most every DASHBOARD_STATS_REFRESH_SECONDS per process; the endpoint reads
+# the row by primary key and only recomputes it when it is older than
+# DASHBOARD_STATS_MAX_AGE. The row also carries the same counters per trade
+# region, so a region-filtered dashboard costs the same single read.
+# Recomputing a stale row is serialized by an advisory lock (a process lock
+# on SQLite); concurrent requests keep serving the old row meanwhile.
+
+# All four counts per region in one round trip. The vessel count reads the
+# whole vessels table; keep it off request paths (see get_stats()).
+_COUNTS_SQL = f"""
+    SELECT 'total_vessels', region_id, COUNT(*) FROM {Vessel._meta.db_table} GROUP BY region_id
+    UNION ALL
+    SELECT 'active_voyages', region_to, COUNT(*) FROM {Voyage._meta.db_table}
+        WHERE status = 'In Transit' GROUP BY region_to
+    UNION ALL
+    SELECT 'active_risks', region_id, COUNT(*) FROM {RiskZone._meta.db_table} GROUP BY region_id
+    UNION ALL
+    SELECT 'high_congestion_ports', region_id, COUNT(*) FROM {Port._meta.db_table}
+        WHERE congestion_score > 90 GROUP BY region_id
+"""
+
+COUNTERS = ["total_vessels", "active_voyages", "active_risks", "high_congestion_ports"]
+
+STATS_ID = 1
+RECENT_VOYAGES = 5
+
+_STATS_LOCK = 0x64617368  # "dash"
+_last_refresh = 0.0
+_refresh_lock = threading.Lock()
+
+
+def _recent_voyages():
+    """
+    Latest in-transit voyages per destination region, plus the overall
+    latest, from one windowed query: the overall top N is always within
+    the union of the per-region top N.
+    """
+    ranked = (
+        Voyage.objects.filter(status="In Transit")
+        .annotate(rank=Window(RowNumber(), partition_by=F("region_to"), order_by=F("departure_time").desc()))
+        .filter(rank__lte=RECENT_VOYAGES)
+        .select_related("vessel", "port_from", "port_to")
+    )
+    rows = sorted(ranked, key=lambda v: v.departure_time.timestamp() if v.departure_time else 0, reverse=True)
+
+    def entry(v):
+        return {
+            "id": v.id,
+            "vessel_name": v.vessel.name if v.vessel else "Unknown",
+            "origin": v.port_from.name if v.port_from else "Sea",
+            "destination": v.port_to.name if v.port_to else "Sea",
+            "status": v.status,
+        }
+
+    by_region = {}
+    for v in rows:
+        by_region.setdefault(str(v.region_to), []).append(entry(v))
+    return [entry(v) for v in rows[:RECENT_VOYAGES]], by_region
+
+
+def refresh_stats():
+    """Recomputes the counters row and returns it."""
+    global _last_refresh
+    totals = dict.fromkeys(COUNTERS, 0)
+    regions = {}
+    with connection.cursor() as cursor:
+        cursor.execute(_COUNTS_SQL)
+        for counter, region_id, count in cursor.fetchall():
+            totals[counter] += count
+            regions.setdefault(str(region_id), dict.fromkeys(COUNTERS, 0))[counter] = count
+
+    recent, recent_by_region = _recent_voyages()
+    for region_id, voyages in recent_by_region.items():
+        regions.setdefault(region_id, dict.fromkeys(COUNTERS, 0))["recent_voyages"] = voyages
+    for counters in regions.values():
+        counters.setdefault("recent_voyages", [])
+
+    stats = DashboardStats(
+        id=STATS_ID,
+        **totals,
+        recent_voyages=recent,
+        regions=regions,
+        refreshed_at=timezone.now(),
+    )
+    DashboardStats.objects.bulk_create(
+        [stats],
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=[
+            "total_vessels", "active_voyages", "active_risks",
+            "high_congestion_ports", "recent_voyages", "regions", "refreshed_at",
+        ],
+    )
+    _last_refresh = time.monotonic()
+    return stats
+
+
+def maybe_refresh():
+    """Throttled refresh for write paths; returns True if it refreshed."""
+    if time.monotonic() - _last_refresh < settings.DASHBOARD_STATS_REFRESH_SECONDS:
+        return False
+    if not _refresh_lock.acquire(blocking=False):
+        return False
+    try:
+        refresh_stats()
+    finally:
+        _refresh_lock.release()
+    return True
+
+
+def _lock_stats(blocking):
+    """Transaction-scoped lock on recomputing the row; False if another holds it."""
+    if connection.vendor != "postgresql":
+        return _refresh_lock.acquire(blocking=blocking)
+    with connection.cursor() as cursor:
+        if blocking:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [_STATS_LOCK])
+            return True
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s)", [_STATS_LOCK])
+        return cursor.fetchone()[0]
+
+
+def _is_fresh(stats):
+    max_age = timedelta(seconds=settings.DASHBOARD_STATS_MAX_AGE)
+    return stats is not None and timezone.now() - stats.refreshed_at <= max_age
+
+
+def get_stats():
+    """
+    The counters row, recomputed first if missing or stale. While another
+    request recomputes it, a stale row is returned as is and a missing one
+    is waited for.
+    """
+    stats = DashboardStats.objects.filter(pk=STATS_ID).first()
+    if _is_fresh(stats):
+        return stats
+    with transaction.atomic():
+        locked = _lock_stats(blocking=stats is None)
+        if not locked:
+            return stats
+        try:
+            current = DashboardStats.objects.filter(pk=STATS_ID).first()
+            if _is_fresh(current):
+                return current
+            return refresh_stats()
+        finally:
+            if connection.vendor != "postgresql":
+                _refresh_lock.release()
+
+
+def region_counters(stats, region_id=None):
+    """Counters and recent voyages for one region, or the totals for None."""
+    if region_id is None:
+        counters = {name: getattr(stats, name) for name in COUNTERS}
+        counters["recent_voyages"] = stats.recent_voyages
+        return counters
+    empty = dict.fromkeys(COUNTERS, 0) | {"recent_voyages": []}
+    return stats.regions.get(str(region_id), empty)
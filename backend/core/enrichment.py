@@ -0,0 +1,219 @@
+import asyncio
+import random
+import time
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import httpx
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Vessel, VesselEnrichment
+
+# -------------------------
+# VESSEL ENRICHMENT
+# -------------------------
+# Vessels missing their IMO number, flag, type or operator are looked up
+# against ENRICHMENT_API_URL in batches. A batch's lookups run concurrently
+# on one pooled async client: at most ENRICHMENT_CONCURRENCY in flight and
+# ENRICHMENT_RATE_PER_HOST requests per second to any host, with timeouts,
+# 429s and 5xx retried under exponential backoff.
+#
+# Every answer, "not found" included, is cached in VesselEnrichment until
+# it expires, so a vessel the source does not know is asked about again
+# after ENRICHMENT_NEGATIVE_TTL_HOURS instead of on every run. Database
+# reads and writes stay outside the event loop and are done in bulk.
+
+UNKNOWN = {"flag": "Unknown", "type": "Unknown", "operator": "Unknown Operator"}
+
+# Source field -> Vessel field
+FIELDS = {"imo": "imo_number", "flag": "flag", "type": "type", "operator": "operator"}
+
+PENDING = (
+    Q(imo_number__isnull=True) | Q(flag=UNKNOWN["flag"]) | Q(type=UNKNOWN["type"])
+    | Q(operator=UNKNOWN["operator"])
+)
+
+USER_AGENT = "maritime-enrichment/1.0"
+
+# Scan position across runs, so vessels with a cached "not found" at the
+# start of the table do not starve the rest
+_scan_after = 0
+_MAX_SCAN_CHUNKS = 10
+
+
+def vessel_key(vessel):
+    return f"mmsi:{vessel.mmsi}" if vessel.mmsi else f"name:{vessel.name}"
+
+
+class HostRateLimiter:
+    """Spaces requests to each host at least 1 / rate seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host):
+        async with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next.get(host, now))
+            self._next[host] = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+def _retry_after(response):
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
+
+
+def _parse(payload):
+    if not isinstance(payload, dict):
+        raise ValueError("Expected a JSON object")
+    return {field: str(payload[name]) for name, field in FIELDS.items() if payload.get(name)}
+
+
+async def _lookup(client, limiter, semaphore, vessel):
+    """(status, data) for one vessel, or None when the source kept failing."""
+    url = settings.ENRICHMENT_API_URL.rstrip("/") + "/vessels"
+    host = urlsplit(url).netloc
+    params = {"name": vessel.name}
+    if vessel.mmsi:
+        params["mmsi"] = vessel.mmsi
+
+    for attempt in range(settings.ENRICHMENT_MAX_RETRIES + 1):
+        delay = None
+        async with semaphore:
+            await limiter.wait(host)
+            try:
+                response = await client.get(url, params=params)
+            except httpx.TransportError:
+                response = None
+        if response is not None:
+            if response.status_code == 404:
+                return VesselEnrichment.MISSING, {}
+            if response.status_code == 200:
+                try:
+                    return VesselEnrichment.FOUND, _parse(response.json())
+                except ValueError:
+                    return None
+            if response.status_code != 429 and response.status_code < 500:
+                return None  # not transient; retried on a later run
+            delay = _retry_after(response)
+        if attempt < settings.ENRICHMENT_MAX_RETRIES:
+            backoff = settings.ENRICHMENT_BACKOFF_SECONDS * 2 ** attempt
+            await asyncio.sleep(delay if delay is not None else backoff * (1 + random.random()))
+    return None
+
+
+async def lookup_vessels(vessels):
+    """Looks up `vessels` concurrently; one result per vessel, in order."""
+    concurrency = max(1, settings.ENRICHMENT_CONCURRENCY)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    limiter = HostRateLimiter(settings.ENRICHMENT_RATE_PER_HOST)
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(
+        limits=limits, timeout=settings.ENRICHMENT_TIMEOUT_SECONDS, headers={"User-Agent": USER_AGENT}
+    ) as client:
+        return await asyncio.gather(*(_lookup(client, limiter, semaphore, v) for v in vessels))
+
+
+def _apply(vessel, data):
+    """Fills the vessel's missing fields from `data`; True if any changed."""
+    changed = False
+    for field in FIELDS.values():
+        current = getattr(vessel, field)
+        if data.get(field) and (not current or current == UNKNOWN.get(field)):
+            setattr(vessel, field, data[field])
+            changed = True
+    return changed
+
+
+def _pending_batch(batch_size, now):
+    """
+    Up to `batch_size` pending vessels without a fresh cache entry, plus the
+    vessels that a fresh "found" entry can fill without a request. Scans at
+    most _MAX_SCAN_CHUNKS chunks, wrapping around the table once.
+    """
+    global _scan_after
+    to_fetch, from_cache, seen = [], [], set()
+    for _ in range(_MAX_SCAN_CHUNKS):
+        chunk = list(
+            Vessel.objects.filter(PENDING, id__gt=_scan_after)
+            .only("id", "mmsi", "name", *FIELDS.values())
+            .order_by("id")[:batch_size]
+        )
+        if not chunk:
+            if _scan_after == 0:
+                break
+            _scan_after = 0
+            continue
+        fresh = {
+            e.key: e for e in VesselEnrichment.objects.filter(
+                key__in=[vessel_key(v) for v in chunk], expires_at__gt=now
+            )
+        }
+        for vessel in chunk:
+            if vessel.id in seen:
+                return to_fetch, from_cache
+            seen.add(vessel.id)
+            _scan_after = vessel.id
+            entry = fresh.get(vessel_key(vessel))
+            if entry is None:
+                to_fetch.append(vessel)
+                if len(to_fetch) == batch_size:
+                    return to_fetch, from_cache
+            elif entry.status == VesselEnrichment.FOUND:
+                from_cache.append((vessel, entry.data))
+    return to_fetch, from_cache
+
+
+def run_enrichment_batch(batch_size=None, log=print):
+    """
+    One enrichment pass. Returns counts of vessels fetched, found, missing,
+    failed (left for a later run) and updated.
+    """
+    batch_size = batch_size or settings.ENRICHMENT_BATCH_SIZE
+    now = timezone.now()
+    to_fetch, from_cache = _pending_batch(batch_size, now)
+    results = asyncio.run(lookup_vessels(to_fetch)) if to_fetch else []
+
+    ttl = {
+        VesselEnrichment.FOUND: timedelta(hours=settings.ENRICHMENT_TTL_HOURS),
+        VesselEnrichment.MISSING: timedelta(hours=settings.ENRICHMENT_NEGATIVE_TTL_HOURS),
+    }
+    counts = {"fetched": len(to_fetch), "found": 0, "missing": 0, "failed": 0, "updated": 0}
+    entries = {}
+    updates = list(from_cache)
+    for vessel, result in zip(to_fetch, results):
+        if result is None:
+            counts["failed"] += 1
+            continue
+        status, data = result
+        counts[status] += 1
+        key = vessel_key(vessel)
+        entries[key] = VesselEnrichment(
+            key=key, status=status, data=data, fetched_at=now, expires_at=now + ttl[status]
+        )
+        if status == VesselEnrichment.FOUND:
+            updates.append((vessel, data))
+
+    changed = [vessel for vessel, data in updates if _apply(vessel, data)]
+    if entries:
+        VesselEnrichment.objects.bulk_create(
+            entries.values(), batch_size=1000, update_conflicts=True, unique_fields=["key"],
+            update_fields=["status", "data", "fetched_at", "expires_at"],
+        )
+    if changed:
+        Vessel.objects.bulk_update(changed, list(FIELDS.values()), batch_size=1000)
+    counts["updated"] = len(changed)
+    if to_fetch or changed:
+        log(
+            f"🧠 Enrichment: {counts['fetched']} fetched, {counts['found']} found, "
+            f"{counts['missing']} missing, {counts['failed']} failed, {counts['updated']} vessels updated"
+        )
+    return counts
@@ -0,0 +1,32 @@
+import math
+
+# -------------------------
+# GEO HELPERS
+# -------------------------
+
+EARTH_RADIUS_NM = 3440.065
+
+
+def parse_location(location):
+    """
+    Parses a Port.location string ("31.2304, 121.4737") into (lat, lon).
+    Returns None when the value is missing or malformed.
+    """
+    if not location:
+        return None
+    try:
+        lat, lon = (float(part) for part in location.split(","))
+    except ValueError:
+        return None
+    if abs(lat) > 90 or abs(lon) > 180:
+        return None
+    return lat, lon
+
+
+def haversine_nm(lat1, lon1, lat2, lon2):
+    """Great-circle distance in nautical miles."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_NM * math.asin(math.sqrt(a))
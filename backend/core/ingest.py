@@ -0,0 +1,182 @@
+import csv
+import io
+import time
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.db import connection, transaction
+
+from core import dashboard, metrics, profiling
+from core.models import Vessel, VoyageTrack
+from core.regions import region_ids
+from core.rollups import record_track_points
+
+# -------------------------
+# BULK INGEST
+# -------------------------
+# Shared write path for bulk loaders (import_ais, generate_fleet):
+# one vessel upsert and one COPY per batch, then the track rollups.
+
+_VESSEL_UPSERT_SQL = f"""
+    INSERT INTO {Vessel._meta.db_table} (
+        mmsi, name, type, flag, operator,
+        last_position_lat, last_position_lon, speed, course, last_update, region_id
+    ) VALUES (%s, %s, 'Unknown', 'Unknown', 'Unknown Operator', %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (mmsi) DO UPDATE SET
+        name = CASE WHEN excluded.name LIKE 'VESSEL-%%' THEN {Vessel._meta.db_table}.name ELSE excluded.name END,
+        last_position_lat = CASE WHEN {Vessel._meta.db_table}.last_update IS NULL
+                                   OR excluded.last_update >= {Vessel._meta.db_table}.last_update
+                                 THEN excluded.last_position_lat ELSE {Vessel._meta.db_table}.last_position_lat END,
+        last_position_lon = CASE WHEN {Vessel._meta.db_table}.last_update IS NULL
+                                   OR excluded.last_update >= {Vessel._meta.db_table}.last_update
+                                 THEN excluded.last_position_lon ELSE {Vessel._meta.db_table}.last_position_lon END,
+        speed = CASE WHEN {Vessel._meta.db_table}.last_update IS NULL
+                       OR excluded.last_update >= {Vessel._meta.db_table}.last_update
+                     THEN excluded.speed ELSE {Vessel._meta.db_table}.speed END,
+        course = CASE WHEN {Vessel._meta.db_table}.last_update IS NULL
+                        OR excluded.last_update >= {Vessel._meta.db_table}.last_update
+                      THEN excluded.course ELSE {Vessel._meta.db_table}.course END,
+        region_id = CASE WHEN {Vessel._meta.db_table}.last_update IS NULL
+                           OR excluded.last_update >= {Vessel._meta.db_table}.last_update
+                         THEN excluded.region_id ELSE {Vessel._meta.db_table}.region_id END,
+        last_update = CASE WHEN {Vessel._meta.db_table}.last_update IS NULL
+                             OR excluded.last_update >= {Vessel._meta.db_table}.last_update
+                           THEN excluded.last_update ELSE {Vessel._meta.db_table}.last_update END
+"""
+
+_TRACK_COPY_SQL = (
+    f'COPY {VoyageTrack._meta.db_table} (vessel_id, latitude, longitude, speed, course, "timestamp") '
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+
+def upsert_vessels(latest, names=None):
+    """
+    Upserts one row per MMSI and returns {mmsi: vessel_id}.
+    `latest` maps mmsi -> (timestamp, lat, lon, speed, course) of the newest
+    report in the batch; `names` maps mmsi -> ship name where known.
+    An older report never overwrites a newer stored position.
+    """
+    names = names or {}
+    mmsis = set(latest) | set(names)
+    if not mmsis:
+        return {}
+
+    mmsis = list(mmsis)
+    reports = [latest.get(mmsi, (None, None, None, None, None)) for mmsi in mmsis]
+    regions = region_ids(
+        [np.nan if r[1] is None else r[1] for r in reports],
+        [np.nan if r[2] is None else r[2] for r in reports],
+    )
+    rows = []
+    for mmsi, (ts, lat, lon, speed, course), region in zip(mmsis, reports, regions):
+        # Raw cursors skip Django's value adaptation (SQLite would store the UTC offset)
+        ts = connection.ops.adapt_datetimefield_value(ts)
+        rows.append((str(mmsi), names.get(mmsi) or f"VESSEL-{mmsi}", lat, lon, speed, course, ts, int(region)))
+    with connection.cursor() as cursor:
+        cursor.executemany(_VESSEL_UPSERT_SQL, rows)
+
+    return {
+        int(mmsi): vessel_id
+        for mmsi, vessel_id in Vessel.objects.filter(mmsi__in=[str(m) for m in mmsis]).values_list("mmsi", "id")
+    }
+
+
+def copy_tracks(rows):
+    """
+    Loads (vessel_id, lat, lon, speed, course, timestamp) rows into
+    voyage_tracks: COPY on PostgreSQL, batched INSERTs elsewhere.
+    """
+    if not rows:
+        return 0
+    if connection.vendor == "postgresql":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for vessel_id, lat, lon, speed, course, ts in rows:
+            writer.writerow((vessel_id, lat, lon, "" if speed is None else speed,
+                             "" if course is None else course, ts.isoformat()))
+        buffer.seek(0)
+        with connection.cursor() as cursor:
+            cursor.copy_expert(_TRACK_COPY_SQL, buffer)
+    else:
+        VoyageTrack.objects.bulk_create(
+            [VoyageTrack(vessel_id=v, latitude=la, longitude=lo, speed=s, course=c, timestamp=ts)
+             for v, la, lo, s, c, ts in rows],
+            batch_size=5000,
+        )
+    return len(rows)
+
+
+def copy_track_arrays(vessel_ids, epochs, lats, lons, speeds, courses):
+    """
+    Array form of copy_tracks for generated data: the COPY payload is
+    formatted column-wise with numpy instead of row by row. Speed/course
+    use NaN for unknown.
+    """
+    if len(epochs) == 0:
+        return 0
+    if connection.vendor != "postgresql":
+        return copy_tracks([
+            (int(v), float(la), float(lo),
+             None if np.isnan(s) else float(s), None if np.isnan(c) else float(c),
+             datetime.fromtimestamp(int(t), tz=dt_timezone.utc))
+            for v, t, la, lo, s, c in zip(vessel_ids, epochs, lats, lons, speeds, courses)
+        ])
+
+    def fmt(values):
+        text = np.char.mod("%.2f", values)
+        return np.where(np.isnan(values), "", text)
+
+    timestamps = np.char.add(
+        np.datetime_as_string(np.asarray(epochs, dtype="datetime64[s]"), unit="s"), "Z"
+    )
+    columns = [
+        np.char.mod("%d", vessel_ids),
+        np.char.mod("%.6f", lats),
+        np.char.mod("%.6f", lons),
+        fmt(speeds),
+        fmt(courses),
+        timestamps,
+    ]
+    lines = columns[0]
+    for column in columns[1:]:
+        lines = np.char.add(np.char.add(lines, ","), column)
+
+    buffer = io.StringIO("\n".join(lines.tolist()) + "\n")
+    with connection.cursor() as cursor:
+        cursor.copy_expert(_TRACK_COPY_SQL, buffer)
+    return len(epochs)
+
+
+def ingest_positions(positions, names=None, source="bulk", log=print):
+    """
+    Writes one batch of position reports in a single transaction.
+    `positions` is a list of (mmsi, timestamp, lat, lon, speed, course).
+    Returns the number of track rows written.
+    """
+    started = time.perf_counter()
+    latest = {}
+    for mmsi, ts, lat, lon, speed, course in positions:
+        current = latest.get(mmsi)
+        if current is None or ts >= current[0]:
+            latest[mmsi] = (ts, lat, lon, speed, course)
+
+    with profiling.maybe_profile(f"ingest-{source}"), transaction.atomic():
+        vessel_ids = upsert_vessels(latest, names)
+        rows = [
+            (vessel_ids[mmsi], lat, lon, speed, course, ts)
+            for mmsi, ts, lat, lon, speed, course in positions
+            if mmsi in vessel_ids
+        ]
+        copy_tracks(rows)
+        record_track_points((v, ts, la, lo, s, c) for v, la, lo, s, c, ts in rows)
+
+    try:
+        dashboard.maybe_refresh()
+    except Exception as exc:
+        # The batch is committed; a failed counter refresh must not make the
+        # caller skip its checkpoint and load the batch again
+        log(f"⚠️ Dashboard refresh after ingest failed: {exc}")
+    metrics.inc("ingest_positions_total", len(rows), source=source)
+    metrics.observe("ingest_batch_duration_ms", (time.perf_counter() - started) * 1000, source=source)
+    return len(rows)
@@ -0,0 +1,225 @@
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from core import profiling
+from core.models import Job, ScheduledJob
+
+# -------------------------
+# JOB QUEUE
+# -------------------------
+# Background work lives in the `jobs` table and is run by `manage.py
+# run_workers`, never by web processes. A worker claims a job with
+# SELECT ... FOR UPDATE SKIP LOCKED, so concurrent workers on any host never
+# block on or double-claim a row, and holds it under a lease that a
+# heartbeat extends while the job runs. A job whose worker died is claimed
+# again once its lease runs out.
+#
+# Each kind has a concurrency limit across all workers; claims are
+# serialized by a transaction-level advisory lock (PostgreSQL; a process
+# lock on SQLite dev databases) so the limit is exact. Failures are retried with exponential backoff up to
+# max_attempts. Periodic kinds (settings.JOB_SCHEDULE) are queued by
+# core.scheduler.
+
+_CLAIM_LOCK = 0x6A6F6273  # "jobs"
+_local_claim_lock = threading.Lock()
+
+
+class JobSpec:
+    def __init__(self, kind, func, concurrency=1, max_attempts=3):
+        self.kind = kind
+        self.func = func
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+
+    @property
+    def every(self):
+        """Seconds between periodic runs, or None for on-demand jobs."""
+        return settings.JOB_SCHEDULE.get(self.kind) or None
+
+
+REGISTRY = {}
+
+
+def job(kind, concurrency=1, max_attempts=3):
+    """Registers the decorated function as the handler for `kind`."""
+    def register(func):
+        REGISTRY[kind] = JobSpec(kind, func, concurrency, max_attempts)
+        return func
+    return register
+
+
+def enqueue(kind, payload=None, run_at=None, unique=False):
+    """
+    Queues a `kind` job. With `unique`, nothing is queued while another
+    `kind` job is queued or running; returns None in that case.
+    """
+    spec = REGISTRY[kind]
+    if unique and Job.objects.filter(kind=kind, status__in=[Job.QUEUED, Job.RUNNING]).exists():
+        return None
+    return Job.objects.create(
+        kind=kind, payload=payload or {}, run_at=run_at or timezone.now(), max_attempts=spec.max_attempts,
+    )
+
+
+def _claimable_kinds(kinds, now):
+    running = dict(
+        Job.objects.filter(status=Job.RUNNING, locked_until__gte=now)
+        .values("kind").annotate(n=Count("id")).values_list("kind", "n")
+    )
+    return [kind for kind in kinds if running.get(kind, 0) < REGISTRY[kind].concurrency]
+
+
+def _reap(now):
+    """Fails jobs whose worker died on their last attempt."""
+    dead = Job.objects.filter(status=Job.RUNNING, locked_until__lt=now, attempts__gte=F("max_attempts"))
+    dead.update(
+        status=Job.FAILED, locked_by=None, locked_until=None, finished_at=now, last_error="Lease expired"
+    )
+
+
+def claim(worker_id, kinds=None):
+    """Leases the next due job to `worker_id`; None when there is none."""
+    kinds = [kind for kind in (kinds or REGISTRY) if kind in REGISTRY]
+    if connection.vendor == "postgresql":
+        return _claim(worker_id, kinds)
+    with _local_claim_lock:
+        return _claim(worker_id, kinds)
+
+
+def _claim(worker_id, kinds):
+    now = timezone.now()
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(%s)", [_CLAIM_LOCK])
+        _reap(now)
+        kinds = _claimable_kinds(kinds, now)
+        if not kinds:
+            return None
+        due = Q(status=Job.QUEUED, run_at__lte=now) | Q(
+            status=Job.RUNNING, locked_until__lt=now, attempts__lt=F("max_attempts")
+        )
+        job_row = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(due, kind__in=kinds).order_by("run_at", "id").first()
+        )
+        if job_row is None:
+            return None
+        job_row.status = Job.RUNNING
+        job_row.locked_by = worker_id
+        job_row.locked_until = now + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+        job_row.attempts += 1
+        job_row.started_at = now
+        job_row.save(update_fields=["status", "locked_by", "locked_until", "attempts", "started_at"])
+    return job_row
+
+
+def _owned(job_row):
+    return Job.objects.filter(pk=job_row.pk, status=Job.RUNNING, locked_by=job_row.locked_by)
+
+
+def _heartbeat(job_row, done):
+    interval = settings.JOB_LEASE_SECONDS / 3
+    try:
+        while not done.wait(interval):
+            _owned(job_row).update(
+                locked_until=timezone.now() + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+            )
+    finally:
+        connection.close()
+
+
+def _finish(job_row, result=None, error=None):
+    now = timezone.now()
+    fields = {"locked_by": None, "locked_until": None, "finished_at": now}
+    if error is None:
+        fields.update(status=Job.DONE, result=result, last_error=None)
+    elif job_row.attempts < job_row.max_attempts:
+        backoff = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (job_row.attempts - 1)
+        fields.update(status=Job.QUEUED, run_at=now + timedelta(seconds=backoff), last_error=error)
+    else:
+        fields.update(status=Job.FAILED, last_error=error)
+    # A job whose lease was lost has been taken over; leave it to the new owner
+    return _owned(job_row).update(**fields) and fields["status"]
+
+
+def run_job(job_row):
+    """Runs a claimed job under a renewed lease. Returns its final status."""
+    spec = REGISTRY[job_row.kind]
+    done = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(job_row, done), daemon=True)
+    beat.start()
+    try:
+        with profiling.maybe_profile(job_row.kind):
+            result = spec.func(**job_row.payload)
+        error = None
+    except Exception:
+        result, error = None, traceback.format_exc()
+    finally:
+        done.set()
+        beat.join()
+    status = _finish(job_row, result, error)
+    if status and spec.every:
+        _record_periodic_run(job_row, status)
+    return status
+
+
+def _record_periodic_run(job_row, status):
+    """Stores the outcome and duration of a periodic run on its schedule row."""
+    finished = timezone.now()
+    state, _ = ScheduledJob.objects.get_or_create(kind=job_row.kind)
+    state.last_started_at = job_row.started_at
+    state.last_finished_at = finished
+    state.last_duration_ms = int((finished - job_row.started_at).total_seconds() * 1000)
+    state.last_status = status
+    state.runs += 1
+    state.save(update_fields=[
+        "last_started_at", "last_finished_at", "last_duration_ms", "last_status", "runs",
+    ])
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def work(stop, kinds=None, once=False, log=print):
+    """
+    One worker thread: claims and runs jobs until `stop` is set. With
+    `once`, returns as soon as no job is due.
+    """
+    me = worker_id()
+    try:
+        while not stop.is_set():
+            try:
+                job_row = claim(me, kinds)
+            except DatabaseError as exc:
+                log(f"❌ Job claim failed: {exc}")
+                connection.close()
+                stop.wait(settings.JOB_POLL_SECONDS)
+                continue
+            if job_row is None:
+                if once:
+                    return
+                stop.wait(settings.JOB_POLL_SECONDS)
+                continue
+            log(f"▶️ {job_row.kind} #{job_row.pk} (attempt {job_row.attempts}/{job_row.max_attempts})")
+            status = run_job(job_row)
+            icon = "✅" if status == Job.DONE else "❌" if status == Job.FAILED else "🔁"
+            log(f"{icon} {job_row.kind} #{job_row.pk}: {status or 'lease lost'}")
+    finally:
+        connection.close()
+
+
+def prune_jobs(now=None):
+    """Deletes finished jobs older than JOB_HISTORY_DAYS."""
+    cutoff = (now or timezone.now()) - timedelta(days=settings.JOB_HISTORY_DAYS)
+    deleted, _ = Job.objects.filter(status__in=[Job.DONE, Job.FAILED], finished_at__lt=cutoff).delete()
+    return deleted
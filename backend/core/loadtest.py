@@ -0,0 +1,198 @@
+import json
+import math
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+# -------------------------
+# END-TO-END LOAD TEST
+# -------------------------
+# Simulates browsers against a running server over real HTTP. Each virtual
+# browser logs in once, then follows the frontend's polling pattern on its
+# own thread. Only the standard library is used so the harness can run from
+# any machine that can reach the API.
+
+# (label, interval seconds, paths) — mirrors MapComponent, Dashboard and AlertsPage
+POLLING_PATTERN = [
+    ("map", 10, ["/vessels/", "/risks/"]),
+    ("dashboard", 30, ["/dashboard/"]),
+    ("alerts", 20, ["/alerts/?page_size=20&severity=all&search=&cursor={cursor}"]),
+]
+ALERT_PAGES = 5
+
+# Multiplier on the observed in-flight requests when sizing the server
+HEADROOM = 1.5
+MAX_THREADS = 32
+
+
+class Recorder:
+    """Thread-safe collector of (endpoint, status, latency, bytes) samples."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.bytes = defaultdict(int)
+
+    def add(self, endpoint, status, latency_ms, size):
+        with self._lock:
+            self.samples[endpoint].append(latency_ms)
+            self.bytes[endpoint] += size
+            if status is None or status >= 400:
+                self.errors[endpoint] += 1
+
+
+def _request(base_url, path, token=None, body=None, timeout=30):
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(base_url.rstrip("/") + path, data=data, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+    except (urllib.error.URLError, TimeoutError, ConnectionError):
+        return None, b""
+
+
+def _endpoint_label(path):
+    return path.split("?", 1)[0]
+
+
+def _timed(recorder, base_url, path, token=None, body=None):
+    started = time.perf_counter()
+    status, payload = _request(base_url, path, token, body)
+    recorder.add(_endpoint_label(path), status, (time.perf_counter() - started) * 1000, len(payload))
+    return status, payload
+
+
+def browser(index, base_url, credentials, deadline, recorder, stop):
+    """One simulated browser session."""
+    rng = random.Random(index)
+    status, payload = _timed(recorder, base_url, "/login/", body=credentials)
+    if status != 200:
+        return
+    token = json.loads(payload).get("access")
+
+    # Stagger the first poll of each task like tabs opened at different times
+    now = time.monotonic()
+    due = {label: now + rng.uniform(0, interval) for label, interval, _ in POLLING_PATTERN}
+    page, cursor = 1, ""
+    while not stop.is_set():
+        label = min(due, key=due.get)
+        wait = due[label] - time.monotonic()
+        if due[label] >= deadline:
+            return
+        if wait > 0 and stop.wait(wait):
+            return
+
+        _, interval, paths = next(task for task in POLLING_PATTERN if task[0] == label)
+        for path in paths:
+            status, payload = _timed(recorder, base_url, path.format(cursor=cursor), token)
+        if label == "alerts":
+            # Follow the next-page cursor, back to the first page after ALERT_PAGES
+            next_cursor = json.loads(payload).get("pagination", {}).get("next_cursor") if status == 200 else None
+            page = page % ALERT_PAGES + 1
+            cursor = next_cursor if page > 1 and next_cursor else ""
+            page = page if cursor else 1
+        due[label] += interval
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_load(base_url, users, duration, ramp_up, credentials, log=print):
+    """
+    Runs `users` browsers for `duration` seconds, starting them evenly over
+    `ramp_up` seconds. Returns the summary produced by `summarize`.
+    """
+    recorder = Recorder()
+    stop = threading.Event()
+    started = time.monotonic()
+    deadline = started + duration
+    threads = []
+    for index in range(users):
+        thread = threading.Thread(
+            target=browser, args=(index, base_url, credentials, deadline, recorder, stop), daemon=True
+        )
+        threads.append(thread)
+        thread.start()
+        if ramp_up and users > 1:
+            time.sleep(ramp_up / (users - 1) if index < users - 1 else 0)
+
+    try:
+        while any(t.is_alive() for t in threads):
+            time.sleep(min(5, max(0.1, deadline - time.monotonic())))
+            log(f"  {time.monotonic() - started:5.0f}s  {sum(len(s) for s in recorder.samples.values())} requests")
+    except KeyboardInterrupt:
+        stop.set()
+    for thread in threads:
+        thread.join(timeout=35)
+
+    return summarize(recorder, time.monotonic() - started, users)
+
+
+def summarize(recorder, elapsed, users):
+    endpoints = {}
+    total = 0
+    busy_ms = 0.0
+    for endpoint, samples in sorted(recorder.samples.items()):
+        total += len(samples)
+        busy_ms += sum(samples)
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "errors": recorder.errors[endpoint],
+            "rps": round(len(samples) / elapsed, 2),
+            "p50_ms": round(_percentile(samples, 50), 1),
+            "p95_ms": round(_percentile(samples, 95), 1),
+            "p99_ms": round(_percentile(samples, 99), 1),
+            "mean_ms": round(sum(samples) / len(samples), 1),
+            "kb_per_request": round(recorder.bytes[endpoint] / len(samples) / 1024, 1),
+        }
+    return {
+        "users": users,
+        "duration_s": round(elapsed, 1),
+        "requests": total,
+        "rps": round(total / elapsed, 2) if elapsed else 0,
+        # Little's law: requests in flight = arrival rate x time in system
+        "mean_concurrency": round(busy_ms / 1000 / elapsed, 2) if elapsed else 0,
+        "endpoints": endpoints,
+    }
+
+
+def recommend_serving(summary, server_cpus):
+    """
+    Sizes gunicorn gthread workers/threads from a load-test summary.
+    Workers follow the CPU count; threads cover the observed in-flight
+    requests (most of which wait on Postgres) with HEADROOM to spare.
+    """
+    workers = 2 * server_cpus + 1
+    needed = max(1.0, summary["mean_concurrency"] * HEADROOM)
+    threads = max(2, min(MAX_THREADS, math.ceil(needed / workers)))
+    return {
+        "worker_class": "gthread",
+        "workers": workers,
+        "threads": threads,
+        "server_cpus": server_cpus,
+        "source": {
+            "users": summary["users"],
+            "rps": summary["rps"],
+            "mean_concurrency": summary["mean_concurrency"],
+        },
+    }
+
+
+def write_profile(profile, path):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(profile, fh, indent=2)
+    os.replace(tmp, path)
@@ -0,0 +1,27 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from core.track_archive import archive_tracks
+
+class Command(BaseCommand):
+    help = 'Moves voyage tracks older than N days into compressed per-vessel-per-day archive segments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=None,
+                            help='Archive tracks older than N days (default: TRACK_ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--keep-raw', action='store_true',
+                            help='Leave the archived rows in voyage_tracks (retention drops them later)')
+
+    def handle(self, *args, **options):
+        try:
+            stats = archive_tracks(
+                options['older_than'],
+                delete=not options['keep_raw'],
+                log=self.stdout.write,
+            )
+        except ImproperlyConfigured as exc:
+            raise CommandError(f"{exc} with --keep-raw") from None
+        per_point = stats['bytes'] / stats['points'] if stats['points'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {stats['points']} points into {stats['segments']} segments "
+            f"({stats['bytes']} bytes, {per_point:.1f} bytes/point)."
+        ))
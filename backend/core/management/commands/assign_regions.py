@@ -0,0 +1,82 @@
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from core.analytics import rebuild_voyage_stats, refresh_fleet_composition
+from core.dashboard import refresh_stats
+from core.models import Notification, Port, RiskZone, Vessel, Voyage
+from core.regions import REGION_NAMES, UNASSIGNED, region_ids, region_of, region_of_location
+
+class Command(BaseCommand):
+    help = 'Backfills trade region ids on ports, risk zones, vessels, voyages and notifications, then rebuilds the rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        ports = list(Port.objects.all())
+        for port in ports:
+            port.region_id = region_of_location(port.location)
+        Port.objects.bulk_update(ports, ['region_id'], batch_size=1000)
+
+        zones = list(RiskZone.objects.all())
+        for zone in zones:
+            zone.region_id = region_of(zone.latitude, zone.longitude)
+        RiskZone.objects.bulk_update(zones, ['region_id'], batch_size=1000)
+        self.stdout.write(f"Tagged {len(ports)} ports and {len(zones)} risk zones.")
+
+        # Vessels: one UPDATE per region per batch
+        rows = Vessel.objects.values_list('id', 'last_position_lat', 'last_position_lon').iterator(chunk_size=batch_size)
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                total += self._tag_vessels(batch)
+                batch = []
+                self.stdout.write(f"Tagged {total} vessels...")
+        total += self._tag_vessels(batch)
+
+        def port_region(field):
+            return Coalesce(
+                Subquery(Port.objects.filter(pk=OuterRef(field)).values('region_id')[:1]), UNASSIGNED
+            )
+
+        voyages = Voyage.objects.update(region_from=port_region('port_from'), region_to=port_region('port_to'))
+
+        notifications = Notification.objects.filter(vessel__isnull=False).update(
+            region_id=Coalesce(
+                Subquery(Vessel.objects.filter(pk=OuterRef('vessel')).values('region_id')[:1]), UNASSIGNED
+            )
+        )
+        # Congestion alerts name their port instead of a vessel
+        for port in ports:
+            if port.region_id != UNASSIGNED:
+                notifications += Notification.objects.filter(
+                    vessel__isnull=True, message__startswith=f"CRITICAL: {port.name} congestion"
+                ).update(region_id=port.region_id)
+
+        rebuild_voyage_stats()
+        refresh_fleet_composition()
+        refresh_stats()
+
+        counts = Vessel.objects.values_list('region_id').annotate(count=Count('id')).order_by('region_id')
+        summary = ", ".join(f"{REGION_NAMES.get(region_id, 'Unassigned')}: {count}" for region_id, count in counts)
+        self.stdout.write(self.style.SUCCESS(
+            f'Tagged {total} vessels ({summary}), {voyages} voyages and {notifications} notifications.'
+        ))
+
+    def _tag_vessels(self, batch):
+        if not batch:
+            return 0
+        ids, lats, lons = zip(*batch)
+        lats = [float('nan') if v is None else v for v in lats]
+        lons = [float('nan') if v is None else v for v in lons]
+        by_region = defaultdict(list)
+        for vessel_id, region_id in zip(ids, region_ids(lats, lons).tolist()):
+            by_region[region_id].append(vessel_id)
+        for region_id, vessel_ids in by_region.items():
+            Vessel.objects.filter(id__in=vessel_ids).update(region_id=region_id)
+        return len(batch)
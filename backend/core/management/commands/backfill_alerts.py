@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from core.alerts import category_of, classify, parse_message, rebuild_alert_stats
+from core.models import Notification, Port
+
+class Command(BaseCommand):
+    help = 'Fills severity, category, port and wait time on notifications written before those columns existed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--search', action='store_true',
+            help='Also fill the full-text search vector on rows that lack one (PostgreSQL)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        port_ids = dict(Port.objects.values_list('name', 'id'))
+        port_regions = dict(Port.objects.values_list('id', 'region_id'))
+
+        total = 0
+        last_id = 0
+        while True:
+            batch = list(
+                Notification.objects.filter(severity__isnull=True, id__gt=last_id)
+                .only('id', 'message', 'type', 'region_id', 'vessel_id')
+                .order_by('id')[:batch_size]
+            )
+            if not batch:
+                break
+            for n in batch:
+                n.severity = classify(n.message)
+                n.category = category_of(n.type)
+                n.port_id, n.wait_hours = parse_message(n.message, port_ids)
+                if not n.region_id and n.vessel_id is None and n.port_id:
+                    n.region_id = port_regions.get(n.port_id, 0)
+            Notification.objects.bulk_update(
+                batch, ['severity', 'category', 'port', 'wait_hours', 'region_id'], batch_size=1000
+            )
+            total += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f"Backfilled {total} notifications...")
+
+        rows = rebuild_alert_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Backfilled alert fields on {total} notifications and rebuilt {rows} alert stats rows.'
+        ))
+        if options['search']:
+            self._backfill_search(batch_size)
+
+    def _backfill_search(self, batch_size):
+        if connection.vendor != 'postgresql':
+            self.stdout.write("Search vectors are PostgreSQL only; other backends index in memory.")
+            return
+        total = 0
+        last_id = 0
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    UPDATE notifications
+                    SET search_vector = notification_search_vector(message, vessel_id, port_id)
+                    WHERE id IN (
+                        SELECT id FROM notifications
+                        WHERE search_vector IS NULL AND id > %s ORDER BY id LIMIT %s
+                    )
+                    RETURNING id
+                    """,
+                    [last_id, batch_size],
+                )
+                ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                break
+            total += len(ids)
+            last_id = max(ids)
+            self.stdout.write(f"Indexed {total} notifications...")
+        self.stdout.write(self.style.SUCCESS(f'Filled search vectors on {total} notifications.'))
@@ -0,0 +1,52 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core import benchmarks
+from core.schema import create_unmanaged_tables
+
+class Command(BaseCommand):
+    help = 'Seeds a dataset tier and benchmarks every API route (p50/p95 latency and SQL query counts)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tier', choices=sorted(benchmarks.TIERS), default='small')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per route')
+        parser.add_argument('--reseed', action='store_true', help='Regenerate the tier even if it is present')
+        parser.add_argument('--skip-seed', action='store_true', help='Benchmark whatever data is loaded')
+        parser.add_argument('--output-dir', default=str(settings.BASE_DIR / 'bench_results'))
+        parser.add_argument('--compare', default=None, help='Baseline JSON report to diff against')
+        parser.add_argument('--enforce-budgets', action='store_true',
+                            help='Exit non-zero when a route exceeds its SQL query budget or regresses')
+        parser.add_argument('--i-know', action='store_true',
+                            help='Run against a non-local database (seeding replaces synthetic vessels and alerts)')
+
+    def handle(self, *args, **options):
+        if not benchmarks.is_local_database() and not options['i_know']:
+            raise CommandError(
+                "bench_api writes and deletes benchmark data; DATABASE_URL is not a local database. "
+                "Pass --i-know to run it anyway."
+            )
+
+        created = create_unmanaged_tables()
+        if created:
+            self.stdout.write(f"Created missing tables: {', '.join(created)}")
+
+        if not options['skip_seed']:
+            benchmarks.seed_tier(options['tier'], seed=options['seed'], reseed=options['reseed'],
+                                 log=self.stdout.write)
+
+        report = benchmarks.run_benchmarks(options['tier'], iterations=options['iterations'],
+                                           log=self.stdout.write)
+        path = benchmarks.save_report(report, options['output_dir'])
+        self.stdout.write(self.style.SUCCESS(f"Saved {len(report['results'])} results to {path}"))
+
+        problems = [f"{r['url']}: {r['queries']} queries (budget {r['query_budget']})"
+                    for r in report['results'] if r['over_budget']]
+        if options['compare']:
+            with open(options['compare']) as fh:
+                problems += benchmarks.compare_reports(json.load(fh), report)
+
+        for line in problems:
+            self.stdout.write(self.style.WARNING(f"⚠️  {line}"))
+        if problems and options['enforce_budgets']:
+            raise CommandError(f"{len(problems)} benchmark regression(s)")
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from core import benchmarks, query_plans
+
+class Command(BaseCommand):
+    help = 'EXPLAINs the SQL behind every API route and fails on sequential scans over large tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-rows', type=int, default=10000,
+                            help='Only flag scans of tables with at least this many rows (default: 10000)')
+        parser.add_argument('--route', action='append', default=None,
+                            help='Limit the check to these route patterns, e.g. alerts/ (repeatable)')
+
+    def handle(self, *args, **options):
+        client = benchmarks.bench_client()
+        size_cache = {}
+        failures = 0
+
+        for method, route, url in benchmarks.bench_urls():
+            if method != "GET" or (options['route'] and route not in options['route']):
+                continue
+            reset_queries()
+            with CaptureQueriesContext(connection) as captured:
+                benchmarks.send(client, method, url)
+
+            violations = query_plans.check_queries(
+                route, captured.captured_queries, options['min_rows'], size_cache
+            )
+            if not violations:
+                self.stdout.write(f"✅ {url} ({len(captured.captured_queries)} queries)")
+                continue
+            failures += len(violations)
+            for table, rows, sql in violations:
+                self.stdout.write(self.style.ERROR(f"❌ {url}: Seq Scan on {table} (~{rows} rows)"))
+                self.stdout.write(f"   {sql[:300]}")
+
+        if failures:
+            raise CommandError(f"{failures} sequential scan(s) on large tables")
+        self.stdout.write(self.style.SUCCESS("No sequential scans on large tables."))
@@ -1,11 +1,27 @@
 import random
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core.enrichment import run_enrichment_batch
 from core.models import Vessel
 
 class Command(BaseCommand):
     help = 'Enriches vessel data with realistic dummy values where data is missing'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--remote', action='store_true',
+            help='Look vessels up at ENRICHMENT_API_URL (cached) instead of filling dummy values'
+        )
+        parser.add_argument('--batch-size', type=int, default=None)
+
     def handle(self, *args, **kwargs):
+        if kwargs['remote']:
+            if not settings.ENRICHMENT_API_URL:
+                raise CommandError("ENRICHMENT_API_URL is not set")
+            counts = run_enrichment_batch(kwargs['batch_size'], log=self.stdout.write)
+            self.stdout.write(self.style.SUCCESS(f"Enrichment pass done: {counts}"))
+            return
+
         self.stdout.write("Starting vessel enrichment...")
         
         # Real maritime data lists for simulation
@@ -0,0 +1,82 @@
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from django.core.management.base import BaseCommand
+
+FLAGS = ['Panama', 'Liberia', 'Marshall Islands', 'Singapore', 'Malta', 'Bahamas']
+TYPES = ['Bulk Carrier', 'Container Ship', 'Oil Tanker', 'General Cargo', 'LNG Carrier']
+OPERATORS = ['Maersk Line', 'MSC', 'CMA CGM', 'Hapag-Lloyd', 'Evergreen Marine', 'ONE Network']
+
+
+def fixture_vessel(mmsi):
+    """Stable details for an MMSI, so repeated lookups agree."""
+    rng = random.Random(mmsi)
+    return {
+        "mmsi": mmsi,
+        "imo": f"IMO{rng.randint(9000000, 9999999)}",
+        "flag": rng.choice(FLAGS),
+        "type": rng.choice(TYPES),
+        "operator": rng.choice(OPERATORS),
+    }
+
+
+def fixture_handler(latency=0.0, fail_rate=0.0, missing_rate=0.1):
+    """Request handler class for the fixture server (latency in seconds)."""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, as a real API would
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            mmsi = parse_qs(url.query).get('mmsi', [''])[0]
+            if latency:
+                time.sleep(latency)
+            if url.path != '/vessels':
+                return self._send(404, {"error": "Not found"})
+            if fail_rate and random.random() < fail_rate:
+                return self._send(503, {"error": "Try again"}, {"Retry-After": "0"})
+            # Vessels without an MMSI (and a stable share of the rest) are unknown
+            if not mmsi or random.Random(f"missing:{mmsi}").random() < missing_rate:
+                return self._send(404, {"error": "Vessel not found"})
+            return self._send(200, fixture_vessel(mmsi))
+
+        def _send(self, status, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class Command(BaseCommand):
+    help = 'Serves a local stand-in for the vessel enrichment source (point ENRICHMENT_API_URL at it)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency-ms', type=float, default=0, help='Delay added to every response')
+        parser.add_argument('--fail-rate', type=float, default=0, help='Fraction of requests answered 503')
+        parser.add_argument(
+            '--missing-rate', type=float, default=0.1, help='Fraction of MMSIs the source does not know'
+        )
+
+    def handle(self, *args, **options):
+        handler = fixture_handler(options['latency_ms'] / 1000, options['fail_rate'], options['missing_rate'])
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), handler)
+        self.stdout.write(self.style.SUCCESS(
+            f"Enrichment fixture on http://127.0.0.1:{options['port']} (Ctrl+C to stop)"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,48 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.core.management.base import BaseCommand, CommandError
+from core.synthetic import generate_fleet, clear_synthetic
+
+class Command(BaseCommand):
+    help = 'Generates a deterministic synthetic fleet (vessels, voyages, tracks) for load and capacity testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vessels', type=int, default=1000)
+        parser.add_argument('--points', type=int, default=144, help='Track points per vessel (default: 144)')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--interval', type=int, default=10, help='Minutes between reports (default: 10)')
+        parser.add_argument('--end', default=None,
+                            help='ISO timestamp of the last report (default: today 00:00 UTC)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Vessels per load transaction')
+        parser.add_argument('--reset', action='store_true', help='Delete previously generated vessels first')
+
+    def handle(self, *args, **options):
+        if options['vessels'] < 1 or options['points'] < 1:
+            raise CommandError("--vessels and --points must be positive")
+
+        end = None
+        if options['end']:
+            end = datetime.fromisoformat(options['end'].replace("Z", "+00:00"))
+            if end.tzinfo is None:
+                end = end.replace(tzinfo=dt_timezone.utc)
+
+        if options['reset']:
+            self.stdout.write(f"Removed {clear_synthetic()} rows of previously generated data.")
+
+        started = time.monotonic()
+        try:
+            vessels, tracks = generate_fleet(
+                options['vessels'], options['points'],
+                seed=options['seed'],
+                interval_minutes=options['interval'],
+                end=end,
+                chunk_size=options['chunk_size'],
+                log=self.stdout.write,
+            )
+        except ValueError as exc:
+            raise CommandError(f"{exc}; run again with --reset to replace it") from None
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {vessels} vessels and {tracks} track points in {elapsed:.1f}s '
+            f'({tracks / elapsed if elapsed else 0:,.0f} points/s).'
+        ))
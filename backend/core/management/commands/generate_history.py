@@ -4,6 +4,7 @@ from datetime import timedelta
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from core.models import Vessel, Voyage, VoyageTrack, Port
+from core.rollups import record_track_points
 
 class Command(BaseCommand):
     help = 'Generates realistic historical tracks for ALL vessels'
@@ -45,6 +46,7 @@ class Command(BaseCommand):
             if current_lat == 0 and current_lon == 0:
                 continue
 
+            tracks = []
             for i in range(20):
                 time_offset = timedelta(minutes=60 * i)
                 timestamp = timezone.now() - time_offset
@@ -53,14 +55,19 @@ class Command(BaseCommand):
                 lat_offset = (i * 0.05) + (math.sin(i * 0.2) * 0.02)
                 lon_offset = (i * 0.05) + (math.cos(i * 0.2) * 0.02)
 
-                VoyageTrack.objects.create(
+                tracks.append(VoyageTrack(
                     vessel=vessel,
                     latitude=current_lat - lat_offset,
                     longitude=current_lon - lon_offset,
                     speed=random.uniform(10, 18),
                     course=random.uniform(0, 360),
                     timestamp=timestamp
-                )
+                ))
+
+            VoyageTrack.objects.bulk_create(tracks)
+            record_track_points(
+                (vessel.id, t.timestamp, t.latitude, t.longitude, t.speed, t.course) for t in tracks
+            )
             
             count += 1
             if count % 10 == 0:
@@ -0,0 +1,98 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core import ais_import, metrics
+from core.ingest import ingest_positions
+
+class Command(BaseCommand):
+    help = 'Bulk-imports historical AIS files (CSV or raw NMEA AIVDM) into vessels and voyage_tracks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='CSV or NMEA files to import')
+        parser.add_argument('--format', choices=['auto', 'csv', 'nmea'], default='auto')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                            help='Parser processes (default: CPU count)')
+        parser.add_argument('--chunk-lines', type=int, default=50000,
+                            help='Lines per parse/load batch (default: 50000)')
+        parser.add_argument('--assume-time', default=None,
+                            help='ISO timestamp for NMEA lines without a tag block or time prefix')
+        parser.add_argument('--restart', action='store_true', help='Ignore any saved checkpoint')
+
+    def handle(self, *args, **options):
+        assume_time = None
+        if options['assume_time']:
+            assume_time = datetime.fromisoformat(options['assume_time'].replace("Z", "+00:00")).timestamp()
+
+        # Workers are forked: drop the parent's DB connection so none of them inherits it
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            for path in options['paths']:
+                if not os.path.isfile(path):
+                    raise CommandError(f"No such file: {path}")
+                self._import_file(pool, path, options, assume_time)
+
+    def _import_file(self, pool, path, options, assume_time):
+        fmt = options['format'] if options['format'] != 'auto' else ais_import.detect_format(path)
+
+        state = None if options['restart'] else ais_import.load_checkpoint(path)
+        offset = state['offset'] if state else 0
+        total_rows = state['rows'] if state else 0
+        if state:
+            self.stdout.write(f"↩️  Resuming {path} at byte {offset} ({total_rows} rows already loaded)")
+        else:
+            self.stdout.write(f"📥 Importing {path} as {fmt.upper()}")
+
+        chunks = ais_import.read_chunks(path, fmt, offset, options['chunk_lines'])
+        in_flight = deque()
+        max_in_flight = max(1, options['workers']) * 2
+        started = time.monotonic()
+        loaded = rejected = 0
+
+        def submit_next():
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            end_offset, header, lines = chunk
+            in_flight.append((end_offset, pool.submit(ais_import.parse_chunk, fmt, header, lines, assume_time)))
+            return True
+
+        while len(in_flight) < max_in_flight and submit_next():
+            pass
+
+        # Results are loaded strictly in file order so the checkpoint offset
+        # always marks a prefix of the file that is fully committed.
+        while in_flight:
+            end_offset, future = in_flight.popleft()
+            submit_next()
+            positions, names, chunk_rejected = future.result()
+
+            positions = [
+                (mmsi, datetime.fromtimestamp(ts, tz=dt_timezone.utc), lat, lon, speed, course)
+                for mmsi, ts, lat, lon, speed, course in positions
+            ]
+            loaded += ingest_positions(positions, names, source="import", log=self.stdout.write)
+            rejected += chunk_rejected
+            metrics.inc("ingest_rejected_total", chunk_rejected, source="import")
+            total_rows += len(positions)
+            ais_import.save_checkpoint(path, end_offset, total_rows)
+
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f"  {loaded} rows loaded, {rejected} rejected, "
+                f"{loaded / elapsed if elapsed else 0:,.0f} rows/s"
+            )
+
+        elapsed = time.monotonic() - started
+        if os.path.exists(ais_import.checkpoint_path(path)):
+            os.remove(ais_import.checkpoint_path(path))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {path}: {loaded} rows in {elapsed:.1f}s "
+            f"({loaded / elapsed if elapsed else 0:,.0f} rows/s), {rejected} rejected."
+        ))
@@ -0,0 +1,57 @@
+import json
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core import loadtest
+
+class Command(BaseCommand):
+    help = 'Simulates N browsers polling a running API and reports throughput and p50/p95/p99 per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000/api')
+        parser.add_argument('--users', type=int, default=50, help='Concurrent browsers (default: 50)')
+        parser.add_argument('--duration', type=int, default=120, help='Seconds to run (default: 120)')
+        parser.add_argument('--ramp-up', type=int, default=10, help='Seconds to start all browsers over')
+        parser.add_argument('--username', default=os.environ.get('LOADTEST_USERNAME', 'bench_admin'))
+        parser.add_argument('--password', default=os.environ.get('LOADTEST_PASSWORD', 'bench-password-1'))
+        parser.add_argument('--server-cpus', type=int, default=os.cpu_count() or 1,
+                            help='CPUs of the server under test, used for the worker recommendation')
+        parser.add_argument('--output', default=None, help='Write the full JSON summary here')
+        parser.add_argument('--write-profile', action='store_true',
+                            help=f'Save the recommendation to {settings.SERVING_PROFILE} for gunicorn.conf.py')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"🚢 {options['users']} browsers against {options['base_url']} for {options['duration']}s"
+        )
+        summary = loadtest.run_load(
+            options['base_url'], options['users'], options['duration'], options['ramp_up'],
+            {"username": options['username'], "password": options['password']},
+            log=self.stdout.write,
+        )
+        if not summary['requests'] or summary['endpoints'].get('/login/', {}).get('errors') == summary['users']:
+            raise CommandError("No browser could log in; check --base-url and credentials")
+
+        self.stdout.write(f"\n{'endpoint':20} {'reqs':>7} {'err':>5} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for endpoint, row in summary['endpoints'].items():
+            self.stdout.write(
+                f"{endpoint:20} {row['requests']:7} {row['errors']:5} {row['rps']:7.2f} "
+                f"{row['p50_ms']:6.0f}ms {row['p95_ms']:6.0f}ms {row['p99_ms']:6.0f}ms"
+            )
+        self.stdout.write(
+            f"\nTotal {summary['requests']} requests, {summary['rps']} req/s, "
+            f"{summary['mean_concurrency']} requests in flight on average"
+        )
+
+        profile = loadtest.recommend_serving(summary, options['server_cpus'])
+        summary['recommendation'] = profile
+        self.stdout.write(self.style.SUCCESS(
+            f"Recommended: {profile['workers']} gthread workers x {profile['threads']} threads"
+        ))
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(summary, fh, indent=2)
+        if options['write_profile']:
+            loadtest.write_profile(profile, settings.SERVING_PROFILE)
+            self.stdout.write(f"💾 Serving profile saved to {settings.SERVING_PROFILE}")
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.partitions import is_partitioned, ensure_partitions, drop_expired_partitions
+from core.rollups import prune_rollups
+
+class Command(BaseCommand):
+    help = 'Pre-creates future voyage_tracks partitions and drops partitions and rollups past retention'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ahead', type=int, default=None,
+                            help='Days of partitions to keep pre-created (default: TRACK_PARTITION_PRECREATE_DAYS)')
+        parser.add_argument('--retention-days', type=int, default=None,
+                            help='Drop partitions entirely older than this (default: TRACK_RETENTION_DAYS, 0 keeps all)')
+        parser.add_argument('--dry-run', action='store_true', help='Only print what would change')
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            raise CommandError("voyage_tracks is not a partitioned PostgreSQL table. Run `manage.py migrate` first.")
+
+        dry_run = options['dry_run']
+        prefix = "[dry-run] " if dry_run else ""
+
+        created = ensure_partitions(options['ahead'], dry_run=dry_run)
+        for name, start, end, moved in created:
+            moved_note = f", moved {moved} rows out of the default partition" if moved else ""
+            self.stdout.write(f"{prefix}Created {name} [{start:%Y-%m-%d} → {end:%Y-%m-%d}){moved_note}")
+
+        dropped = drop_expired_partitions(options['retention_days'], dry_run=dry_run)
+        for name, upper in dropped:
+            self.stdout.write(f"{prefix}Dropped {name} (ended {upper:%Y-%m-%d})")
+
+        if not dry_run:
+            for resolution, count in prune_rollups().items():
+                self.stdout.write(f"Pruned {count} rollup buckets at {resolution}s resolution")
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}Partitions: {len(created)} created, {len(dropped)} dropped.'
+        ))
@@ -0,0 +1,26 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.analytics import rebuild_flow_stats, rebuild_voyage_stats, refresh_fleet_composition
+
+class Command(BaseCommand):
+    help = 'Rebuilds the analytics rollups (daily voyage stats, trade-lane flows and fleet composition) from source tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Only rebuild dates in the last N days (default: all history)')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['days'] is not None:
+            since = (timezone.now() - timedelta(days=options['days'])).date()
+
+        rows = rebuild_voyage_stats(since)
+        flows = rebuild_flow_stats(since)
+        fleet = refresh_fleet_composition()
+
+        scope = f"since {since}" if since else "for all history"
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {rows} daily voyage rows and {flows} flow rows {scope}, '
+            f'and {len(fleet)} fleet composition rows.'
+        ))
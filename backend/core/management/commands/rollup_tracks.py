@@ -0,0 +1,20 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.rollups import rebuild_rollups
+
+class Command(BaseCommand):
+    help = 'Rebuilds track rollups from raw voyage_tracks (backfill for history ingested before rollups existed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help='Rebuild the last N days (default: 7)')
+        parser.add_argument('--batch-size', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days'])
+
+        # Days already in the cold archive have no raw rows to rebuild from;
+        # their rollups are kept and the rebuild starts at the watermark
+        total, start = rebuild_rollups(since, batch_size=options['batch_size'], log=self.stdout.write)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rollups from {total} track points since {start:%Y-%m-%d %H:%M}.'))
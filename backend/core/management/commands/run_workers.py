@@ -0,0 +1,57 @@
+import signal
+import threading
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core import jobs, tasks  # noqa: F401  (tasks registers the job handlers)
+from core.scheduler import PeriodicScheduler, tick
+
+class Command(BaseCommand):
+    help = 'Runs background jobs (enrichment, UNCTAD refresh, rollups, retention) from the jobs table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=None,
+                            help='Worker threads (default: JOB_WORKER_CONCURRENCY)')
+        parser.add_argument('--kinds', nargs='+', default=None, help='Only run these job kinds')
+        parser.add_argument('--once', action='store_true', help='Run every due job, then exit')
+        parser.add_argument('--no-scheduler', action='store_true',
+                            help='Only run queued jobs; leave queuing periodic jobs to other processes')
+
+    def handle(self, *args, **options):
+        kinds = options['kinds']
+        unknown = set(kinds or []) - set(jobs.REGISTRY)
+        if unknown:
+            raise CommandError(f"Unknown job kinds: {', '.join(sorted(unknown))}")
+        concurrency = options['concurrency'] or settings.JOB_WORKER_CONCURRENCY
+
+        scheduler = None
+        if options['once']:
+            if not options['no_scheduler']:
+                tick(kinds=kinds)
+        elif not options['no_scheduler']:
+            scheduler = PeriodicScheduler(kinds, log=self.stdout.write).start()
+
+        stop = threading.Event()
+        if not options['once']:
+            def shutdown(signum, frame):
+                self.stdout.write("Stopping after the current jobs...")
+                stop.set()
+            signal.signal(signal.SIGTERM, shutdown)
+            signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write(f"🚀 {concurrency} job workers running {', '.join(kinds or jobs.REGISTRY)}")
+        threads = [
+            threading.Thread(
+                target=jobs.work, args=(stop, kinds, options['once'], self.stdout.write), daemon=True
+            )
+            for _ in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        # Join with a timeout so signals are still delivered to the main thread
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(0.5)
+
+        if scheduler:
+            scheduler.stop()
+        self.stdout.write(self.style.SUCCESS("Job workers stopped."))
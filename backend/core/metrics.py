@@ -0,0 +1,364 @@
+import bisect
+import fcntl
+import mmap
+import os
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+
+# -------------------------
+# REQUEST & INGEST METRICS
+# -------------------------
+# Every metric is a plain counter keyed by its Prometheus series string,
+# e.g. 'http_requests_total{route="/api/alerts/",method="GET",status="200"}'.
+# Histograms are stored as one counter per bucket plus _sum/_count and are
+# made cumulative only when rendered, so an observation costs three adds.
+
+PREFIX = "maritime_"
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+BATCH_BUCKETS_MS = (10, 50, 100, 500, 1000, 5000, 30000)
+
+# Seconds of per-second request counts kept for the throughput figure
+RATE_WINDOW = 60
+
+METRICS = {
+    "http_requests_total": ("counter", "HTTP requests by route, method and status"),
+    "http_request_duration_ms": ("histogram", "Request latency in milliseconds"),
+    "http_db_queries_total": ("counter", "SQL queries executed while serving requests"),
+    "http_db_time_ms_total": ("counter", "Milliseconds spent in SQL while serving requests"),
+    "http_response_bytes_total": ("counter", "Response body bytes sent"),
+    "ingest_positions_total": ("counter", "AIS position reports written to voyage_tracks"),
+    "ingest_rejected_total": ("counter", "AIS reports rejected while parsing or validating"),
+    "ingest_errors_total": ("counter", "AIS reports that failed to write"),
+    "ingest_batch_duration_ms": ("histogram", "Time to write one ingest batch in milliseconds"),
+}
+
+BUCKETS = {
+    "http_request_duration_ms": LATENCY_BUCKETS_MS,
+    "ingest_batch_duration_ms": BATCH_BUCKETS_MS,
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def series(name, **labels):
+    if not labels:
+        return name
+    body = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return f"{name}{{{body}}}"
+
+
+class LocalStore:
+    """
+    In-process store: counters in a dict and a ring of per-second request
+    counts. Numbers only cover the current worker process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._ring = [[0, 0] for _ in range(RATE_WINDOW)]  # [second, count]
+
+    def inc(self, key, amount=1):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def tick(self, second):
+        slot = self._ring[second % RATE_WINDOW]
+        with self._lock:
+            if slot[0] != second:
+                slot[0], slot[1] = second, 0
+            slot[1] += 1
+
+    def rate(self, window, now=None):
+        """Mean requests/second over the last `window` complete seconds."""
+        now = int(now or time.time())
+        first = now - window
+        with self._lock:
+            total = sum(count for second, count in self._ring if first <= second < now)
+        return total / window
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counters)
+
+
+class MmapStore:
+    """
+    Store shared by every process on the host through one mmap'd file.
+
+    Layout: a header, an append-only registry of series keys, then
+    WORKER_SLOTS slots. Each slot holds a pid, a float64 counter per key and
+    a per-second request ring. A process claims a slot once (under an
+    exclusive file lock) and afterwards writes only to its own slot, so
+    increments never contend across workers. Readers sum all slots.
+
+    A slot left by a dead worker is reused with its counters intact, which
+    keeps totals monotonic when gunicorn recycles workers.
+    """
+
+    MAGIC = 0x4D524D31  # "MRM1"
+    KEY_CAPACITY = 4096
+    KEY_BYTES = 192
+    WORKER_SLOTS = 64
+    HEADER_BYTES = 64
+    SLOT_HEADER = 2  # int64 pid, int64 reserved
+
+    def __init__(self, path=None):
+        self.path = path or settings.METRICS_MMAP_PATH
+        self._lock = threading.Lock()
+        self._pid = None
+        self._keys = {}
+        self._key_list = []
+        self._attach()
+
+    # ---- layout ----
+
+    @property
+    def _registry_offset(self):
+        return self.HEADER_BYTES
+
+    @property
+    def _slots_offset(self):
+        return self.HEADER_BYTES + self.KEY_CAPACITY * self.KEY_BYTES
+
+    @property
+    def _slot_words(self):
+        return self.SLOT_HEADER + self.KEY_CAPACITY + RATE_WINDOW * 2
+
+    @property
+    def _size(self):
+        return self._slots_offset + self.WORKER_SLOTS * self._slot_words * 8
+
+    def _attach(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            header = os.pread(fd, 16, 0)
+            magic = int.from_bytes(header[:8], "little") if len(header) == 16 else 0
+            if magic != self.MAGIC or os.fstat(fd).st_size != self._size:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, self._size)
+                os.pwrite(fd, self.MAGIC.to_bytes(8, "little") + (0).to_bytes(8, "little"), 0)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            self._map = mmap.mmap(fd, self._size)
+        finally:
+            os.close(fd)
+
+        self._header = np.ndarray((2,), dtype=np.int64, buffer=self._map, offset=0)
+        self._registry = np.ndarray(
+            (self.KEY_CAPACITY, self.KEY_BYTES), dtype=np.uint8, buffer=self._map, offset=self._registry_offset
+        )
+        slots = np.ndarray(
+            (self.WORKER_SLOTS, self._slot_words), dtype=np.int64, buffer=self._map, offset=self._slots_offset
+        )
+        self._pids = slots[:, 0]
+        # Counters are float64 sharing the same int64-aligned words
+        self._counters = slots[:, self.SLOT_HEADER:self.SLOT_HEADER + self.KEY_CAPACITY].view(np.float64)
+        self._rings = slots[:, self.SLOT_HEADER + self.KEY_CAPACITY:].reshape(self.WORKER_SLOTS, RATE_WINDOW, 2)
+
+    def _locked(self):
+        fd = os.open(self.path, os.O_RDWR)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        return fd
+
+    def _unlock(self, fd):
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    @staticmethod
+    def _alive(pid):
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _slot(self):
+        """Index of this process's slot, claimed on first use after a fork."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return self._slot_index
+        fd = self._locked()
+        try:
+            free = [i for i, owner in enumerate(self._pids) if owner == 0 or not self._alive(owner)]
+            if not free:
+                raise RuntimeError(f"All {self.WORKER_SLOTS} metrics slots in {self.path} are in use")
+            self._slot_index = free[0]
+            self._pids[self._slot_index] = pid
+            self._pid = pid
+        finally:
+            self._unlock(fd)
+        return self._slot_index
+
+    # ---- key registry ----
+
+    def _sync_keys(self):
+        for index in range(len(self._key_list), int(self._header[1])):
+            key = bytes(self._registry[index]).rstrip(b"\0").decode("utf-8")
+            self._keys[key] = index
+            self._key_list.append(key)
+
+    def _key_index(self, key):
+        index = self._keys.get(key)
+        if index is not None:
+            return index
+        encoded = key.encode("utf-8")
+        if len(encoded) > self.KEY_BYTES:
+            return None
+        fd = self._locked()
+        try:
+            self._sync_keys()
+            if key not in self._keys:
+                count = int(self._header[1])
+                if count >= self.KEY_CAPACITY:
+                    return None
+                self._registry[count, :len(encoded)] = np.frombuffer(encoded, dtype=np.uint8)
+                self._header[1] = count + 1
+                self._sync_keys()
+        finally:
+            self._unlock(fd)
+        return self._keys[key]
+
+    # ---- store interface ----
+
+    def inc(self, key, amount=1):
+        index = self._key_index(key)
+        if index is None:
+            return  # registry full or key too long: drop rather than fail the request
+        slot = self._slot()
+        with self._lock:
+            self._counters[slot, index] += amount
+
+    def tick(self, second):
+        ring = self._rings[self._slot(), second % RATE_WINDOW]
+        with self._lock:
+            if ring[0] != second:
+                ring[0], ring[1] = second, 0
+            ring[1] += 1
+
+    def rate(self, window, now=None):
+        now = int(now or time.time())
+        seconds, counts = self._rings[..., 0], self._rings[..., 1]
+        mask = (seconds >= now - window) & (seconds < now)
+        return float(counts[mask].sum()) / window
+
+    def snapshot(self):
+        self._sync_keys()
+        totals = self._counters[:, :len(self._key_list)].sum(axis=0)
+        return {key: float(value) for key, value in zip(self._key_list, totals) if value}
+
+
+STORES = {
+    "local": LocalStore,
+    "mmap": MmapStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = STORES[settings.METRICS_STORE]()
+    return _store
+
+
+def inc(name, amount=1, **labels):
+    get_store().inc(series(name, **labels), amount)
+
+
+def observe(name, value, **labels):
+    store = get_store()
+    buckets = BUCKETS[name]
+    index = bisect.bisect_left(buckets, value)
+    le = buckets[index] if index < len(buckets) else "+Inf"
+    store.inc(series(f"{name}_bucket", **labels, le=le))
+    store.inc(series(f"{name}_sum", **labels), value)
+    store.inc(series(f"{name}_count", **labels))
+
+
+def record_request(route, method, status, duration_ms, queries, sql_ms, size):
+    store = get_store()
+    store.tick(int(time.time()))
+    store.inc(series("http_requests_total", route=route, method=method, status=status))
+    observe("http_request_duration_ms", duration_ms, route=route)
+    if queries:
+        store.inc(series("http_db_queries_total", route=route), queries)
+        store.inc(series("http_db_time_ms_total", route=route), sql_ms)
+    if size:
+        store.inc(series("http_response_bytes_total", route=route), size)
+
+
+def requests_per_second(window=10):
+    return get_store().rate(window)
+
+
+# -------------------------
+# PROMETHEUS TEXT FORMAT
+# -------------------------
+
+def _family(key):
+    name = key.split("{", 1)[0]
+    for suffix in ("_bucket", "_sum", "_count"):
+        if name.endswith(suffix) and name[: -len(suffix)] in METRICS:
+            return name[: -len(suffix)]
+    return name
+
+
+def _split_le(key):
+    """'x_bucket{a="1",le="50"}' -> ('a="1"', '50')"""
+    head, le = key.rsplit('le="', 1)
+    labels = head.split("{", 1)[1].rstrip(",")
+    return labels, le.rstrip('"}')
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else f"{value:.3f}"
+
+
+def render_prometheus():
+    snapshot = get_store().snapshot()
+    families = {}
+    for key, value in snapshot.items():
+        families.setdefault(_family(key), []).append((key, value))
+
+    lines = []
+    for family in sorted(families):
+        kind, help_text = METRICS.get(family, ("untyped", family))
+        lines.append(f"# HELP {PREFIX}{family} {help_text}")
+        lines.append(f"# TYPE {PREFIX}{family} {kind}")
+        rows = sorted(families[family])
+
+        if kind != "histogram":
+            lines.extend(f"{PREFIX}{key} {_number(value)}" for key, value in rows)
+            continue
+
+        # Cumulate bucket counts per label set
+        buckets = {}
+        for key, value in rows:
+            if key.startswith(f"{family}_bucket"):
+                labels, le = _split_le(key)
+                buckets.setdefault(labels, {})[le] = value
+        for labels, counts in buckets.items():
+            running = 0
+            for le in [str(b) for b in BUCKETS[family]] + ["+Inf"]:
+                running += counts.get(le, 0)
+                joined = f'{labels},le="{le}"' if labels else f'le="{le}"'
+                lines.append(f"{PREFIX}{family}_bucket{{{joined}}} {_number(running)}")
+        lines.extend(
+            f"{PREFIX}{key} {_number(value)}"
+            for key, value in rows if not key.startswith(f"{family}_bucket")
+        )
+    return "\n".join(lines) + "\n"
+
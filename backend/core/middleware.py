@@ -1,21 +1,82 @@
 import time
-from django.core.cache import cache
+from django.db import connection
+
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from core import metrics, profiling
+
+class _SqlTimer:
+    """execute_wrapper that counts queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.ms += (time.perf_counter() - started) * 1000
+
+
+class RequestMetricsMiddleware:
+    """
+    Records per-route request counts, latency, SQL queries/time and
+    response size into core.metrics (exposed at /api/metrics).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        sql = _SqlTimer()
+        with connection.execute_wrapper(sql):
+            response = self.get_response(request)
+        duration_ms = (time.perf_counter() - started) * 1000
+
+        # Label by URL pattern, not raw path, to keep series bounded
+        match = getattr(request, "resolver_match", None)
+        route = "/" + match.route if match else "unmatched"
+        size = 0 if response.streaming else len(response.content)
+        metrics.record_request(route, request.method, response.status_code, duration_ms, sql.count, sql.ms, size)
+        return response
+
+
+def _is_staff(request):
+    """Staff check ahead of DRF: JWT bearer token first, then the session user."""
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except APIException:
+        return False
+    user = authenticated[0] if authenticated else getattr(request, "user", None)
+    return bool(user and user.is_active and user.is_staff)
+
+
+class ProfilingMiddleware:
+    """
+    Runs the sampling profiler around a request when a staff user sends
+    `X-Profile: 1`, or for a PROFILE_SAMPLE_RATE fraction of API requests.
+    The saved profile's name is returned in the X-Profile-Id header.
+    """
 
-class RequestThroughputMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
-        # 1. Get current timestamp (seconds)
-        current_second = int(time.time())
-        
-        # 2. Define a cache key for this specific second
-        key = f"throughput_{current_second}"
-        
-        # 3. Increment the counter safely
-        # If key exists, add 1. If not, create it with value 1 and expire in 10s.
-        if not cache.add(key, 1, timeout=10):
-            cache.incr(key)
-
-        response = self.get_response(request)
-        return response
\ No newline at end of file
+        label = f"{request.method} {request.path}"
+        if request.headers.get("X-Profile") and _is_staff(request):
+            context = profiling.profile(label)
+        elif request.path.startswith("/api/") and not request.path.startswith("/api/profiles/"):
+            context = profiling.maybe_profile(label)
+        else:
+            return self.get_response(request)
+
+        with context as result:
+            response = self.get_response(request)
+        if result["name"]:
+            response["X-Profile-Id"] = result["name"]
+        return response
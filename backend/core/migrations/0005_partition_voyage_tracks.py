@@ -0,0 +1,86 @@
+from django.db import migrations
+
+# voyage_tracks is an unmanaged table, so the conversion is plain SQL and only
+# runs on PostgreSQL. The existing table is kept as-is and attached as the
+# partition covering everything before tomorrow; `manage_track_partitions`
+# pre-creates the daily/weekly partitions after it.
+PARTITION_SQL = """
+DO $$
+DECLARE
+    bound timestamptz := date_trunc('day', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' + interval '1 day';
+    day timestamptz;
+    seq text;
+BEGIN
+    IF to_regclass('voyage_tracks') IS NULL THEN
+        CREATE TABLE voyage_tracks (
+            id bigserial,
+            vessel_id bigint NOT NULL,
+            latitude double precision NOT NULL,
+            longitude double precision NOT NULL,
+            speed double precision,
+            course double precision,
+            "timestamp" timestamptz NOT NULL,
+            PRIMARY KEY (id, "timestamp")
+        ) PARTITION BY RANGE ("timestamp");
+    ELSIF (SELECT relkind FROM pg_class WHERE oid = to_regclass('voyage_tracks')) = 'r' THEN
+        ALTER TABLE voyage_tracks RENAME TO voyage_tracks_legacy;
+        CREATE TABLE voyage_tracks (LIKE voyage_tracks_legacy INCLUDING DEFAULTS)
+            PARTITION BY RANGE ("timestamp");
+        ALTER TABLE voyage_tracks ADD PRIMARY KEY (id, "timestamp");
+        -- The copied id default uses the legacy table's serial sequence; hand
+        -- the sequence to the parent so the legacy partition can be dropped
+        -- once it expires.
+        seq := pg_get_serial_sequence('voyage_tracks_legacy', 'id');
+        IF seq IS NOT NULL AND NOT EXISTS (
+            SELECT 1 FROM pg_attribute
+            WHERE attrelid = 'voyage_tracks_legacy'::regclass AND attname = 'id' AND attidentity <> ''
+        ) THEN
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY voyage_tracks.id', seq);
+        END IF;
+        -- The CHECK lets ATTACH skip its validation scan of the old rows.
+        EXECUTE format(
+            'ALTER TABLE voyage_tracks_legacy ADD CONSTRAINT voyage_tracks_legacy_bound CHECK ("timestamp" < %L)',
+            bound
+        );
+        EXECUTE format(
+            'ALTER TABLE voyage_tracks ATTACH PARTITION voyage_tracks_legacy FOR VALUES FROM (MINVALUE) TO (%L)',
+            bound
+        );
+        ALTER TABLE voyage_tracks_legacy DROP CONSTRAINT voyage_tracks_legacy_bound;
+    ELSE
+        RETURN;
+    END IF;
+
+    CREATE INDEX IF NOT EXISTS voyage_tracks_vessel_ts_idx ON voyage_tracks (vessel_id, "timestamp");
+    CREATE TABLE IF NOT EXISTS voyage_tracks_default PARTITION OF voyage_tracks DEFAULT;
+
+    IF to_regclass('voyage_tracks_legacy') IS NULL THEN
+        bound := bound - interval '1 day';
+    END IF;
+    FOR day IN SELECT generate_series(bound, bound + interval '6 days', interval '1 day') LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF voyage_tracks FOR VALUES FROM (%L) TO (%L)',
+            'voyage_tracks_p' || to_char(day AT TIME ZONE 'UTC', 'YYYYMMDD'),
+            day,
+            day + interval '1 day'
+        );
+    END LOOP;
+END $$;
+"""
+
+
+def partition_voyage_tracks(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(PARTITION_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_alert'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_voyage_tracks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_partition_voyage_tracks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveSmallIntegerField(choices=[(60, '1 min'), (900, '15 min'), (3600, '1 h')])),
+                ('bucket', models.DateTimeField()),
+                ('point_count', models.IntegerField(default=0)),
+                ('speed_sum', models.FloatField(default=0)),
+                ('speed_count', models.IntegerField(default=0)),
+                ('course_x_sum', models.FloatField(default=0)),
+                ('course_y_sum', models.FloatField(default=0)),
+                ('latitude', models.FloatField()),
+                ('longitude', models.FloatField()),
+                ('last_timestamp', models.DateTimeField()),
+                ('vessel', models.ForeignKey(db_column='vessel_id', db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to='core.vessel')),
+            ],
+            options={
+                'db_table': 'track_rollups',
+                'managed': True,
+                'constraints': [models.UniqueConstraint(fields=('vessel', 'resolution', 'bucket'), name='track_rollups_vessel_res_bucket_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+from django.db import migrations, models
+
+# Indexes for the hot filters on the unmanaged tables. Django never emits
+# index DDL for managed=False models, so the model state records them and
+# the SQL below builds them. On PostgreSQL they are built CONCURRENTLY, which
+# needs a non-atomic migration, so writes are not blocked while they build.
+#
+# voyage_tracks(vessel_id, timestamp) already exists from 0005 (a partitioned
+# table cannot be indexed CONCURRENTLY), so it is only recorded in the state.
+INDEXES = [
+    ("notifications", "notifications_timestamp_idx", '"timestamp"'),
+    ("voyages", "voyages_status_departure_idx", "status, departure_time"),
+    ("voyages", "voyages_arrival_time_idx", "arrival_time"),
+    ("vessels", "vessels_last_update_idx", "last_update"),
+    ("ports", "ports_congestion_score_idx", "congestion_score"),
+]
+
+
+def create_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    tables = set(connection.introspection.table_names())
+    concurrently = "CONCURRENTLY " if connection.vendor == "postgresql" else ""
+    with connection.cursor() as cursor:
+        for table, name, columns in INDEXES:
+            if table not in tables:
+                continue
+            if connection.vendor == "postgresql":
+                # An interrupted CONCURRENTLY build leaves an INVALID index
+                # that IF NOT EXISTS would silently keep; rebuild it instead.
+                cursor.execute(
+                    "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)", [name]
+                )
+                row = cursor.fetchone()
+                if row and row[0]:
+                    cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            cursor.execute(f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def drop_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    concurrently = "CONCURRENTLY " if connection.vendor == "postgresql" else ""
+    with connection.cursor() as cursor:
+        for _, name, _ in INDEXES:
+            cursor.execute(f"DROP INDEX {concurrently}IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("core", "0006_track_rollups"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="notification",
+                    index=models.Index(fields=["timestamp"], name="notifications_timestamp_idx"),
+                ),
+                migrations.AddIndex(
+                    model_name="voyage",
+                    index=models.Index(fields=["status", "departure_time"], name="voyages_status_departure_idx"),
+                ),
+                migrations.AddIndex(
+                    model_name="voyage",
+                    index=models.Index(fields=["arrival_time"], name="voyages_arrival_time_idx"),
+                ),
+                migrations.AddIndex(
+                    model_name="vessel",
+                    index=models.Index(fields=["last_update"], name="vessels_last_update_idx"),
+                ),
+                migrations.AddIndex(
+                    model_name="port",
+                    index=models.Index(fields=["congestion_score"], name="ports_congestion_score_idx"),
+                ),
+                migrations.AddIndex(
+                    model_name="voyagetrack",
+                    index=models.Index(fields=["vessel", "timestamp"], name="voyage_tracks_vessel_ts_idx"),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_vessels', models.IntegerField(default=0)),
+                ('active_voyages', models.IntegerField(default=0)),
+                ('active_risks', models.IntegerField(default=0)),
+                ('high_congestion_ports', models.IntegerField(default=0)),
+                ('recent_voyages', models.JSONField(default=list)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'dashboard_stats',
+                'managed': True,
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_dashboard_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FleetComposition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vessel_type', models.CharField(max_length=100)),
+                ('cargo_type', models.CharField(max_length=100, null=True)),
+                ('region_id', models.PositiveSmallIntegerField(default=0)),
+                ('vessel_count', models.IntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'analytics_fleet_composition',
+                'managed': True,
+            },
+        ),
+        migrations.CreateModel(
+            name='VoyageDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('vessel_type', models.CharField(max_length=100)),
+                ('region_id', models.PositiveSmallIntegerField(default=0)),
+                ('arrivals', models.IntegerField(default=0)),
+                ('in_transit', models.IntegerField(default=0)),
+                ('wait_sum', models.FloatField(default=0)),
+                ('wait_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'analytics_voyage_daily',
+                'managed': True,
+                'constraints': [models.UniqueConstraint(fields=('date', 'vessel_type', 'region_id'), name='analytics_voyage_daily_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+from django.db import migrations, models
+
+# Trade region ids (core.regions) on the unmanaged tables. Django does not
+# emit DDL for managed=False models, so the columns are added by the SQL
+# below; existing rows keep region 0 until `manage.py assign_regions` runs.
+# A constant default makes ADD COLUMN a catalog-only change on PostgreSQL.
+COLUMNS = [
+    ("vessels", "region_id"),
+    ("ports", "region_id"),
+    ("voyages", "region_from"),
+    ("voyages", "region_to"),
+    ("notifications", "region_id"),
+]
+
+INDEXES = [
+    ("notifications", "notifications_region_ts_idx", 'region_id, "timestamp"'),
+]
+
+
+def add_columns(apps, schema_editor):
+    connection = schema_editor.connection
+    tables = set(connection.introspection.table_names())
+    concurrently = "CONCURRENTLY " if connection.vendor == "postgresql" else ""
+    with connection.cursor() as cursor:
+        for table, column in COLUMNS:
+            if table not in tables:
+                continue
+            existing = {c.name for c in connection.introspection.get_table_description(cursor, table)}
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} smallint NOT NULL DEFAULT 0")
+        for table, name, columns in INDEXES:
+            if table in tables:
+                cursor.execute(f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def drop_columns(apps, schema_editor):
+    connection = schema_editor.connection
+    tables = set(connection.introspection.table_names())
+    with connection.cursor() as cursor:
+        for _, name, _ in INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+        for table, column in COLUMNS:
+            if table in tables:
+                cursor.execute(f"ALTER TABLE {table} DROP COLUMN {column}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0009_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dashboardstats',
+            name='regions',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='riskzone',
+            name='region_id',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_columns, drop_columns),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="notification",
+                    index=models.Index(fields=["region_id", "timestamp"], name="notifications_region_ts_idx"),
+                ),
+            ],
+        ),
+    ]
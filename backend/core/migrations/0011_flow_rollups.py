@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_trade_regions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlowDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('vessel_type', models.CharField(max_length=100)),
+                ('voyages', models.IntegerField(default=0)),
+                ('transit_hours_sum', models.FloatField(default=0)),
+                ('transit_count', models.IntegerField(default=0)),
+                ('port_from', models.ForeignKey(db_column='port_from', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.port')),
+                ('port_to', models.ForeignKey(db_column='port_to', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.port')),
+            ],
+            options={
+                'db_table': 'analytics_flow_daily',
+                'managed': True,
+                'constraints': [models.UniqueConstraint(fields=('date', 'port_from', 'port_to', 'vessel_type'), name='analytics_flow_daily_uniq')],
+            },
+        ),
+    ]
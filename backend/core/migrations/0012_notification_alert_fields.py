@@ -0,0 +1,73 @@
+from django.db import migrations, models
+
+# Structured alert columns on the unmanaged notifications table (see
+# core/alerts.py), with composite indexes for the alert filters. Existing
+# rows are filled in by `manage.py backfill_alerts`.
+COLUMNS = [
+    ("severity", "varchar(16) NULL"),
+    ("category", "varchar(32) NULL"),
+    ("port_id", "bigint NULL"),
+    ("wait_hours", "double precision NULL"),
+]
+
+INDEXES = [
+    ("notifications_severity_ts_idx", 'severity, "timestamp"'),
+    ("notifications_category_ts_idx", 'category, "timestamp"'),
+    ("notifications_port_ts_idx", 'port_id, "timestamp"'),
+]
+
+
+def add_columns(apps, schema_editor):
+    connection = schema_editor.connection
+    if "notifications" not in connection.introspection.table_names():
+        return
+    concurrently = "CONCURRENTLY " if connection.vendor == "postgresql" else ""
+    with connection.cursor() as cursor:
+        existing = {c.name for c in connection.introspection.get_table_description(cursor, "notifications")}
+        for column, definition in COLUMNS:
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE notifications ADD COLUMN {column} {definition}")
+        for name, columns in INDEXES:
+            cursor.execute(f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON notifications ({columns})")
+
+
+def drop_columns(apps, schema_editor):
+    connection = schema_editor.connection
+    if "notifications" not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for name, _ in INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+        for column, _ in COLUMNS:
+            cursor.execute(f"ALTER TABLE notifications DROP COLUMN {column}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_flow_rollups'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_columns, drop_columns),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="notification",
+                    index=models.Index(fields=["severity", "timestamp"], name="notifications_severity_ts_idx"),
+                ),
+                migrations.AddIndex(
+                    model_name="notification",
+                    index=models.Index(fields=["category", "timestamp"], name="notifications_category_ts_idx"),
+                ),
+                migrations.AddIndex(
+                    model_name="notification",
+                    index=models.Index(fields=["port", "timestamp"], name="notifications_port_ts_idx"),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_notification_alert_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('region_id', models.PositiveSmallIntegerField(default=0)),
+                ('severity', models.CharField(max_length=16)),
+                ('port_id', models.BigIntegerField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('wait_sum', models.FloatField(default=0)),
+                ('wait_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'alert_daily_stats',
+                'managed': True,
+                'constraints': [models.UniqueConstraint(fields=('date', 'region_id', 'severity', 'port_id'), name='alert_daily_stats_uniq')],
+            },
+        ),
+    ]
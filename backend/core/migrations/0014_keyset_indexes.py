@@ -0,0 +1,54 @@
+from django.db import migrations, models
+
+# (sort key, id) indexes behind the keyset-paginated voyage and event lists.
+# Same approach as 0007: built CONCURRENTLY on PostgreSQL, recorded in the
+# state of the unmanaged models.
+INDEXES = [
+    ("voyages", "voyages_departure_id_idx", "departure_time, id"),
+    ("events", "events_timestamp_id_idx", '"timestamp", id'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    tables = set(connection.introspection.table_names())
+    concurrently = "CONCURRENTLY " if connection.vendor == "postgresql" else ""
+    with connection.cursor() as cursor:
+        for table, name, columns in INDEXES:
+            if table in tables:
+                cursor.execute(f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def drop_indexes(apps, schema_editor):
+    connection = schema_editor.connection
+    concurrently = "CONCURRENTLY " if connection.vendor == "postgresql" else ""
+    with connection.cursor() as cursor:
+        for _, name, _ in INDEXES:
+            cursor.execute(f"DROP INDEX {concurrently}IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("core", "0013_alert_daily_stats"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="voyage",
+                    index=models.Index(fields=["departure_time", "id"], name="voyages_departure_id_idx"),
+                ),
+                migrations.AddIndex(
+                    model_name="event",
+                    index=models.Index(fields=["timestamp", "id"], name="events_timestamp_id_idx"),
+                ),
+            ],
+        ),
+    ]
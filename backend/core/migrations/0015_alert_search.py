@@ -0,0 +1,70 @@
+from django.db import migrations
+
+# Full-text search over notifications (see core/search.py). PostgreSQL only:
+# a tsvector column over the message and the vessel and port names, filled
+# by a BEFORE INSERT/UPDATE trigger so raw SQL writers are covered too, and
+# a GIN index. The column is not on the model, so there is no state change.
+# Existing rows are filled in by `manage.py backfill_alerts --search`.
+# Other backends search an in-memory index and need nothing here.
+
+FUNCTIONS = """
+CREATE OR REPLACE FUNCTION notification_search_vector(message text, vessel_id bigint, port_id bigint)
+RETURNS tsvector LANGUAGE sql STABLE AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(message, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce((SELECT name FROM vessels WHERE id = vessel_id), '')), 'B')
+        || setweight(to_tsvector('simple', coalesce((SELECT name FROM ports WHERE id = port_id), '')), 'B')
+$$;
+
+CREATE OR REPLACE FUNCTION notifications_search_trigger() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := notification_search_vector(NEW.message, NEW.vessel_id, NEW.port_id);
+    RETURN NEW;
+END
+$$;
+"""
+
+TRIGGER = """
+DROP TRIGGER IF EXISTS notifications_search_update ON notifications;
+CREATE TRIGGER notifications_search_update
+    BEFORE INSERT OR UPDATE OF message, vessel_id, port_id ON notifications
+    FOR EACH ROW EXECUTE FUNCTION notifications_search_trigger();
+"""
+
+
+def add_search(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql" or "notifications" not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("ALTER TABLE notifications ADD COLUMN IF NOT EXISTS search_vector tsvector")
+        cursor.execute(FUNCTIONS)
+        cursor.execute(TRIGGER)
+        cursor.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS notifications_search_gin "
+            "ON notifications USING gin (search_vector)"
+        )
+
+
+def drop_search(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql" or "notifications" not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("DROP TRIGGER IF EXISTS notifications_search_update ON notifications")
+        cursor.execute("DROP FUNCTION IF EXISTS notifications_search_trigger()")
+        cursor.execute("DROP FUNCTION IF EXISTS notification_search_vector(text, bigint, bigint)")
+        cursor.execute("DROP INDEX IF EXISTS notifications_search_gin")
+        cursor.execute("ALTER TABLE notifications DROP COLUMN IF EXISTS search_vector")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0014_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search, drop_search),
+    ]
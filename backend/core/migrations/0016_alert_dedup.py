@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# Deduplication columns on the unmanaged notifications table (see
+# core/alerts.py raise_alert). Existing rows count as single occurrences;
+# rows without a subject are never folded into.
+COLUMNS = [
+    ("subject", "varchar(128) NULL"),
+    ("occurrences", "integer NOT NULL DEFAULT 1"),
+    ("last_seen", "timestamp with time zone NULL"),
+]
+
+
+def add_columns(apps, schema_editor):
+    connection = schema_editor.connection
+    if "notifications" not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        existing = {c.name for c in connection.introspection.get_table_description(cursor, "notifications")}
+        for column, definition in COLUMNS:
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE notifications ADD COLUMN {column} {definition}")
+
+
+def drop_columns(apps, schema_editor):
+    connection = schema_editor.connection
+    if "notifications" not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for column, _ in COLUMNS:
+            cursor.execute(f"ALTER TABLE notifications DROP COLUMN {column}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0015_alert_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_columns, drop_columns),
+    ]
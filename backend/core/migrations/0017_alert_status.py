@@ -0,0 +1,82 @@
+from django.db import migrations, models
+
+# Alert lifecycle on the unmanaged notifications table (see core/alerts.py
+# set_status). Existing rows start as "new". The partial indexes cover only
+# the open queues and the change feed, so they stay small as resolved
+# alerts accumulate; built CONCURRENTLY on PostgreSQL as in 0007.
+COLUMNS = [
+    ("status", "varchar(16) NOT NULL DEFAULT 'new'"),
+    ("status_changed_at", "timestamp with time zone NULL"),
+]
+
+INDEXES = [
+    ("notifications_new_ts_idx", '"timestamp", id', "status = 'new'"),
+    ("notifications_acked_ts_idx", '"timestamp", id', "status = 'acknowledged'"),
+    ("notif_status_changed_idx", "status_changed_at, id", "status_changed_at IS NOT NULL"),
+]
+
+
+def add_columns(apps, schema_editor):
+    connection = schema_editor.connection
+    if "notifications" not in connection.introspection.table_names():
+        return
+    concurrently = "CONCURRENTLY " if connection.vendor == "postgresql" else ""
+    with connection.cursor() as cursor:
+        existing = {c.name for c in connection.introspection.get_table_description(cursor, "notifications")}
+        for column, definition in COLUMNS:
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE notifications ADD COLUMN {column} {definition}")
+        for name, columns, condition in INDEXES:
+            cursor.execute(
+                f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON notifications ({columns}) WHERE {condition}"
+            )
+
+
+def drop_columns(apps, schema_editor):
+    connection = schema_editor.connection
+    if "notifications" not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for name, _, _ in INDEXES:
+            cursor.execute(f"DROP INDEX IF EXISTS {name}")
+        for column, _ in COLUMNS:
+            cursor.execute(f"ALTER TABLE notifications DROP COLUMN {column}")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0016_alert_dedup'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_columns, drop_columns),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="notification",
+                    index=models.Index(
+                        condition=models.Q(status="new"), fields=["timestamp", "id"], name="notifications_new_ts_idx"
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="notification",
+                    index=models.Index(
+                        condition=models.Q(status="acknowledged"), fields=["timestamp", "id"],
+                        name="notifications_acked_ts_idx",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="notification",
+                    index=models.Index(
+                        condition=models.Q(status_changed_at__isnull=False), fields=["status_changed_at", "id"],
+                        name="notif_status_changed_idx",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_alert_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VesselEnrichment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=300, unique=True)),
+                ('status', models.CharField(max_length=16)),
+                ('data', models.JSONField(default=dict)),
+                ('fetched_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'db_table': 'vessel_enrichment',
+                'managed': True,
+            },
+        ),
+    ]
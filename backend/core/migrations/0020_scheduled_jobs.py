@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 19:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=64, unique=True)),
+                ('next_run_at', models.DateTimeField(null=True)),
+                ('last_scheduled_at', models.DateTimeField(null=True)),
+                ('last_started_at', models.DateTimeField(null=True)),
+                ('last_finished_at', models.DateTimeField(null=True)),
+                ('last_duration_ms', models.PositiveIntegerField(null=True)),
+                ('last_status', models.CharField(max_length=16, null=True)),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('skipped', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'scheduled_jobs',
+                'managed': True,
+            },
+        ),
+    ]
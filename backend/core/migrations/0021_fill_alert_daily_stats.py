@@ -0,0 +1,38 @@
+from django.db import migrations
+
+# alert_daily_stats (0013) is kept current by the notification receivers
+# but started out empty, so a deployment that already had alerts reported
+# zero stats until `backfill_alerts` was run. Fill it here when it is still
+# empty; rows whose severity has not been backfilled count under "". The
+# alert columns were added in raw SQL (0012), so this is raw SQL as well.
+
+FILL_SQL = """
+    INSERT INTO alert_daily_stats (date, region_id, severity, port_id, count, wait_sum, wait_count)
+    SELECT {day}, COALESCE(region_id, 0), COALESCE(severity, ''), COALESCE(port_id, 0),
+           COUNT(*), COALESCE(SUM(wait_hours), 0), COUNT(wait_hours)
+    FROM notifications
+    GROUP BY 1, 2, 3, 4
+"""
+
+
+def fill_stats(apps, schema_editor):
+    connection = schema_editor.connection
+    if "notifications" not in connection.introspection.table_names():
+        return
+    # Django runs PostgreSQL sessions in UTC, so the cast yields the UTC day
+    day = 'CAST("timestamp" AS date)' if connection.vendor == "postgresql" else 'date("timestamp")'
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM alert_daily_stats LIMIT 1")
+        if cursor.fetchone() is None:
+            cursor.execute(FILL_SQL.format(day=day))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_scheduled_jobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+# Index for the open-alert lookup in core.alerts.raise_alert, which every
+# process now runs against the table instead of trusting its own cache.
+
+
+def add_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if "notifications" not in connection.introspection.table_names():
+        return
+    concurrently = "CONCURRENTLY " if connection.vendor == "postgresql" else ""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE INDEX {concurrently}IF NOT EXISTS notifications_subject_ts_idx ON notifications (subject, "timestamp")'
+        )
+
+
+def drop_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if "notifications" not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("DROP INDEX IF EXISTS notifications_subject_ts_idx")
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0021_fill_alert_daily_stats'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(add_index, drop_index),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="notification",
+                    index=models.Index(fields=["subject", "timestamp"], name="notifications_subject_ts_idx"),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+
+# 0005 created the partitioned voyage_tracks with LIKE voyage_tracks_legacy,
+# so the parent's id default uses the sequence owned by the legacy table's
+# id column. That dependency kept drop_expired_partitions from dropping the
+# legacy partition. 0005 now hands the sequence over; this does the same for
+# databases that were already migrated. PostgreSQL only, and a no-op when
+# there is no legacy partition or its id is an identity column.
+OWNER_SQL = """
+DO $$
+DECLARE
+    seq text;
+BEGIN
+    IF to_regclass('voyage_tracks_legacy') IS NULL
+            OR (SELECT relkind FROM pg_class WHERE oid = to_regclass('voyage_tracks')) IS DISTINCT FROM 'p' THEN
+        RETURN;
+    END IF;
+    seq := pg_get_serial_sequence('voyage_tracks_legacy', 'id');
+    IF seq IS NOT NULL AND NOT EXISTS (
+        SELECT 1 FROM pg_attribute
+        WHERE attrelid = 'voyage_tracks_legacy'::regclass AND attname = 'id' AND attidentity <> ''
+    ) THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY voyage_tracks.id', seq);
+    END IF;
+END $$;
+"""
+
+
+def move_sequence_owner(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(OWNER_SQL, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_alert_subject_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_sequence_owner, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import AbstractUser
 
 # -------------------------
@@ -17,6 +18,7 @@ class RiskZone(models.Model):
     radius_km = models.FloatField(help_text="Radius of the risk zone in km")
     severity = models.CharField(max_length=20, default='Medium') # Low, Medium, High
     description = models.TextField(null=True, blank=True)
+    region_id = models.PositiveSmallIntegerField(default=0)  # core.regions, set on save
 
     class Meta:
         db_table = "risk_zones"
@@ -106,10 +108,13 @@ class Vessel(models.Model):
     speed = models.FloatField(null=True)
     course = models.FloatField(null=True)
     last_update = models.DateTimeField(null=True)
+    # Trade region of the last position (core.regions), set on write
+    region_id = models.PositiveSmallIntegerField(default=0)
 
     class Meta:
         db_table = "vessels"
         managed = False
+        indexes = [models.Index(fields=["last_update"], name="vessels_last_update_idx")]
 
     def __str__(self):
         return self.name
@@ -124,10 +129,12 @@ class Port(models.Model):
     arrivals = models.IntegerField(default=0)
     departures = models.IntegerField(default=0)
     last_update = models.DateTimeField(null=True)
+    region_id = models.PositiveSmallIntegerField(default=0)
 
     class Meta:
         db_table = "ports"
         managed = False
+        indexes = [models.Index(fields=["congestion_score"], name="ports_congestion_score_idx")]
 
     def __str__(self):
         return self.name
@@ -157,10 +164,18 @@ class Voyage(models.Model):
     departure_time = models.DateTimeField(null=True)
     arrival_time = models.DateTimeField(null=True)
     status = models.CharField(max_length=100, null=True)
+    # Trade regions of the two endpoints, copied from the ports on write
+    region_from = models.PositiveSmallIntegerField(default=0)
+    region_to = models.PositiveSmallIntegerField(default=0)
 
     class Meta:
         db_table = "voyages"
         managed = False
+        indexes = [
+            models.Index(fields=["status", "departure_time"], name="voyages_status_departure_idx"),
+            models.Index(fields=["arrival_time"], name="voyages_arrival_time_idx"),
+            models.Index(fields=["departure_time", "id"], name="voyages_departure_id_idx"),
+        ]
 
     def __str__(self):
         vessel = self.vessel.name if self.vessel else "Unknown Vessel"
@@ -182,11 +197,267 @@ class VoyageTrack(models.Model):
     class Meta:
         db_table = "voyage_tracks"
         managed = False
+        indexes = [models.Index(fields=["vessel", "timestamp"], name="voyage_tracks_vessel_ts_idx")]
 
     def __str__(self):
         return f"{self.vessel.name} @ {self.timestamp}"
 
 
+class TrackRollup(models.Model):
+    """
+    Per-vessel time-bucketed summary of voyage_tracks, maintained
+    incrementally by core.rollups as track points are ingested.
+    """
+    RESOLUTIONS = [
+        (60, '1 min'),
+        (900, '15 min'),
+        (3600, '1 h'),
+    ]
+    vessel = models.ForeignKey(
+        Vessel,
+        db_column="vessel_id",
+        on_delete=models.CASCADE,
+        db_constraint=False
+    )
+    resolution = models.PositiveSmallIntegerField(choices=RESOLUTIONS)
+    bucket = models.DateTimeField()
+    point_count = models.IntegerField(default=0)
+    speed_sum = models.FloatField(default=0)
+    speed_count = models.IntegerField(default=0)
+    # Course is averaged on the unit circle so 359° and 1° average to 0°
+    course_x_sum = models.FloatField(default=0)
+    course_y_sum = models.FloatField(default=0)
+    # Position of the latest report in the bucket
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+    last_timestamp = models.DateTimeField()
+
+    class Meta:
+        db_table = "track_rollups"
+        managed = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=["vessel", "resolution", "bucket"],
+                name="track_rollups_vessel_res_bucket_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.vessel_id} @ {self.bucket} ({self.resolution}s)"
+
+
+class DashboardStats(models.Model):
+    """
+    Single-row snapshot of the dashboard counters, refreshed by
+    core.dashboard from ingest, the UNCTAD loader and the endpoint itself.
+    """
+    total_vessels = models.IntegerField(default=0)
+    active_voyages = models.IntegerField(default=0)
+    active_risks = models.IntegerField(default=0)
+    high_congestion_ports = models.IntegerField(default=0)
+    recent_voyages = models.JSONField(default=list)
+    # The same counters per trade region: {"<region id>": {...}}
+    regions = models.JSONField(default=dict)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "dashboard_stats"
+        managed = True
+
+    def __str__(self):
+        return f"Dashboard stats @ {self.refreshed_at}"
+
+
+class VoyageDailyStats(models.Model):
+    """
+    Voyage counters per arrival date, vessel type and region, maintained
+    incrementally by core.analytics so analytics windows sum a few rows
+    instead of scanning voyages.
+    """
+    date = models.DateField()
+    vessel_type = models.CharField(max_length=100)
+    region_id = models.PositiveSmallIntegerField(default=0)  # 0 = unassigned
+    arrivals = models.IntegerField(default=0)
+    in_transit = models.IntegerField(default=0)
+    # Destination port wait time at the time the voyage was recorded
+    wait_sum = models.FloatField(default=0)
+    wait_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "analytics_voyage_daily"
+        managed = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "vessel_type", "region_id"],
+                name="analytics_voyage_daily_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.vessel_type} ({self.arrivals} arrivals)"
+
+
+class FlowDailyStats(models.Model):
+    """
+    Port-to-port voyage counters per departure date and vessel type,
+    maintained incrementally by core.analytics for the trade-lane matrix.
+    """
+    date = models.DateField()
+    port_from = models.ForeignKey(
+        Port, db_column="port_from", related_name="+", on_delete=models.DO_NOTHING, db_constraint=False
+    )
+    port_to = models.ForeignKey(
+        Port, db_column="port_to", related_name="+", on_delete=models.DO_NOTHING, db_constraint=False
+    )
+    vessel_type = models.CharField(max_length=100)
+    voyages = models.IntegerField(default=0)
+    # Departure-to-arrival hours, over voyages that have both times
+    transit_hours_sum = models.FloatField(default=0)
+    transit_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "analytics_flow_daily"
+        managed = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "port_from", "port_to", "vessel_type"],
+                name="analytics_flow_daily_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.port_from_id}->{self.port_to_id} ({self.voyages})"
+
+
+class Job(models.Model):
+    """
+    A unit of background work for `manage.py run_workers` (core.jobs).
+    A worker owns a running job until `locked_until` and keeps extending
+    the lease while it works; a job whose lease ran out is picked up again.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    kind = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=16, default=QUEUED)
+    run_at = models.DateTimeField()
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    locked_by = models.CharField(max_length=128, null=True)
+    locked_until = models.DateTimeField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+    result = models.JSONField(null=True)
+    last_error = models.TextField(null=True)
+
+    class Meta:
+        db_table = "jobs"
+        managed = True
+        indexes = [
+            # Claim scans: due queued jobs, and running jobs by lease expiry
+            models.Index(fields=["run_at", "id"], condition=Q(status="queued"), name="jobs_queued_run_at_idx"),
+            models.Index(fields=["locked_until"], condition=Q(status="running"), name="jobs_running_lease_idx"),
+            models.Index(fields=["kind", "status"], name="jobs_kind_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class ScheduledJob(models.Model):
+    """
+    Schedule state of one periodic job kind, shared by every scheduler
+    instance (core.scheduler): when it is next due, and how its last run
+    went.
+    """
+    kind = models.CharField(max_length=64, unique=True)
+    next_run_at = models.DateTimeField(null=True)
+    last_scheduled_at = models.DateTimeField(null=True)
+    last_started_at = models.DateTimeField(null=True)
+    last_finished_at = models.DateTimeField(null=True)
+    last_duration_ms = models.PositiveIntegerField(null=True)
+    last_status = models.CharField(max_length=16, null=True)
+    runs = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)  # due while the previous run was still pending
+
+    class Meta:
+        db_table = "scheduled_jobs"
+        managed = True
+
+    def __str__(self):
+        return f"{self.kind} (next {self.next_run_at})"
+
+
+class VesselEnrichment(models.Model):
+    """
+    Cached answer of the vessel enrichment source per vessel key (MMSI, or
+    name when there is none), including "not found" answers, so vessels
+    are not refetched until `expires_at`. Written by core.enrichment.
+    """
+    FOUND = "found"
+    MISSING = "missing"
+
+    key = models.CharField(max_length=300, unique=True)
+    status = models.CharField(max_length=16)
+    data = models.JSONField(default=dict)
+    fetched_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = "vessel_enrichment"
+        managed = True
+
+    def __str__(self):
+        return f"{self.key} ({self.status})"
+
+
+class AlertDailyStats(models.Model):
+    """
+    Notification counters per day, region, severity and port, maintained
+    incrementally by core.alerts for the alert statistics and insights.
+    """
+    date = models.DateField()
+    region_id = models.PositiveSmallIntegerField(default=0)
+    severity = models.CharField(max_length=16)  # "" for rows without one
+    port_id = models.BigIntegerField(default=0)  # 0 = no port
+    count = models.IntegerField(default=0)
+    wait_sum = models.FloatField(default=0)
+    wait_count = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "alert_daily_stats"
+        managed = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "region_id", "severity", "port_id"],
+                name="alert_daily_stats_uniq"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.severity or '-'} ({self.count})"
+
+
+class FleetComposition(models.Model):
+    """Vessel counts per type, cargo and region, rebuilt periodically by core.analytics."""
+    vessel_type = models.CharField(max_length=100)
+    cargo_type = models.CharField(max_length=100, null=True)
+    region_id = models.PositiveSmallIntegerField(default=0)
+    vessel_count = models.IntegerField(default=0)
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "analytics_fleet_composition"
+        managed = True
+
+    def __str__(self):
+        return f"{self.vessel_type}/{self.cargo_type}: {self.vessel_count}"
+
+
 class Event(models.Model):
     vessel = models.ForeignKey(
         Vessel,
@@ -202,6 +473,7 @@ class Event(models.Model):
     class Meta:
         db_table = "events"
         managed = False
+        indexes = [models.Index(fields=["timestamp", "id"], name="events_timestamp_id_idx")]
 
     def __str__(self):
         vessel = self.vessel.name if self.vessel else "Unknown Vessel"
@@ -230,10 +502,50 @@ class Notification(models.Model):
     message = models.TextField(null=True)
     type = models.CharField(max_length=100, null=True)
     timestamp = models.DateTimeField(auto_now_add=True)
+    region_id = models.PositiveSmallIntegerField(default=0)
+    # Structured alert fields, set on write by core.alerts
+    severity = models.CharField(max_length=16, null=True)  # critical / warning / info
+    category = models.CharField(max_length=32, null=True)
+    port = models.ForeignKey(
+        Port,
+        db_column="port_id",
+        related_name="+",
+        on_delete=models.SET_NULL,
+        null=True,
+        db_constraint=False
+    )
+    wait_hours = models.FloatField(null=True)
+    # Deduplication (core.alerts.raise_alert): repeats of the same subject
+    # within the suppression window are counted here instead of inserted
+    subject = models.CharField(max_length=128, null=True)
+    occurrences = models.PositiveIntegerField(default=1)
+    last_seen = models.DateTimeField(null=True)
+    # Lifecycle: new -> acknowledged -> resolved (core.alerts.set_status)
+    status = models.CharField(max_length=16, default="new")
+    status_changed_at = models.DateTimeField(null=True)
 
     class Meta:
         db_table = "notifications"
         managed = False
+        indexes = [
+            models.Index(fields=["timestamp"], name="notifications_timestamp_idx"),
+            models.Index(fields=["region_id", "timestamp"], name="notifications_region_ts_idx"),
+            models.Index(fields=["severity", "timestamp"], name="notifications_severity_ts_idx"),
+            models.Index(fields=["category", "timestamp"], name="notifications_category_ts_idx"),
+            models.Index(fields=["port", "timestamp"], name="notifications_port_ts_idx"),
+            # Open-alert lookup for deduplication (core.alerts)
+            models.Index(fields=["subject", "timestamp"], name="notifications_subject_ts_idx"),
+            # Partial indexes keep the open queues small however many
+            # alerts have been resolved
+            models.Index(fields=["timestamp", "id"], condition=Q(status="new"), name="notifications_new_ts_idx"),
+            models.Index(
+                fields=["timestamp", "id"], condition=Q(status="acknowledged"), name="notifications_acked_ts_idx"
+            ),
+            models.Index(
+                fields=["status_changed_at", "id"], condition=Q(status_changed_at__isnull=False),
+                name="notif_status_changed_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.type or 'Notification'}"
@@ -0,0 +1,190 @@
+import re
+from datetime import datetime
+
+# -------------------------
+# NMEA 0183 AIVDM/AIVDO DECODING
+# -------------------------
+# Pure functions with no Django dependency so they can run inside the
+# importer's process pool. Covers the messages we store: position reports
+# (types 1, 2, 3 and class B 18) and vessel names (types 5 and 24A).
+
+_TAG_TIME_RE = re.compile(r"(?:^|,)c:(\d+)")
+
+NO_LON = 181.0
+NO_LAT = 91.0
+
+
+def _checksum_ok(body, checksum):
+    value = 0
+    for ch in body:
+        value ^= ord(ch)
+    return f"{value:02X}" == checksum.upper()
+
+
+def split_line(line):
+    """
+    Splits an input line into (timestamp or None, sentence).
+    Accepts a NMEA 4.0 tag block (`\\c:1577836800*5A\\!AIVDM,...`) or a
+    leading epoch / ISO-8601 token (`1577836800.5 !AIVDM,...`).
+    """
+    line = line.strip()
+    ts = None
+    if line.startswith("\\"):
+        end = line.find("\\", 1)
+        if end == -1:
+            return None, None
+        match = _TAG_TIME_RE.search(line[1:end].split("*")[0])
+        if match:
+            ts = int(match.group(1))
+            if ts > 10_000_000_000:  # milliseconds
+                ts /= 1000.0
+        line = line[end + 1:]
+    elif not line.startswith("!"):
+        start = line.find("!")
+        if start <= 0:
+            return None, None
+        token = line[:start].strip().rstrip(",;")
+        try:
+            ts = float(token)
+        except ValueError:
+            try:
+                ts = datetime.fromisoformat(token.replace("Z", "+00:00")).timestamp()
+            except ValueError:
+                ts = None
+        line = line[start:]
+    return ts, line
+
+
+def parse_sentence(sentence):
+    """
+    Returns (fragment_count, fragment_number, message_id, channel, payload, fill_bits)
+    for a valid !AIVDM/!AIVDO sentence, otherwise None.
+    """
+    if not sentence or sentence[0] != "!" or "*" not in sentence:
+        return None
+    body, checksum = sentence[1:].rsplit("*", 1)
+    if not _checksum_ok(body, checksum[:2]):
+        return None
+    fields = body.split(",")
+    if len(fields) != 7 or fields[0][2:] not in ("VDM", "VDO"):
+        return None
+    try:
+        return int(fields[1]), int(fields[2]), fields[3], fields[4], fields[5], int(fields[6] or 0)
+    except ValueError:
+        return None
+
+
+def is_final_fragment(sentence):
+    """True unless the sentence is a non-final part of a multi-sentence message."""
+    fields = sentence.split(",", 3)
+    if len(fields) < 3 or "VD" not in fields[0]:
+        return True
+    return fields[1] == fields[2]
+
+
+class Reassembler:
+    """
+    Joins multi-sentence messages. Fragments are keyed by (sequential
+    message id, channel); an incomplete group is dropped when a new group
+    reuses its key.
+    """
+
+    def __init__(self):
+        self._pending = {}
+
+    def feed(self, parsed):
+        count, number, message_id, channel, payload, fill = parsed
+        if count == 1:
+            return payload, fill
+        key = (message_id, channel)
+        if number == 1:
+            self._pending[key] = [payload]
+            return None
+        parts = self._pending.get(key)
+        if parts is None or len(parts) != number - 1:
+            self._pending.pop(key, None)
+            return None
+        parts.append(payload)
+        if number < count:
+            return None
+        del self._pending[key]
+        return "".join(parts), fill
+
+
+def payload_bits(payload, fill=0):
+    """Decodes the 6-bit armoured payload into a Python int and its bit length."""
+    value = 0
+    for ch in payload:
+        sixbit = ord(ch) - 48
+        if sixbit > 40:
+            sixbit -= 8
+        value = (value << 6) | (sixbit & 0x3F)
+    length = len(payload) * 6 - fill
+    return value >> fill, length
+
+
+class _Bits:
+    def __init__(self, payload, fill):
+        self.value, self.length = payload_bits(payload, fill)
+
+    def uint(self, start, width):
+        if start + width > self.length:
+            return None
+        return (self.value >> (self.length - start - width)) & ((1 << width) - 1)
+
+    def sint(self, start, width):
+        raw = self.uint(start, width)
+        if raw is None:
+            return None
+        return raw - (1 << width) if raw & (1 << (width - 1)) else raw
+
+    def text(self, start, width):
+        chars = []
+        for offset in range(start, start + width, 6):
+            code = self.uint(offset, 6)
+            if code is None:
+                break
+            chars.append(chr(code + 64) if code < 32 else chr(code))
+        return "".join(chars).split("@")[0].strip()
+
+
+def _position(bits, mmsi, sog_at, lon_at, lat_at, cog_at):
+    sog = bits.uint(sog_at, 10)
+    lon = bits.sint(lon_at, 28)
+    lat = bits.sint(lat_at, 27)
+    cog = bits.uint(cog_at, 12)
+    if lon is None or lat is None:
+        return None
+    lon, lat = lon / 600000.0, lat / 600000.0
+    if lon == NO_LON or lat == NO_LAT or abs(lat) > 90 or abs(lon) > 180:
+        return None
+    return {
+        "kind": "position",
+        "mmsi": mmsi,
+        "lat": round(lat, 6),
+        "lon": round(lon, 6),
+        "speed": None if sog in (None, 1023) else sog / 10.0,
+        "course": None if cog is None or cog >= 3600 else cog / 10.0,
+    }
+
+
+def decode(payload, fill=0):
+    """
+    Decodes a complete payload into a dict (`kind` = "position" or
+    "static"), or None for message types we do not store.
+    """
+    bits = _Bits(payload, fill)
+    msg_type = bits.uint(0, 6)
+    mmsi = bits.uint(8, 30)
+    if not mmsi:
+        return None
+
+    if msg_type in (1, 2, 3):
+        return _position(bits, mmsi, 50, 61, 89, 116)
+    if msg_type == 18:
+        return _position(bits, mmsi, 46, 57, 85, 112)
+    if msg_type == 5:
+        return {"kind": "static", "mmsi": mmsi, "name": bits.text(112, 120), "imo": bits.uint(40, 30)}
+    if msg_type == 24 and bits.uint(38, 2) == 0:
+        return {"kind": "static", "mmsi": mmsi, "name": bits.text(40, 120), "imo": None}
+    return None
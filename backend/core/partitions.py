@@ -0,0 +1,180 @@
+import re
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+# -------------------------
+# VOYAGE TRACK PARTITIONS
+# -------------------------
+# `voyage_tracks` is range-partitioned on `timestamp` (see migration 0005).
+# Each partition covers one day or one week; retention drops whole
+# partitions instead of running DELETE over billions of rows.
+
+PARENT_TABLE = "voyage_tracks"
+DEFAULT_PARTITION = "voyage_tracks_default"
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def is_partitioned():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+            [PARENT_TABLE],
+        )
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def _interval():
+    interval = getattr(settings, "TRACK_PARTITION_INTERVAL", "day")
+    if interval not in ("day", "week"):
+        raise ValueError(f"TRACK_PARTITION_INTERVAL must be 'day' or 'week', not {interval!r}")
+    return interval
+
+
+def _period_start(moment, interval):
+    day = moment.astimezone(dt_timezone.utc).date()
+    if interval == "week":
+        day -= timedelta(days=day.weekday())
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def _period_end(start, interval):
+    return start + timedelta(days=7 if interval == "week" else 1)
+
+
+def partition_name(start):
+    return f"{PARENT_TABLE}_p{start:%Y%m%d}"
+
+
+def _parse_bound(value):
+    value = value.strip()
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value.strip("'")).astimezone(dt_timezone.utc)
+
+
+def list_partitions():
+    """
+    Returns [(name, lower, upper)] for every range partition, oldest first.
+    `lower` is None for a partition that starts at MINVALUE (the legacy table).
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            """,
+            [PARENT_TABLE],
+        )
+        rows = cursor.fetchall()
+
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND_RE.search(bound or "")
+        if not match:
+            continue  # DEFAULT partition
+        partitions.append((name, _parse_bound(match.group(1)), _parse_bound(match.group(2))))
+
+    partitions.sort(key=lambda p: p[2] or datetime.max.replace(tzinfo=dt_timezone.utc))
+    return partitions
+
+
+def _create_partition(cursor, name, start, end):
+    """
+    Creates `name` for [start, end). Rows already routed to the DEFAULT
+    partition for that range (ingest ran past the pre-created days) would
+    make a plain PARTITION OF fail, so the table is built detached, those
+    rows are moved into it and it is attached. The DEFAULT partition is
+    locked against writes meanwhile. Returns the number of rows moved.
+    """
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL, to_regclass(%s) IS NOT NULL", [name, DEFAULT_PARTITION])
+    exists, has_default = cursor.fetchone()
+    if exists:
+        return 0
+    if not has_default:
+        cursor.execute(
+            f'CREATE TABLE "{name}" PARTITION OF "{PARENT_TABLE}" FOR VALUES FROM (%s) TO (%s)', [start, end]
+        )
+        return 0
+
+    cursor.execute(f'LOCK TABLE "{DEFAULT_PARTITION}" IN EXCLUSIVE MODE')
+    cursor.execute(f'CREATE TABLE "{name}" (LIKE "{PARENT_TABLE}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE "timestamp" >= %s AND "timestamp" < %s RETURNING *) '
+        f'INSERT INTO "{name}" SELECT * FROM moved',
+        [start, end],
+    )
+    moved = cursor.rowcount
+    cursor.execute(f'ALTER TABLE "{PARENT_TABLE}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)', [start, end])
+    return moved
+
+
+def ensure_partitions(ahead_days=None, dry_run=False):
+    """
+    Pre-creates partitions so that every timestamp up to now + `ahead_days`
+    lands in a dedicated partition rather than the DEFAULT one.
+    New partitions start where the newest existing one ends, so switching
+    between daily and weekly never produces overlapping ranges.
+    Returns [(name, start, end, rows moved out of the DEFAULT partition)].
+    """
+    if ahead_days is None:
+        ahead_days = settings.TRACK_PARTITION_PRECREATE_DAYS
+    interval = _interval()
+
+    existing = list_partitions()
+    horizon = timezone.now() + timedelta(days=ahead_days)
+    start = existing[-1][2] if existing else _period_start(timezone.now(), interval)
+
+    created = []
+    while start < horizon:
+        end = _period_end(_period_start(start, interval), interval)
+        name = partition_name(start)
+        moved = 0
+        if not dry_run:
+            with transaction.atomic(), connection.cursor() as cursor:
+                moved = _create_partition(cursor, name, start, end)
+        created.append((name, start, end, moved))
+        start = end
+    return created
+
+
+def drop_expired_partitions(retention_days=None, dry_run=False):
+    """
+    Drops every partition whose whole range is older than the retention cutoff.
+    The DEFAULT partition is never dropped.
+    """
+    if retention_days is None:
+        retention_days = settings.TRACK_RETENTION_DAYS
+    if not retention_days:
+        return []
+
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    dropped = []
+    for name, _lower, upper in list_partitions():
+        if upper is None or upper > cutoff:
+            continue
+        if not dry_run:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{name}"')
+                cursor.execute(f'DROP TABLE "{name}"')
+        dropped.append((name, upper))
+    return dropped
+
+
+def track_window(voyage, now=None):
+    """
+    Timestamp bounds for a voyage replay. Filtering on both ends lets the
+    planner prune every partition outside the voyage.
+    """
+    now = now or timezone.now()
+    start = voyage.departure_time
+    end = voyage.arrival_time if voyage.arrival_time and voyage.arrival_time < now else now
+    return start, end
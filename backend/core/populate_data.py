@@ -11,7 +11,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 django.setup()
 
-from core.models import Vessel, Port, Voyage, Event, Notification, AppUser
+from core.models import Vessel, Port, Voyage, Event, AppUser
+from core.alerts import raise_alert
 
 # --- DATA GENERATORS ---
 
@@ -116,11 +117,12 @@ def create_events():
             )
 
             # Create the Notification (Assigned to system_user)
-            Notification.objects.create(
-                vessel=vessel,
-                event=event,
+            raise_alert(
                 message=f"Alert: {e_type} detected for {vessel.name}",
                 type="Alert",
+                subject=f"vessel:{vessel.id}:{e_type}",
+                vessel=vessel,
+                event=event,
                 user=system_user  # <--- Now this is guaranteed to exist!
             )
     
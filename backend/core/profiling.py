@@ -0,0 +1,137 @@
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+from django.conf import settings
+
+# -------------------------
+# SAMPLING PROFILER
+# -------------------------
+# A background thread reads the profiled thread's stack from
+# sys._current_frames() every PROFILE_INTERVAL_MS and counts identical
+# stacks. Results are written in collapsed-stack format ("a;b;c 42"),
+# which flamegraph.pl and speedscope.app open directly. The profiled code
+# itself is not instrumented, so overhead is one stack walk per interval.
+
+PROFILE_NAME = re.compile(r"^[\w.-]+\.collapsed$")
+
+# Caps profiles running at once per process; extra triggers are skipped
+_slots = threading.BoundedSemaphore(2)
+
+
+class Sampler:
+    def __init__(self, thread_id, interval_s):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                module = frame.f_globals.get("__name__", "?")
+                stack.append(f"{module}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def _slug(label):
+    return re.sub(r"[^\w-]+", "_", label).strip("_")[:60] or "profile"
+
+
+def _prune(directory, max_bytes):
+    """Deletes the oldest profiles until the directory fits in max_bytes."""
+    files = sorted(directory.glob("*.collapsed"), key=lambda p: p.stat().st_mtime)
+    total = sum(p.stat().st_size for p in files)
+    for path in files:
+        if total <= max_bytes:
+            break
+        total -= path.stat().st_size
+        path.unlink(missing_ok=True)
+
+
+def write_profile(label, stacks, duration_ms):
+    directory = Path(settings.PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = (
+        f"{time.strftime('%Y%m%d-%H%M%S')}-{int(duration_ms)}ms-{_slug(label)}"
+        f"-{os.getpid()}-{uuid.uuid4().hex[:6]}.collapsed"
+    )
+    tmp = directory / f".{name}.tmp"
+    tmp.write_text("".join(f"{stack} {count}\n" for stack, count in stacks.most_common()))
+    os.replace(tmp, directory / name)
+    _prune(directory, settings.PROFILE_MAX_BYTES)
+    return name
+
+
+@contextmanager
+def profile(label):
+    """
+    Samples the calling thread for the duration of the block and yields a
+    dict whose "name" is set to the saved profile file (None if skipped).
+    """
+    result = {"name": None}
+    if not _slots.acquire(blocking=False):
+        yield result
+        return
+    try:
+        sampler = Sampler(threading.get_ident(), settings.PROFILE_INTERVAL_MS / 1000)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            yield result
+        finally:
+            sampler.stop()
+            if sampler.samples:
+                result["name"] = write_profile(label, sampler.stacks, (time.perf_counter() - started) * 1000)
+    finally:
+        _slots.release()
+
+
+def maybe_profile(label):
+    """Profiles the block for a PROFILE_SAMPLE_RATE fraction of calls."""
+    rate = settings.PROFILE_SAMPLE_RATE
+    if rate and random.random() < rate:
+        return profile(label)
+    return nullcontext({"name": None})
+
+
+def list_profiles():
+    directory = Path(settings.PROFILE_DIR)
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in directory.glob("*.collapsed"):
+        stat = path.stat()
+        profiles.append({"name": path.name, "bytes": stat.st_size, "created": stat.st_mtime})
+    return sorted(profiles, key=lambda p: p["created"], reverse=True)
+
+
+def profile_path(name):
+    """Resolves a profile file name, rejecting anything outside PROFILE_DIR."""
+    if not PROFILE_NAME.match(name):
+        return None
+    path = Path(settings.PROFILE_DIR) / name
+    return path if path.is_file() else None
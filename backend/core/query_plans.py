@@ -0,0 +1,81 @@
+from django.db import connection
+
+# -------------------------
+# QUERY PLAN CHECKS
+# -------------------------
+# EXPLAINs the SQL an endpoint actually runs and reports sequential scans
+# over tables above a row threshold. PostgreSQL plans come from
+# EXPLAIN (FORMAT JSON); SQLite is supported through EXPLAIN QUERY PLAN so
+# the check also works against a local development database.
+
+# Routes whose result is the whole table by design
+ALLOWED_SEQ_SCANS = {
+    "vessels/": {"vessels"},
+    "ports/": {"ports"},
+    "risks/": {"risk_zones"},
+    "users/": {"core_user"},
+}
+
+
+def _walk(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def seq_scans(sql):
+    """Returns the tables `sql` reads with a full sequential scan."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql)
+            plan = cursor.fetchone()[0]
+            root = plan[0]["Plan"]
+            return [
+                node["Relation Name"] for node in _walk(root)
+                if node.get("Node Type") in ("Seq Scan", "Parallel Seq Scan") and "Relation Name" in node
+            ]
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        tables = []
+        for row in cursor.fetchall():
+            detail = row[-1]
+            # "SCAN vessels" is a full scan; "SCAN t USING [COVERING] INDEX" is not
+            if detail.startswith("SCAN ") and " USING " not in detail:
+                tables.append(detail.split()[1])
+        return tables
+
+
+def table_rows(table, cache):
+    """Row count (estimate on PostgreSQL); 0 for subqueries and CTEs."""
+    if "__tables__" not in cache:
+        cache["__tables__"] = set(connection.introspection.table_names())
+    if table not in cache["__tables__"]:
+        return 0
+    if table not in cache:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = to_regclass(%s)", [table])
+            else:
+                cursor.execute(f'SELECT COUNT(*) FROM "{table}"')
+            row = cursor.fetchone()
+            cache[table] = row[0] if row else 0
+    return cache[table]
+
+
+def check_queries(route, queries, min_rows, size_cache):
+    """
+    Returns (table, rows, sql) for every disallowed sequential scan over a
+    table with at least `min_rows` rows among `queries` (captured dicts).
+    """
+    allowed = ALLOWED_SEQ_SCANS.get(route, set())
+    violations = []
+    for query in queries:
+        sql = query["sql"]
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            continue
+        for table in seq_scans(sql):
+            if table in allowed:
+                continue
+            rows = table_rows(table, size_cache)
+            if rows >= min_rows:
+                violations.append((table, rows, sql))
+    return violations
@@ -0,0 +1,177 @@
+import numpy as np
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from core.geo import parse_location
+from core.models import Notification, Port, RiskZone, Vessel, Voyage
+
+# -------------------------
+# TRADE REGIONS
+# -------------------------
+# Named ocean/trade regions as coarse (lon, lat) polygons. Point-in-polygon
+# runs once per process over the centres of a GRID_DEGREES grid; after that
+# a position's region is a single array lookup. Rows store the region id at
+# write time (vessels by last position, ports by location, voyages by both
+# endpoints, notifications by vessel or port), so region filters are plain
+# integer comparisons at query time.
+#
+# Polygons are tested in order and the first match wins, so a later region
+# may overlap an earlier one. Positions outside every polygon (polar seas,
+# Southern Ocean) get UNASSIGNED.
+
+UNASSIGNED = 0
+ALL_REGIONS = "All Regions"
+
+# (id, name, rings) — ids are stored in the database, never renumber them
+REGIONS = [
+    (4, "Middle East", [
+        [(32, 29), (36, 34.5), (42, 41), (63, 41), (68, 25), (68, 5), (52, 5), (43, 11)],
+    ]),
+    (2, "Europe", [
+        [(-32, 35), (-6, 35.5), (12, 37.5), (36, 34.5), (42, 41), (45, 47), (45, 75), (-32, 75)],
+    ]),
+    (5, "Africa", [
+        [(-25, -45), (-25, 35), (-6, 35.5), (12, 37.5), (32, 32), (32, 29), (43, 11), (52, 5), (60, -45)],
+    ]),
+    (3, "Americas", [
+        [(-170, 75), (-20, 75), (-30, 10), (-25, -60), (-150, -60), (-150, 50), (-170, 60)],
+    ]),
+    (1, "Asia Pacific", [
+        [(55, -50), (55, 5), (68, 5), (68, 25), (63, 41), (60, 80), (180, 80), (180, -50)],
+        [(-180, -50), (-180, 70), (-170, 70), (-150, 50), (-150, -50)],
+    ]),
+]
+
+REGION_NAMES = {region_id: name for region_id, name, _ in REGIONS}
+REGION_IDS = {name.lower(): region_id for region_id, name, _ in REGIONS}
+
+GRID_DEGREES = 1.0
+
+_grid = None
+
+
+def _inside(lons, lats, ring):
+    """Even-odd ray casting of many points against one ring."""
+    inside = np.zeros(lons.shape, dtype=bool)
+    xs, ys = zip(*ring)
+    for i in range(len(ring)):
+        x1, y1 = xs[i - 1], ys[i - 1]
+        x2, y2 = xs[i], ys[i]
+        if y1 == y2:
+            continue
+        crosses = (y1 > lats) != (y2 > lats)
+        x_at = x1 + (lats - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (lons < x_at)
+    return inside
+
+
+def build_grid(step=GRID_DEGREES):
+    """Region id for the centre of every step x step cell, indexed [lat, lon]."""
+    lats = np.arange(-90 + step / 2, 90, step)
+    lons = np.arange(-180 + step / 2, 180, step)
+    lon_grid, lat_grid = np.meshgrid(lons, lats)
+    grid = np.full(lat_grid.shape, UNASSIGNED, dtype=np.uint8)
+    for region_id, _, rings in REGIONS:
+        hit = np.zeros(lat_grid.shape, dtype=bool)
+        for ring in rings:
+            hit |= _inside(lon_grid, lat_grid, ring)
+        grid[hit & (grid == UNASSIGNED)] = region_id
+    return grid
+
+
+def _get_grid():
+    global _grid
+    if _grid is None:
+        _grid = build_grid()
+    return _grid
+
+
+def region_ids(lats, lons):
+    """Vectorized region lookup for arrays of positions."""
+    grid = _get_grid()
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    unknown = np.isnan(lats) | np.isnan(lons)
+    # Casting NaN to int is undefined; look unknown positions up at (0, 0)
+    lats = np.where(unknown, 0.0, lats)
+    lons = np.where(unknown, 0.0, lons)
+    rows = np.clip(((lats + 90) / GRID_DEGREES).astype(int), 0, grid.shape[0] - 1)
+    cols = np.clip((((lons + 180) % 360) / GRID_DEGREES).astype(int), 0, grid.shape[1] - 1)
+    ids = grid[rows, cols].astype(int)
+    return np.where(unknown, UNASSIGNED, ids)
+
+
+def region_of(lat, lon):
+    """Region id of one position; UNASSIGNED when unknown."""
+    if lat is None or lon is None:
+        return UNASSIGNED
+    return int(region_ids([lat], [lon])[0])
+
+
+def region_of_location(location):
+    """Region id of a Port.location string."""
+    coords = parse_location(location)
+    return region_of(*coords) if coords else UNASSIGNED
+
+
+def parse_region(value):
+    """
+    Maps a `region` query parameter to a region id. Returns None for no
+    filter ("All Regions" or empty) and raises ValueError for unknown names.
+    """
+    if not value or value == ALL_REGIONS:
+        return None
+    try:
+        return REGION_IDS[value.strip().lower()]
+    except KeyError:
+        raise ValueError(f"Unknown region '{value}'") from None
+
+
+# -------------------------
+# WRITE-TIME ASSIGNMENT
+# -------------------------
+# Single-row ORM writes are tagged here; bulk paths (ingest, synthetic
+# fleet, benchmark seeding) compute the ids themselves and
+# `assign_regions` backfills existing rows.
+
+@receiver(pre_save, sender=Vessel)
+def _tag_vessel(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.region_id = region_of(instance.last_position_lat, instance.last_position_lon)
+
+
+@receiver(pre_save, sender=Port)
+def _tag_port(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.region_id = region_of_location(instance.location)
+
+
+@receiver(pre_save, sender=RiskZone)
+def _tag_risk_zone(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.region_id = region_of(instance.latitude, instance.longitude)
+
+
+@receiver(pre_save, sender=Voyage)
+def _tag_voyage(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    ports = dict(
+        Port.objects.filter(id__in=[p for p in (instance.port_from_id, instance.port_to_id) if p])
+        .values_list("id", "region_id")
+    )
+    instance.region_from = ports.get(instance.port_from_id, UNASSIGNED)
+    instance.region_to = ports.get(instance.port_to_id, UNASSIGNED)
+
+
+@receiver(pre_save, sender=Notification)
+def _tag_notification(sender, instance, raw=False, **kwargs):
+    if raw or instance.region_id:
+        return
+    if instance.vessel_id is not None:
+        source = Vessel.objects.filter(pk=instance.vessel_id)
+    elif instance.port_id is not None:
+        source = Port.objects.filter(pk=instance.port_id)
+    else:
+        return
+    instance.region_id = source.values_list("region_id", flat=True).first() or UNASSIGNED
@@ -0,0 +1,289 @@
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core import track_archive
+from core.models import TrackRollup, VoyageTrack
+
+# -------------------------
+# MULTI-RESOLUTION TRACK ROLLUPS
+# -------------------------
+# Every ingested track point is folded into 1 min / 15 min / 1 h buckets.
+# Long-range history is then served from O(buckets) rows instead of
+# O(raw reports).
+
+RESOLUTIONS = tuple(seconds for seconds, _label in TrackRollup.RESOLUTIONS)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+_UPSERT_SQL = f"""
+    INSERT INTO {TrackRollup._meta.db_table} (
+        vessel_id, resolution, bucket, point_count, speed_sum, speed_count,
+        course_x_sum, course_y_sum, latitude, longitude, last_timestamp
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (vessel_id, resolution, bucket) DO UPDATE SET
+        point_count = {TrackRollup._meta.db_table}.point_count + excluded.point_count,
+        speed_sum = {TrackRollup._meta.db_table}.speed_sum + excluded.speed_sum,
+        speed_count = {TrackRollup._meta.db_table}.speed_count + excluded.speed_count,
+        course_x_sum = {TrackRollup._meta.db_table}.course_x_sum + excluded.course_x_sum,
+        course_y_sum = {TrackRollup._meta.db_table}.course_y_sum + excluded.course_y_sum,
+        latitude = CASE WHEN excluded.last_timestamp >= {TrackRollup._meta.db_table}.last_timestamp
+                        THEN excluded.latitude ELSE {TrackRollup._meta.db_table}.latitude END,
+        longitude = CASE WHEN excluded.last_timestamp >= {TrackRollup._meta.db_table}.last_timestamp
+                         THEN excluded.longitude ELSE {TrackRollup._meta.db_table}.longitude END,
+        last_timestamp = CASE WHEN excluded.last_timestamp >= {TrackRollup._meta.db_table}.last_timestamp
+                              THEN excluded.last_timestamp ELSE {TrackRollup._meta.db_table}.last_timestamp END
+"""
+
+
+def _db_time(moment):
+    """`moment` as the backend stores DateTimeFields, so raw upserts compare like ORM writes."""
+    return connection.ops.adapt_datetimefield_value(moment)
+
+
+def bucket_start(moment, resolution):
+    seconds = int((moment - _EPOCH).total_seconds())
+    return _EPOCH + timedelta(seconds=seconds - seconds % resolution)
+
+
+def record_track_points(points):
+    """
+    Folds an ingest batch into the rollup tables.
+    `points` is an iterable of (vessel_id, timestamp, lat, lon, speed, course).
+    The batch is pre-aggregated in memory so each touched bucket costs one
+    upsert regardless of how many reports fell into it.
+    """
+    buckets = {}
+    for vessel_id, ts, lat, lon, speed, course in points:
+        if lat is None or lon is None or ts is None:
+            continue
+        for resolution in RESOLUTIONS:
+            key = (vessel_id, resolution, bucket_start(ts, resolution))
+            acc = buckets.get(key)
+            if acc is None:
+                acc = buckets[key] = [0, 0.0, 0, 0.0, 0.0, lat, lon, ts]
+            acc[0] += 1
+            if speed is not None:
+                acc[1] += speed
+                acc[2] += 1
+            if course is not None:
+                acc[3] += math.cos(math.radians(course))
+                acc[4] += math.sin(math.radians(course))
+            if ts >= acc[7]:
+                acc[5], acc[6], acc[7] = lat, lon, ts
+
+    if not buckets:
+        return 0
+
+    rows = [
+        (vessel_id, resolution, _db_time(bucket), *acc[:7], _db_time(acc[7]))
+        for (vessel_id, resolution, bucket), acc in buckets.items()
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(_UPSERT_SQL, rows)
+    return len(rows)
+
+
+def record_track_arrays(vessel_ids, epochs, lats, lons, speeds, courses):
+    """
+    Vectorised record_track_points for bulk loaders. All arguments are
+    equal-length numpy arrays sorted by (vessel_id, epoch); speed/course
+    use NaN for unknown. Buckets are reduced with numpy before the upsert.
+    """
+    if len(epochs) == 0:
+        return 0
+    epochs = np.asarray(epochs, dtype=np.int64)
+    known_speed = ~np.isnan(speeds)
+    known_course = ~np.isnan(courses)
+    radians = np.radians(np.where(known_course, courses, 0.0))
+    course_x = np.where(known_course, np.cos(radians), 0.0)
+    course_y = np.where(known_course, np.sin(radians), 0.0)
+    speed_values = np.where(known_speed, speeds, 0.0)
+    vessel_change = np.r_[True, vessel_ids[1:] != vessel_ids[:-1]]
+
+    rows = []
+    for resolution in RESOLUTIONS:
+        buckets = epochs - epochs % resolution
+        starts = np.flatnonzero(vessel_change | np.r_[True, buckets[1:] != buckets[:-1]])
+        lasts = np.r_[starts[1:], len(epochs)] - 1
+        counts = np.diff(np.r_[starts, len(epochs)])
+        speed_sums = np.add.reduceat(speed_values, starts)
+        speed_counts = np.add.reduceat(known_speed.astype(np.int64), starts)
+        x_sums = np.add.reduceat(course_x, starts)
+        y_sums = np.add.reduceat(course_y, starts)
+        for i, first in enumerate(starts):
+            last = lasts[i]
+            rows.append((
+                int(vessel_ids[first]), resolution,
+                _db_time(_EPOCH + timedelta(seconds=int(buckets[first]))),
+                int(counts[i]), float(speed_sums[i]), int(speed_counts[i]),
+                float(x_sums[i]), float(y_sums[i]),
+                float(lats[last]), float(lons[last]),
+                _db_time(_EPOCH + timedelta(seconds=int(epochs[last]))),
+            ))
+
+    with connection.cursor() as cursor:
+        cursor.executemany(_UPSERT_SQL, rows)
+    return len(rows)
+
+
+def _mean_course(x_sum, y_sum):
+    if not x_sum and not y_sum:
+        return None
+    return round(math.degrees(math.atan2(y_sum, x_sum)) % 360, 1)
+
+
+def _retained_from(resolution, now):
+    """Oldest bucket prune_rollups() keeps for `resolution`, or None if kept forever."""
+    days = settings.TRACK_ROLLUP_RETENTION_DAYS.get(resolution)
+    return now - timedelta(days=days) if days else None
+
+
+def select_resolution(vessel_id, start, end, max_points, archived_points=0):
+    """
+    Returns None when the raw points (hot rows plus `archived_points` from
+    the cold archive) fit in `max_points`, otherwise the finest rollup
+    resolution whose bucket count fits — i.e. only as coarse as the request
+    needs. Resolutions pruned past `start` and resolutions with no buckets
+    in the window (rows never passed through `rollup_tracks`) cannot cover
+    it and are skipped; when none can, returns None and the caller strides
+    the raw rows. Each probe reads at most max_points + 1 index rows.
+    """
+    if archived_points <= max_points:
+        raw = VoyageTrack.objects.filter(vessel_id=vessel_id, timestamp__lte=end)
+        if start:
+            raw = raw.filter(timestamp__gte=start)
+        budget = max_points - archived_points
+        if raw[:budget + 1].count() <= budget:
+            return None
+
+    now = timezone.now()
+    covering = None
+    for resolution in RESOLUTIONS:
+        retained_from = _retained_from(resolution, now)
+        if retained_from and (not start or start < retained_from):
+            continue
+        rollups = TrackRollup.objects.filter(vessel_id=vessel_id, resolution=resolution, bucket__lte=end)
+        if start:
+            rollups = rollups.filter(bucket__gte=bucket_start(start, resolution))
+        count = rollups[:max_points + 1].count()
+        if not count:
+            continue
+        if count <= max_points:
+            return resolution
+        covering = resolution
+    return covering
+
+
+def stride(rows, max_points):
+    """Every n-th row so that at most `max_points` remain."""
+    if len(rows) <= max_points:
+        return rows
+    return rows[::math.ceil(len(rows) / max_points)]
+
+
+def rollup_track(vessel, start, end, resolution, max_points):
+    """
+    Rollup points shaped like VoyageTrackSerializer output so the replay
+    page can consume either transparently. If even the coarsest resolution
+    exceeds max_points, the series is evenly strided down to fit.
+    """
+    rollups = TrackRollup.objects.filter(vessel=vessel, resolution=resolution, bucket__lte=end)
+    if start:
+        rollups = rollups.filter(bucket__gte=bucket_start(start, resolution))
+    rows = list(rollups.order_by("bucket").values(
+        "id", "bucket", "latitude", "longitude", "speed_sum", "speed_count",
+        "course_x_sum", "course_y_sum",
+    ))
+
+    rows = stride(rows, max_points)
+
+    return [{
+        "id": row["id"],
+        "vessel": vessel.id,
+        "vessel_name": vessel.name,
+        "latitude": row["latitude"],
+        "longitude": row["longitude"],
+        "speed": round(row["speed_sum"] / row["speed_count"], 2) if row["speed_count"] else None,
+        "course": _mean_course(row["course_x_sum"], row["course_y_sum"]),
+        "timestamp": row["bucket"],
+    } for row in rows]
+
+
+def prune_rollups(now=None):
+    """
+    Deletes buckets past TRACK_ROLLUP_RETENTION_DAYS for their resolution.
+    """
+    now = now or timezone.now()
+    deleted = {}
+    for resolution, days in settings.TRACK_ROLLUP_RETENTION_DAYS.items():
+        if not days:
+            continue
+        count, _ = TrackRollup.objects.filter(
+            resolution=resolution,
+            bucket__lt=now - timedelta(days=days)
+        ).delete()
+        deleted[resolution] = count
+    return deleted
+
+
+def _rebuild_start(since):
+    """
+    First coarsest bucket at or after `since` that still has raw rows:
+    days moved to the cold archive keep only their rollups.
+    """
+    coarsest = RESOLUTIONS[-1]
+    start = bucket_start(since, coarsest)
+    watermark = track_archive.archived_until()
+    if watermark and watermark > start:
+        start = bucket_start(watermark, coarsest)
+        if start < watermark:
+            start += timedelta(seconds=coarsest)
+    return start
+
+
+def rebuild_rollups(since, batch_size=20000, log=print):
+    """
+    Re-derives the rollups from raw voyage_tracks for every bucket from
+    `since` (clamped to the archive watermark) on, one UTC day per
+    transaction. Ingest writes its points and their rollups in one
+    transaction; the rollup table is locked against writers while a day is
+    rebuilt, so a concurrent batch is counted exactly once. Returns
+    (points rolled up, rebuild start).
+    """
+    start = _rebuild_start(since)
+    now = timezone.now()
+    total = 0
+    day_start = start
+    while True:
+        day_end = day_start + timedelta(days=1)
+        last = day_end > now
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LOCK TABLE {TrackRollup._meta.db_table} IN SHARE ROW EXCLUSIVE MODE")
+            rollups = TrackRollup.objects.filter(bucket__gte=day_start)
+            points = VoyageTrack.objects.filter(timestamp__gte=day_start)
+            if not last:
+                rollups = rollups.filter(bucket__lt=day_end)
+                points = points.filter(timestamp__lt=day_end)
+            rollups.delete()
+
+            batch = []
+            rows = points.values_list("vessel_id", "timestamp", "latitude", "longitude", "speed", "course")
+            for point in rows.iterator(chunk_size=batch_size):
+                batch.append(point)
+                if len(batch) >= batch_size:
+                    record_track_points(batch)
+                    total += len(batch)
+                    batch = []
+            record_track_points(batch)
+            total += len(batch)
+        log(f"Rolled up {total} points through {min(day_end, now):%Y-%m-%d %H:%M}...")
+        if last:
+            return total, start
+        day_start = day_end
@@ -0,0 +1,117 @@
+import random
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from core import jobs
+from core.models import ScheduledJob
+
+# -------------------------
+# PERIODIC SCHEDULER
+# -------------------------
+# Queues the periodic job kinds (settings.JOB_SCHEDULE) into the job table
+# when they fall due. Every `run_workers` process runs a scheduler; the
+# decision for a kind is taken under a per-kind PostgreSQL advisory lock
+# against the shared ScheduledJob row, so however many processes and hosts
+# are running, each due run is queued exactly once. A kind whose previous
+# run is still queued or running is not queued again; the skipped run is
+# counted and the next one is due a full interval later. Intervals are
+# spread by +/- SCHEDULER_JITTER so runs do not line up across kinds. The
+# outcome and duration of each run are stored on the same row by core.jobs.
+#
+# SQLite has no advisory locks; there the decision is serialized within
+# the process, which is enough for a single dev worker.
+
+_LOCK_NAMESPACE = 0x7363686C  # "schl"
+_local_lock = threading.Lock()
+
+
+def _interval(every):
+    jitter = settings.SCHEDULER_JITTER
+    return timedelta(seconds=every * (1 + random.uniform(-jitter, jitter)))
+
+
+def _try_lock(kind):
+    """Transaction-scoped advisory lock for `kind`; False if another instance holds it."""
+    if connection.vendor != "postgresql":
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(%s, hashtext(%s))", [_LOCK_NAMESPACE, kind])
+        return cursor.fetchone()[0]
+
+
+def _decide(kind, every, now):
+    """
+    Queues `kind` if it is due. Returns when this instance should look
+    again, or None if another instance is deciding right now.
+    """
+    with transaction.atomic():
+        if not _try_lock(kind):
+            return None
+        state, _ = ScheduledJob.objects.get_or_create(kind=kind)
+        if state.next_run_at and state.next_run_at > now:
+            return state.next_run_at
+
+        state.next_run_at = now + _interval(every)
+        if jobs.enqueue(kind, unique=True) is None:
+            state.skipped += 1
+            state.save(update_fields=["next_run_at", "skipped"])
+        else:
+            state.last_scheduled_at = now
+            state.save(update_fields=["next_run_at", "last_scheduled_at"])
+        return state.next_run_at
+
+
+def tick(due=None, now=None, kinds=None):
+    """
+    Queues every periodic kind (or those in `kinds`) that is due. `due` maps
+    kind -> when this instance should next check it and is updated in place.
+    """
+    due = {} if due is None else due
+    now = now or timezone.now()
+    for kind, spec in jobs.REGISTRY.items():
+        if not spec.every or (kinds and kind not in kinds) or due.get(kind, now) > now:
+            continue
+        if connection.vendor == "postgresql":
+            next_check = _decide(kind, spec.every, now)
+        else:
+            with _local_lock:
+                next_check = _decide(kind, spec.every, now)
+        due[kind] = next_check or now + timedelta(seconds=settings.SCHEDULER_TICK_SECONDS)
+    return due
+
+
+class PeriodicScheduler:
+    """Background thread calling tick() every SCHEDULER_TICK_SECONDS."""
+
+    def __init__(self, kinds=None, log=print):
+        self.kinds = kinds
+        self.log = log
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="periodic-scheduler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        due = {}
+        try:
+            while not self._stop.is_set():
+                started = time.monotonic()
+                try:
+                    tick(due, kinds=self.kinds)
+                except DatabaseError as exc:
+                    self.log(f"❌ Scheduler tick failed: {exc}")
+                    connection.close()
+                self._stop.wait(max(0.0, settings.SCHEDULER_TICK_SECONDS - (time.monotonic() - started)))
+        finally:
+            connection.close()
@@ -0,0 +1,42 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.db import connection as default_connection
+
+# -------------------------
+# UNMANAGED TABLES
+# -------------------------
+# Most core tables (vessels, ports, notifications, ...) are managed=False:
+# production owns them, and migrations only add their indexes, columns and
+# triggers when the tables already exist. An empty database (the test
+# database, a local bench_api run) gets the tables here, built from the
+# current models, together with the DDL those migrations skipped.
+
+# Full-text search column, trigger and GIN index (PostgreSQL only)
+SEARCH_MIGRATION = "core.migrations.0015_alert_search"
+
+
+def create_unmanaged_tables(connection=None):
+    """Creates the missing unmanaged core tables. Returns their names."""
+    connection = connection or default_connection
+    existing = set(connection.introspection.table_names())
+    missing = [
+        model for model in apps.get_app_config("core").get_models()
+        if not model._meta.managed and model._meta.db_table not in existing
+    ]
+    if not missing:
+        return []
+
+    with connection.schema_editor() as editor:
+        for model in missing:
+            # create_model() leaves out the indexes of unmanaged models
+            editor.create_model(model)
+            for index in model._meta.indexes:
+                editor.add_index(model, index)
+    created = [model._meta.db_table for model in missing]
+
+    if "notifications" in created:
+        # Builds its index CONCURRENTLY, so it cannot run in a transaction
+        with connection.schema_editor(atomic=False) as editor:
+            import_module(SEARCH_MIGRATION).add_search(apps, editor)
+    return created
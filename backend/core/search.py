@@ -0,0 +1,215 @@
+import json
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.models import Notification
+
+# -------------------------
+# ALERT SEARCH
+# -------------------------
+# On PostgreSQL every notification carries a `search_vector` tsvector over
+# its message (weight A) and its vessel and port names (weight B), filled by
+# a trigger on insert and indexed with GIN (migration 0015), so a search is
+# an index lookup instead of an ILIKE scan. Each query term is matched as a
+# prefix ("rott" finds "Rotterdam") and all terms must match.
+#
+# Other backends (SQLite dev and test runs) use an in-process inverted
+# index over the same text, built on the first search and kept current by
+# the receivers below. Bulk SQL writers call reset_memory_index().
+
+CONFIG = "simple"
+MAX_TERMS = 8
+
+# Same weights as ts_rank's defaults for A and B
+MESSAGE_WEIGHT = 1.0
+NAME_WEIGHT = 0.4
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def query_terms(query):
+    """Distinct lowercase terms of a search box value, at most MAX_TERMS."""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_TERMS]
+
+
+def _tsquery(terms):
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def _vector_sql():
+    return f"{Notification._meta.db_table}.search_vector"
+
+
+def filter_alerts(queryset, query):
+    """Notifications in `queryset` matching every term of `query` as a prefix."""
+    terms = query_terms(query)
+    if not terms:
+        return queryset.none()
+    if connection.vendor == "postgresql":
+        return queryset.filter(RawSQL(
+            f"{_vector_sql()} @@ to_tsquery(%s, %s)", [CONFIG, _tsquery(terms)], output_field=BooleanField()
+        ))
+    return _with_ids(queryset, _get_memory_index().search(terms))
+
+
+def _with_ids(queryset, ids):
+    """
+    Rows of `queryset` whose id is in `ids`. The ids travel as one JSON
+    parameter read back with json_each, so a broad search (hundreds of
+    thousands of matches) stays under SQLite's bound-variable limit.
+    """
+    if not ids:
+        return queryset.none()
+    if connection.vendor == "sqlite":
+        ids_json = json.dumps(sorted(ids), separators=(",", ":"))
+        return queryset.filter(id__in=RawSQL("SELECT value FROM json_each(%s)", [ids_json]))
+    return queryset.filter(id__in=list(ids))
+
+
+def rank_alerts(queryset, query, limit):
+    """
+    The `limit` best matches for `query`, most relevant first and newest
+    first among equals. Each row gets a `rank` attribute.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    if connection.vendor == "postgresql":
+        rank = RawSQL(
+            f"ts_rank({_vector_sql()}, to_tsquery(%s, %s))", [CONFIG, _tsquery(terms)], output_field=FloatField()
+        )
+        matches = filter_alerts(queryset, query).annotate(rank=rank)
+        return list(matches.order_by("-rank", "-timestamp", "-id")[:limit])
+
+    # Rank on (id, timestamp) pairs, then load only the rows returned
+    scores = _get_memory_index().search(terms)
+    keys = _with_ids(queryset, scores).values_list("id", "timestamp")
+    best = sorted(
+        keys.iterator(chunk_size=5000), key=lambda key: (scores[key[0]], key[1], key[0]), reverse=True
+    )[:limit]
+    rows = {row.id: row for row in queryset.filter(id__in=[pk for pk, _ in best])}
+    for row in rows.values():
+        row.rank = scores[row.id]
+    return [rows[pk] for pk, _ in best if pk in rows]
+
+
+# -------------------------
+# IN-MEMORY FALLBACK
+# -------------------------
+
+class MemoryIndex:
+    """Inverted index token -> {notification id: weight} with prefix lookup."""
+
+    def __init__(self):
+        self._postings = defaultdict(dict)
+        self._documents = {}
+        self._tokens = []
+        self._stale = False
+        self._lock = threading.Lock()
+
+    def add(self, pk, message, *names):
+        weights = defaultdict(float)
+        for token in tokenize(message):
+            weights[token] += MESSAGE_WEIGHT
+        for name in names:
+            for token in tokenize(name):
+                weights[token] += NAME_WEIGHT
+        with self._lock:
+            self._discard(pk)
+            for token, weight in weights.items():
+                self._postings[token][pk] = weight
+            self._documents[pk] = list(weights)
+            self._stale = True
+
+    def remove(self, pk):
+        with self._lock:
+            self._discard(pk)
+
+    def _discard(self, pk):
+        for token in self._documents.pop(pk, []):
+            postings = self._postings[token]
+            postings.pop(pk, None)
+            if not postings:
+                del self._postings[token]
+                self._stale = True
+
+    def _expand(self, term):
+        """Indexed tokens starting with `term`."""
+        start = bisect_left(self._tokens, term)
+        end = start
+        while end < len(self._tokens) and self._tokens[end].startswith(term):
+            end += 1
+        return self._tokens[start:end]
+
+    def search(self, terms):
+        """{id: score} of documents matching every term as a prefix."""
+        with self._lock:
+            if self._stale:
+                self._tokens = sorted(self._postings)
+                self._stale = False
+            scores = None
+            for term in terms:
+                term_scores = defaultdict(float)
+                for token in self._expand(term):
+                    for pk, weight in self._postings[token].items():
+                        term_scores[pk] += weight
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {pk: score + term_scores[pk] for pk, score in scores.items() if pk in term_scores}
+                if not scores:
+                    return {}
+            return dict(scores or {})
+
+
+_memory_index = None
+_memory_lock = threading.Lock()
+
+
+def _get_memory_index():
+    global _memory_index
+    with _memory_lock:
+        if _memory_index is None:
+            index = MemoryIndex()
+            rows = Notification.objects.values_list("id", "message", "vessel__name", "port__name")
+            for pk, message, vessel_name, port_name in rows.iterator(chunk_size=5000):
+                index.add(pk, message, vessel_name, port_name)
+            _memory_index = index
+        return _memory_index
+
+
+def reset_memory_index():
+    """Drops the fallback index; the next search rebuilds it."""
+    global _memory_index
+    with _memory_lock:
+        _memory_index = None
+
+
+@receiver(post_save, sender=Notification)
+def _index_alert(sender, instance, created=False, raw=False, **kwargs):
+    # PostgreSQL rows are indexed by the trigger; the fallback index is only
+    # updated once it has been built
+    if raw or _memory_index is None or connection.vendor == "postgresql":
+        return
+    names = (
+        Notification.objects.filter(pk=instance.pk).values_list("vessel__name", "port__name").first() or ()
+    )
+    _memory_index.add(instance.pk, instance.message, *names)
+
+
+@receiver(post_delete, sender=Notification)
+def _unindex_alert(sender, instance, **kwargs):
+    if _memory_index is not None:
+        _memory_index.remove(instance.pk)
@@ -0,0 +1,230 @@
+from datetime import timedelta
+
+import numpy as np
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.analytics import apply_voyages, rebuild_flow_stats, rebuild_voyage_stats, refresh_fleet_composition
+from core.dashboard import refresh_stats
+from core.geo import EARTH_RADIUS_NM, parse_location
+from core.ingest import copy_track_arrays
+from core.models import Port, Vessel, Voyage, VoyageTrack, TrackRollup
+from core.regions import region_ids
+from core.rollups import record_track_arrays
+
+# -------------------------
+# SYNTHETIC FLEET GENERATOR
+# -------------------------
+# Produces N vessels sailing great-circle routes between known ports with
+# M reports each. Everything is derived from one seed, so the same options
+# always produce the same dataset and benchmark numbers stay comparable.
+
+FALLBACK_PORTS = [
+    ("Port of Shanghai", "China", 31.2304, 121.4737),
+    ("Port of Singapore", "Singapore", 1.290270, 103.851959),
+    ("Port of Rotterdam", "Netherlands", 51.9244, 4.4777),
+    ("Port of Los Angeles", "USA", 33.7288, -118.2620),
+    ("Port of Busan", "South Korea", 35.1046, 129.0432),
+    ("Port of Jebel Ali", "UAE", 24.9857, 55.0275),
+    ("Port of Antwerp", "Belgium", 51.2194, 4.4025),
+    ("Port of Hamburg", "Germany", 53.5488, 9.9872),
+    ("Port of Tanjung Pelepas", "Malaysia", 1.3855, 103.541),
+    ("Port of Valencia", "Spain", 39.4699, -0.3763),
+]
+
+VESSEL_TYPES = ['Bulk Carrier', 'Container Ship', 'Oil Tanker', 'General Cargo', 'LNG Carrier']
+CARGO_TYPES = ['Containers', 'Crude Oil', 'Iron Ore', 'Grain', 'LNG', 'Vehicles']
+FLAGS = ['Panama', 'Liberia', 'Marshall Islands', 'Singapore', 'Malta', 'Bahamas']
+OPERATORS = ['Maersk Line', 'MSC', 'CMA CGM', 'Hapag-Lloyd', 'Evergreen Marine', 'ONE Network']
+
+# Synthetic MMSIs live in a block no real station uses
+MMSI_BASE = 990_000_000
+
+
+def load_ports():
+    """
+    Returns (port_ids, lat/lon array). Seeds the fallback port list when
+    the ports table has no usable coordinates.
+    """
+    ports = [(p.id, parse_location(p.location)) for p in Port.objects.order_by("id")]
+    ports = [(pid, loc) for pid, loc in ports if loc]
+    if len(ports) < 2:
+        now = timezone.now()
+        for name, country, lat, lon in FALLBACK_PORTS:
+            Port.objects.get_or_create(name=name, defaults={
+                "country": country, "location": f"{lat}, {lon}",
+                "congestion_score": 0, "avg_wait_time": 0, "last_update": now,
+            })
+        return load_ports()
+    return np.array([pid for pid, _ in ports]), np.radians([loc for _, loc in ports])
+
+
+def _unit_vectors(latlon):
+    lat, lon = latlon[..., 0], latlon[..., 1]
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def generate_chunk(rng, first_index, count, points, interval_s, end_epoch, port_ids, port_coords):
+    """
+    Generates `count` vessels starting at vessel number `first_index`.
+    Returns (vessel attributes, voyage attributes, track arrays) with
+    tracks of shape (count, points).
+    """
+    n_ports = len(port_ids)
+    origin = rng.integers(0, n_ports, count)
+    dest = (origin + rng.integers(1, n_ports, count)) % n_ports
+
+    a = _unit_vectors(port_coords[origin])
+    b = _unit_vectors(port_coords[dest])
+    omega = np.arccos(np.clip((a * b).sum(axis=1), -1.0, 1.0))
+    omega = np.maximum(omega, 1e-6)
+    route_nm = omega * EARTH_RADIUS_NM
+
+    knots = rng.uniform(10.0, 20.0, count)
+    voyage_s = route_nm / knots * 3600.0
+    progress0 = rng.uniform(0.0, 0.8, count)
+
+    steps = np.arange(points)
+    epochs = np.broadcast_to(end_epoch - (points - 1 - steps) * interval_s, (count, points))
+    progress = progress0[:, None] + steps[None, :] * interval_s / voyage_s[:, None]
+    arrived = progress >= 1.0
+    progress = np.minimum(progress, 1.0)
+
+    # Spherical linear interpolation along each route
+    sin_omega = np.sin(omega)[:, None]
+    wa = np.sin((1.0 - progress) * omega[:, None]) / sin_omega
+    wb = np.sin(progress * omega[:, None]) / sin_omega
+    xyz = wa[..., None] * a[:, None, :] + wb[..., None] * b[:, None, :]
+    lat = np.degrees(np.arctan2(xyz[..., 2], np.hypot(xyz[..., 0], xyz[..., 1])))
+    lon = np.degrees(np.arctan2(xyz[..., 1], xyz[..., 0]))
+    lat = np.clip(lat + rng.normal(0.0, 0.01, lat.shape), -90.0, 90.0)
+    lon = (lon + rng.normal(0.0, 0.01, lon.shape) + 180.0) % 360.0 - 180.0
+
+    # Course from each point to the next; the last point repeats its predecessor
+    phi1, phi2 = np.radians(lat[:, :-1]), np.radians(lat[:, 1:])
+    dlmb = np.radians(lon[:, 1:] - lon[:, :-1])
+    bearing = np.degrees(np.arctan2(
+        np.sin(dlmb) * np.cos(phi2),
+        np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(dlmb),
+    )) % 360.0
+    course = np.concatenate([bearing, bearing[:, -1:]], axis=1) if points > 1 else np.full((count, 1), np.nan)
+    speed = np.where(arrived, 0.0, knots[:, None] + rng.normal(0.0, 0.5, (count, points)))
+
+    departure = epochs[0, 0] - progress0 * voyage_s
+    vessels = {
+        "mmsi": MMSI_BASE + first_index + np.arange(count),
+        "type": rng.integers(0, len(VESSEL_TYPES), count),
+        "cargo": rng.integers(0, len(CARGO_TYPES), count),
+        "flag": rng.integers(0, len(FLAGS), count),
+        "operator": rng.integers(0, len(OPERATORS), count),
+    }
+    voyages = {
+        "origin": port_ids[origin],
+        "dest": port_ids[dest],
+        "departure": departure,
+        "arrival": departure + voyage_s,
+    }
+    tracks = {"epochs": epochs, "lat": lat, "lon": lon, "speed": speed, "course": course}
+    return vessels, voyages, tracks
+
+
+def synthetic_vessels():
+    return Vessel.objects.filter(mmsi__startswith=str(MMSI_BASE)[:2], name__startswith="SYN-")
+
+
+def clear_synthetic():
+    """Removes every generated vessel with its voyages, tracks and rollups."""
+    vessels = synthetic_vessels()
+    with transaction.atomic():
+        VoyageTrack.objects.filter(vessel__in=vessels).delete()
+        TrackRollup.objects.filter(vessel__in=vessels).delete()
+        # Plain DELETE: Voyage has analytics delete receivers, which would make
+        # the ORM load every voyage; the rollup is rebuilt below instead.
+        vessel_sql, params = vessels.values("id").query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {Voyage._meta.db_table} WHERE vessel_id IN ({vessel_sql})", params)
+        count, _ = vessels.delete()
+        rebuild_voyage_stats()
+        rebuild_flow_stats()
+    return count
+
+
+def generate_fleet(vessels, points, seed=42, interval_minutes=10, end=None, chunk_size=2000, log=print):
+    """
+    Generates and loads a synthetic fleet in chunks of `chunk_size` vessels,
+    each chunk in its own transaction. Returns (vessel count, track count).
+    Raises ValueError when a generated fleet is already loaded, since its
+    voyages and tracks would be added a second time; clear_synthetic() first.
+    """
+    if synthetic_vessels().exists():
+        raise ValueError("A synthetic fleet is already loaded")
+    if end is None:
+        end = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    end_epoch = int(end.timestamp())
+    interval_s = interval_minutes * 60
+    port_ids, port_coords = load_ports()
+    port_regions = dict(zip(port_ids.tolist(), region_ids(*np.degrees(port_coords).T).tolist()))
+
+    total_tracks = 0
+    for chunk_index, first in enumerate(range(0, vessels, chunk_size)):
+        count = min(chunk_size, vessels - first)
+        rng = np.random.default_rng([seed, chunk_index])
+        attrs, voyages, tracks = generate_chunk(
+            rng, first, count, points, interval_s, end_epoch, port_ids, port_coords
+        )
+
+        with transaction.atomic():
+            vessel_regions = region_ids(tracks["lat"][:, -1], tracks["lon"][:, -1])
+            Vessel.objects.bulk_create([
+                Vessel(
+                    mmsi=str(attrs["mmsi"][i]),
+                    name=f"SYN-{first + i:06d}",
+                    type=VESSEL_TYPES[attrs["type"][i]],
+                    cargo_type=CARGO_TYPES[attrs["cargo"][i]],
+                    flag=FLAGS[attrs["flag"][i]],
+                    operator=OPERATORS[attrs["operator"][i]],
+                    imo_number=f"IMO-{9000000 + first + i}",
+                    last_position_lat=float(tracks["lat"][i, -1]),
+                    last_position_lon=float(tracks["lon"][i, -1]),
+                    speed=float(tracks["speed"][i, -1]),
+                    course=float(tracks["course"][i, -1]),
+                    last_update=end,
+                    region_id=int(vessel_regions[i]),
+                )
+                for i in range(count)
+            ], ignore_conflicts=True, batch_size=1000)
+
+            ids_by_mmsi = dict(
+                Vessel.objects.filter(mmsi__in=[str(m) for m in attrs["mmsi"]]).values_list("mmsi", "id")
+            )
+            vessel_ids = np.array([ids_by_mmsi[str(m)] for m in attrs["mmsi"]], dtype=np.int64)
+
+            new_voyages = Voyage.objects.bulk_create([
+                Voyage(
+                    vessel_id=int(vessel_ids[i]),
+                    port_from_id=int(voyages["origin"][i]),
+                    port_to_id=int(voyages["dest"][i]),
+                    departure_time=end + timedelta(seconds=float(voyages["departure"][i] - end_epoch)),
+                    arrival_time=end + timedelta(seconds=float(voyages["arrival"][i] - end_epoch)),
+                    status="In Transit" if voyages["arrival"][i] > end_epoch else "Completed",
+                    region_from=port_regions[int(voyages["origin"][i])],
+                    region_to=port_regions[int(voyages["dest"][i])],
+                )
+                for i in range(count)
+            ], batch_size=1000)
+            apply_voyages(new_voyages)
+
+            flat_ids = np.repeat(vessel_ids, points)
+            flat = {key: values.ravel() for key, values in tracks.items()}
+            total_tracks += copy_track_arrays(
+                flat_ids, flat["epochs"], flat["lat"], flat["lon"], flat["speed"], flat["course"]
+            )
+            record_track_arrays(
+                flat_ids, flat["epochs"], flat["lat"], flat["lon"], flat["speed"], flat["course"]
+            )
+
+        log(f"Generated {first + count}/{vessels} vessels ({total_tracks} track points)...")
+
+    refresh_stats()
+    refresh_fleet_composition()
+    return vessels, total_tracks
@@ -0,0 +1,54 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from core import analytics, dashboard, enrichment, partitions, rollups, track_archive
+from core.jobs import job, prune_jobs
+from core.unctad_loader import fetch_unctad_ports
+
+# -------------------------
+# BACKGROUND JOBS
+# -------------------------
+# Handlers run by `manage.py run_workers` (core.jobs). Periodic ones are
+# scheduled by kind in settings.JOB_SCHEDULE. Each returns a JSON-ready
+# summary that is stored on the job row.
+
+
+@job("enrichment")
+def enrich_vessels(batch_size=None):
+    if not settings.ENRICHMENT_API_URL:
+        return {"skipped": "ENRICHMENT_API_URL not set"}
+    return enrichment.run_enrichment_batch(batch_size)
+
+
+@job("unctad_refresh")
+def refresh_unctad():
+    return fetch_unctad_ports()
+
+
+@job("analytics_rollups")
+def refresh_analytics(days=2):
+    """Re-derives recent rollup days, catching writes that bypassed the receivers."""
+    since = (timezone.now() - timedelta(days=days)).date()
+    return {
+        "voyage_rows": analytics.rebuild_voyage_stats(since),
+        "flow_rows": analytics.rebuild_flow_stats(since),
+        "fleet_rows": len(analytics.refresh_fleet_composition()),
+        "dashboard": bool(dashboard.refresh_stats()),
+    }
+
+
+@job("retention")
+def apply_retention():
+    summary = {}
+    if partitions.is_partitioned():
+        summary["partitions_created"] = len(partitions.ensure_partitions())
+        summary["partitions_dropped"] = len(partitions.drop_expired_partitions())
+    summary["rollups_pruned"] = rollups.prune_rollups()
+    if settings.TRACK_ARCHIVE_SHARED:
+        summary["points_archived"] = track_archive.archive_tracks()["points"]
+    else:
+        summary["archive_skipped"] = "TRACK_ARCHIVE_SHARED not set"
+    summary["jobs_pruned"] = prune_jobs()
+    return summary
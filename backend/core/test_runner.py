@@ -0,0 +1,18 @@
+from django.db import connections
+from django.test.runner import DiscoverRunner
+
+from core.schema import create_unmanaged_tables
+
+# -------------------------
+# TEST RUNNER
+# -------------------------
+# The test database only has the tables migrations create; the unmanaged
+# core tables are added once migrations have run (see core/schema.py).
+
+
+class CoreTestRunner(DiscoverRunner):
+    def setup_databases(self, **kwargs):
+        config = super().setup_databases(**kwargs)
+        for alias in connections:
+            create_unmanaged_tables(connections[alias])
+        return config
@@ -0,0 +1,162 @@
+import io
+import os
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core import ais_import, ingest, nmea
+from core.models import Vessel, VoyageTrack
+
+UTC = dt_timezone.utc
+
+
+# -------------------------
+# NMEA DECODING
+# -------------------------
+
+POSITION = "!AIVDM,1,1,,A,15RTgt0PAso;90TKcjM8h6g208CQ,0*4A"
+STATIC_PARTS = [
+    "!AIVDM,2,1,1,A,55?MbV02;H;s<HtKR20EHE:0@T4@Dn2222222216L961O5Gf0NSQEp6ClRp8,0*1C",
+    "!AIVDM,2,2,1,A,88888888880,2*25",
+]
+
+
+class NmeaTests(TestCase):
+    def test_position_report(self):
+        _count, _number, _mid, _channel, payload, fill = nmea.parse_sentence(POSITION)
+        report = nmea.decode(payload, fill)
+        self.assertEqual(report["kind"], "position")
+        self.assertEqual(report["mmsi"], 371798000)
+        self.assertAlmostEqual(report["lat"], 48.381633, places=5)
+        self.assertAlmostEqual(report["lon"], -123.395383, places=5)
+        self.assertEqual(report["speed"], 12.3)
+        self.assertEqual(report["course"], 224.0)
+
+    def test_bad_checksum_is_rejected(self):
+        self.assertIsNone(nmea.parse_sentence(POSITION[:-1] + "B"))
+
+    def test_multi_sentence_static_report(self):
+        reassembler = nmea.Reassembler()
+        self.assertIsNone(reassembler.feed(nmea.parse_sentence(STATIC_PARTS[0])))
+        payload, fill = reassembler.feed(nmea.parse_sentence(STATIC_PARTS[1]))
+        self.assertEqual(
+            nmea.decode(payload, fill),
+            {"kind": "static", "mmsi": 351759000, "name": "EVER DIADEM", "imo": 9134270},
+        )
+
+    def test_split_line_timestamps(self):
+        self.assertEqual(nmea.split_line("\\c:1577836800*5A\\" + POSITION), (1577836800, POSITION))
+        self.assertEqual(nmea.split_line("2020-01-01T00:00:00Z " + POSITION), (1577836800.0, POSITION))
+        self.assertEqual(nmea.split_line(POSITION), (None, POSITION))
+
+
+# -------------------------
+# FILE PARSING
+# -------------------------
+
+CSV_HEADER = "MMSI,BaseDateTime,LAT,LON,SOG,COG,VesselName\n"
+
+
+class ParseTests(TestCase):
+    def test_csv_lines(self):
+        lines = [
+            "211000001,2024-01-01T00:00:00,53.5,8.1,12.5,90,NORDIC STAR\n",
+            "211000001,2024-01-01T00:05:00Z,53.51,8.12,,,\n",
+            "211000002,not a time,53.5,8.1,1,1,\n",
+            "211000003,2024-01-01T00:00:00,95.0,8.1,1,1,\n",
+        ]
+        positions, names, rejected = ais_import.parse_csv_lines(CSV_HEADER, lines)
+        self.assertEqual(positions, [
+            (211000001, 1704067200.0, 53.5, 8.1, 12.5, 90.0),
+            (211000001, 1704067500.0, 53.51, 8.12, None, None),
+        ])
+        self.assertEqual((names, rejected), ({211000001: "NORDIC STAR"}, 2))
+
+    def test_csv_header_must_have_required_columns(self):
+        with self.assertRaises(ValueError):
+            ais_import.parse_csv_lines("MMSI,LAT,LON\n", [])
+
+    def test_nmea_lines(self):
+        lines = ["1577836800 " + POSITION, STATIC_PARTS[0], STATIC_PARTS[1], "garbage", POSITION]
+        positions, names, rejected = ais_import.parse_nmea_lines(lines)
+        self.assertEqual([p[:2] for p in positions], [(371798000, 1577836800.0)] * 2)
+        self.assertEqual((names, rejected), ({351759000: "EVER DIADEM"}, 1))
+        # Without any time source a report cannot be placed
+        self.assertEqual(ais_import.parse_nmea_lines([POSITION])[2], 1)
+
+    def test_chunks_keep_multi_sentence_messages_together(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".nmea", delete=False) as fh:
+            fh.write("\n".join([POSITION, STATIC_PARTS[0], STATIC_PARTS[1], POSITION]) + "\n")
+        self.addCleanup(os.remove, fh.name)
+        self.assertEqual(ais_import.detect_format(fh.name), "nmea")
+        chunks = [lines for _end, _header, lines in ais_import.read_chunks(fh.name, "nmea", 0, 2)]
+        self.assertEqual([len(lines) for lines in chunks], [3, 1])
+
+
+# -------------------------
+# IMPORT_AIS
+# -------------------------
+
+class ImportAisTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as fh:
+            fh.write(text)
+        return path
+
+    def run_import(self, *args):
+        out = io.StringIO()
+        call_command("import_ais", *args, "--workers", "1", stdout=out)
+        return out.getvalue()
+
+    def test_csv_import(self):
+        path = self.write("history.csv", CSV_HEADER + "".join(
+            f"211000001,2024-01-01T00:{minute:02d}:00,53.{minute:02d},8.1,12.0,90,NORDIC STAR\n"
+            for minute in range(10)
+        ) + "211000002,2024-01-01T00:00:00,10.0,20.0,,,\n")
+        self.run_import(path, "--chunk-lines", "4")
+
+        vessel = Vessel.objects.get(mmsi="211000001")
+        self.assertEqual(vessel.name, "NORDIC STAR")
+        self.assertEqual(vessel.last_update, datetime(2024, 1, 1, 0, 9, tzinfo=UTC))
+        self.assertAlmostEqual(vessel.last_position_lat, 53.09)
+        self.assertEqual(VoyageTrack.objects.filter(vessel=vessel).count(), 10)
+        self.assertEqual(Vessel.objects.get(mmsi="211000002").name, "VESSEL-211000002")
+        self.assertFalse(os.path.exists(ais_import.checkpoint_path(path)))
+
+    def test_nmea_import(self):
+        path = self.write("feed.nmea", "\n".join([
+            "\\c:1577836800*5A\\" + POSITION, STATIC_PARTS[0], STATIC_PARTS[1],
+        ]) + "\n")
+        self.run_import(path)
+        vessel = Vessel.objects.get(mmsi="371798000")
+        self.assertEqual(vessel.last_update, datetime(2020, 1, 1, tzinfo=UTC))
+        self.assertEqual(VoyageTrack.objects.get(vessel=vessel).speed, 12.3)
+        self.assertEqual(Vessel.objects.get(mmsi="351759000").name, "EVER DIADEM")
+
+    def test_resumes_from_checkpoint(self):
+        rows = [f"211000001,2024-01-01T00:{minute:02d}:00,53.0,8.1,,,\n" for minute in range(4)]
+        path = self.write("history.csv", CSV_HEADER + "".join(rows))
+        # The first two rows were committed by an earlier, interrupted run
+        ais_import.save_checkpoint(path, len(CSV_HEADER) + len(rows[0]) + len(rows[1]), 2)
+        output = self.run_import(path)
+        self.assertIn("Resuming", output)
+        self.assertEqual(VoyageTrack.objects.count(), 2)
+
+
+class IngestTests(TestCase):
+    def test_failed_dashboard_refresh_is_logged_not_raised(self):
+        log = mock.Mock()
+        positions = [(211000009, datetime(2024, 1, 1, tzinfo=UTC), 1.0, 2.0, 3.0, 4.0)]
+        with mock.patch.object(ingest.dashboard, "maybe_refresh", side_effect=RuntimeError("down")):
+            self.assertEqual(ingest.ingest_positions(positions, log=log), 1)
+        log.assert_called_once()
+        self.assertIn("down", log.call_args[0][0])
+        self.assertEqual(VoyageTrack.objects.count(), 1)
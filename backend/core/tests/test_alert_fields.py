@@ -0,0 +1,41 @@
+from django.test import TestCase
+
+from core import alerts
+from core.models import Notification, Port
+from core.regions import REGION_IDS
+
+EUROPE = REGION_IDS["europe"]
+
+
+class AlertFieldTests(TestCase):
+    def setUp(self):
+        self.port = Port.objects.create(name="Rotterdam", country="NL", location="51.95, 4.14")
+
+    def test_classify(self):
+        self.assertEqual(alerts.classify("CRITICAL: Rotterdam congestion"), "critical")
+        self.assertEqual(alerts.classify("sos received"), "critical")
+        self.assertEqual(alerts.classify("INFO: new schedule"), "info")
+        self.assertEqual(alerts.classify("Storm ahead"), "warning")
+        self.assertEqual(alerts.classify(None), "warning")
+
+    def test_parse_message(self):
+        message = "CRITICAL: Rotterdam congestion. Wait time 12.5h"
+        self.assertEqual(alerts.parse_message(message), (self.port.id, 12.5))
+        self.assertEqual(alerts.parse_message(message, {"Rotterdam": 99}), (99, 12.5))
+        self.assertEqual(alerts.parse_message("Storm ahead"), (None, None))
+
+    def test_orm_writes_are_filled_from_the_message(self):
+        alert = Notification.objects.create(
+            message="CRITICAL: Rotterdam congestion. Wait time 8h", type="Congestion Alert"
+        )
+        self.assertEqual(
+            (alert.severity, alert.category, alert.port_id, alert.wait_hours),
+            ("critical", "congestion", self.port.id, 8.0),
+        )
+
+    def test_build_alert_keeps_given_fields(self):
+        alert = alerts.build_alert("Heads up", "Alert", severity="info", port=self.port, wait_hours=3)
+        self.assertEqual((alert.severity, alert.category, alert.wait_hours), ("info", "vessel_event", 3))
+        self.assertEqual(alert.region_id, EUROPE)
+        alert.save()
+        self.assertEqual(Notification.objects.get().severity, "info")
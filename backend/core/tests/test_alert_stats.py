@@ -0,0 +1,65 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from core import alerts
+from core.models import AlertDailyStats, Notification, Port
+from core.regions import REGION_IDS
+
+EUROPE = REGION_IDS["europe"]
+
+
+def stat_rows():
+    return sorted(
+        AlertDailyStats.objects.filter(count__gt=0)
+        .values_list("date", "region_id", "severity", "port_id", "count", "wait_sum", "wait_count")
+    )
+
+
+class AlertStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.port = Port.objects.create(name="Port of Rotterdam", country="NL", location="51.95, 4.14")
+        self.alert(f"CRITICAL: {self.port.name} congestion", port=self.port, wait_hours=10)
+        self.alert("Storm ahead", days_ago=2)
+        self.old = self.alert("Fog warning", port=self.port, wait_hours=30, days_ago=90)
+        # `timestamp` is set on insert; back-dated rows need a rebuild
+        alerts.rebuild_alert_stats()
+
+    def alert(self, message, days_ago=0, **fields):
+        notification = alerts.build_alert(message, "Alert", **fields)
+        notification.save()
+        if days_ago:
+            notification.timestamp = timezone.now() - timedelta(days=days_ago)
+            Notification.objects.filter(pk=notification.pk).update(timestamp=notification.timestamp)
+        return notification
+
+    def test_receivers_match_a_rebuild(self):
+        self.old.delete()
+        self.alert("CRITICAL: Rotterdam fire", wait_hours=4)
+        incremental = stat_rows()
+        alerts.rebuild_alert_stats()
+        self.assertEqual(incremental, stat_rows())
+
+    def test_rollup_totals_and_insights(self):
+        stats = alerts.alert_stats(Notification.objects.all())
+        self.assertEqual(
+            stats, {"critical": 1, "warning": 2, "avg_wait": 10.0, "worst_port": "Rotterdam", "total": 3}
+        )
+        critical = alerts.alert_stats(Notification.objects.none(), severity="critical")
+        self.assertEqual((critical["total"], critical["warning"]), (1, 0))
+        self.assertEqual(alerts.alert_stats(Notification.objects.none(), region_id=EUROPE)["total"], 2)
+
+    def test_search_stats_match_the_rollup(self):
+        # Every alert is still "new", so the status path sees the same rows
+        queryset = Notification.objects.filter(status="new")
+        self.assertEqual(alerts.alert_stats(queryset, status="new"), alerts.alert_stats(queryset))
+
+    def test_writes_invalidate_the_cache(self):
+        self.assertEqual(alerts.alert_stats(Notification.objects.none())["total"], 3)
+        with self.assertNumQueries(0):
+            alerts.alert_stats(Notification.objects.none())
+        self.alert("Storm ahead")
+        self.assertEqual(alerts.alert_stats(Notification.objects.none())["total"], 4)
@@ -0,0 +1,156 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import alerts, views
+from core.models import Notification, Port
+
+
+class AlertDedupTests(TestCase):
+    def setUp(self):
+        alerts.reset_recent_alerts()
+        self.addCleanup(alerts.reset_recent_alerts)
+        self.port = Port.objects.create(name="Rotterdam", country="Netherlands")
+        self.other = Port.objects.create(name="Antwerp", country="Belgium")
+
+    def congestion(self, port):
+        return dict(message=f"CRITICAL: {port.name} congestion at 90%. Wait time 12.0h.",
+                    type="Congestion Alert", port=port)
+
+    def test_repeat_is_folded(self):
+        first = alerts.raise_alert(**self.congestion(self.port))
+        self.assertIsNotNone(first)
+        self.assertIsNone(alerts.raise_alert(**self.congestion(self.port)))
+        first.refresh_from_db()
+        self.assertEqual(first.occurrences, 2)
+        self.assertIsNotNone(first.last_seen)
+
+    def test_repeat_is_folded_without_the_process_cache(self):
+        # Another worker sees the alert through the table, not its own cache
+        first = alerts.raise_alert(**self.congestion(self.port))
+        alerts.reset_recent_alerts()
+        self.assertIsNone(alerts.raise_alert(**self.congestion(self.port)))
+        first.refresh_from_db()
+        self.assertEqual(first.occurrences, 2)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_resolved_alert_is_raised_again(self):
+        first = alerts.raise_alert(**self.congestion(self.port))
+        alerts.set_status([first.pk], "resolved")
+        self.assertIsNotNone(alerts.raise_alert(**self.congestion(self.port)))
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_unsuppressed_category_is_never_folded(self):
+        alerts.raise_alert("Manual note", "Notice")
+        alerts.raise_alert("Manual note", "Notice")
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_raise_alerts_folds_batch_and_open_alerts(self):
+        batch = [alerts.build_alert(**self.congestion(self.port)) for _ in range(3)]
+        batch.append(alerts.build_alert(**self.congestion(self.other)))
+        created, folded = alerts.raise_alerts(batch)
+        self.assertEqual((len(created), folded), (2, 2))
+        self.assertEqual(Notification.objects.get(port=self.port).occurrences, 3)
+
+        alerts.reset_recent_alerts()
+        created, folded = alerts.raise_alerts([alerts.build_alert(**self.congestion(self.port))])
+        self.assertEqual((created, folded), ([], 1))
+        self.assertEqual(Notification.objects.get(port=self.port).occurrences, 4)
+
+    def test_repeat_after_the_window_is_raised(self):
+        first = alerts.raise_alert(**self.congestion(self.port))
+        window = settings.ALERT_SUPPRESSION_MINUTES[first.category]
+        Notification.objects.filter(pk=first.pk).update(timestamp=timezone.now() - timedelta(minutes=window + 1))
+        alerts.reset_recent_alerts()
+        self.assertIsNotNone(alerts.raise_alert(**self.congestion(self.port)))
+
+    def test_subjects(self):
+        self.assertEqual(alerts.subject_of(alerts.build_alert(**self.congestion(self.port))), f"port:{self.port.pk}")
+        text = alerts.subject_of(alerts.build_alert("Storm warning", "Alert"))
+        self.assertTrue(text.startswith("text:"))
+        self.assertNotEqual(text, alerts.subject_of(alerts.build_alert("Storm passed", "Alert")))
+
+
+class AlertStatusTests(TestCase):
+    def setUp(self):
+        self.alert = Notification.objects.create(message="Storm warning", type="Alert")
+
+    def test_set_status(self):
+        self.assertEqual(alerts.set_status([self.alert.pk], "acknowledged"), 1)
+        self.assertEqual(alerts.set_status([self.alert.pk], "acknowledged"), 0)
+        self.alert.refresh_from_db()
+        self.assertEqual(self.alert.status, "acknowledged")
+        self.assertIsNotNone(self.alert.status_changed_at)
+        with self.assertRaises(ValueError):
+            alerts.set_status([self.alert.pk], "closed")
+
+    def client_for(self, role):
+        user, _ = get_user_model().objects.get_or_create(username=f"{role}-user", defaults={"role": role})
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    def test_only_operators_change_status(self):
+        url = f"/api/alerts/{self.alert.pk}/status/"
+        for role in ("Analyst", "Admin", "user"):
+            response = self.client_for(role).post(url, {"status": "resolved"}, format="json")
+            self.assertEqual(response.status_code, 403, role)
+        response = self.client_for("Operator").post(url, {"status": "resolved"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.alert.refresh_from_db()
+        self.assertEqual(self.alert.status, "resolved")
+
+        response = self.client_for("Analyst").post(
+            "/api/alerts/status/", {"ids": [self.alert.pk], "status": "new"}, format="json"
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(APIClient().post(url, {"status": "new"}, format="json").status_code, 401)
+
+    def test_only_admins_create_alerts(self):
+        body = {"message": "Canal closed", "severity": "critical"}
+        self.assertEqual(self.client_for("Operator").post("/api/alerts/create/", body, format="json").status_code, 403)
+        self.assertEqual(self.client_for("Admin").post("/api/alerts/create/", body, format="json").status_code, 201)
+
+    def test_bulk_update_validates_ids(self):
+        client = self.client_for("Operator")
+        for ids in ([], "1", [1, "2"]):
+            response = client.post("/api/alerts/status/", {"ids": ids, "status": "resolved"}, format="json")
+            self.assertEqual(response.status_code, 400, ids)
+        response = client.post("/api/alerts/999999/status/", {"status": "resolved"}, format="json")
+        self.assertEqual(response.status_code, 404)
+
+    def test_status_changes_resume_from_a_position(self):
+        other = Notification.objects.create(message="Fog warning", type="Alert")
+        start = (timezone.now() - timedelta(seconds=1), 0)
+        alerts.set_status([self.alert.pk, other.pk], "acknowledged")
+        batches, position = alerts.status_changes(start)
+        self.assertEqual([(b["status"], sorted(b["ids"])) for b in batches],
+                         [("acknowledged", sorted([self.alert.pk, other.pk]))])
+        self.assertEqual(alerts.status_changes(position), ([], position))
+
+        alerts.set_status([other.pk], "resolved")
+        batches, _ = alerts.status_changes(position)
+        self.assertEqual([(b["status"], b["ids"]) for b in batches], [("resolved", [other.pk])])
+
+    @override_settings(ALERT_STREAM_SECONDS=0)
+    def test_stream_starts_with_a_resume_position(self):
+        response = self.client_for("Analyst").get("/api/alerts/stream/")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = b"".join(response.streaming_content).decode()
+        response.close()
+        self.assertIn("event: ready", body)
+        self.assertEqual(self.client_for("Analyst").get("/api/alerts/stream/", {"since": "bad"}).status_code, 400)
+
+    @override_settings(ALERT_STREAM_SECONDS=0)
+    def test_streams_past_the_cap_are_refused(self):
+        with mock.patch.object(views, "_stream_slots", threading.BoundedSemaphore(1)) as slots:
+            slots.acquire()
+            response = self.client_for("Analyst").get("/api/alerts/stream/")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "0")
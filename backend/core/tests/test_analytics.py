@@ -0,0 +1,157 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import analytics
+from core.models import FlowDailyStats, Port, Vessel, Voyage, VoyageDailyStats
+from core.regions import REGION_IDS
+
+EUROPE = REGION_IDS["europe"]
+
+
+def daily_rows():
+    return sorted(
+        VoyageDailyStats.objects.values_list(
+            "date", "vessel_type", "region_id", "arrivals", "in_transit", "wait_sum", "wait_count"
+        )
+    )
+
+
+def flow_rows():
+    return list(
+        FlowDailyStats.objects.values_list(
+            "date", "port_from_id", "port_to_id", "vessel_type", "voyages", "transit_hours_sum", "transit_count"
+        )
+    )
+
+
+class AnalyticsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+        self.rotterdam = Port.objects.create(name="Rotterdam", country="NL", location="51.95, 4.14", avg_wait_time=10)
+        self.singapore = Port.objects.create(name="Singapore", country="SG", location="1.26, 103.82", avg_wait_time=4)
+        self.tanker = Vessel.objects.create(name="Tanker", mmsi="100000040", type="Tanker", cargo_type="Oil",
+                                            last_position_lat=50, last_position_lon=2)
+        self.boxer = Vessel.objects.create(name="Boxer", mmsi="100000041", type="Container Ship", cargo_type="Boxes",
+                                           last_position_lat=1, last_position_lon=104)
+
+    def voyage(self, vessel, origin, destination, days_ago, hours=48, status="Completed"):
+        departure = self.now - timedelta(days=days_ago)
+        return Voyage.objects.create(
+            vessel=vessel, port_from=origin, port_to=destination, status=status,
+            departure_time=departure, arrival_time=departure + timedelta(hours=hours) if hours else None,
+        )
+
+
+class VoyageRollupTests(AnalyticsTestCase):
+    def test_signals_match_a_rebuild(self):
+        first = self.voyage(self.tanker, self.singapore, self.rotterdam, 5)
+        self.voyage(self.tanker, self.singapore, self.rotterdam, 5, status="In Transit")
+        moved = self.voyage(self.boxer, self.rotterdam, self.singapore, 3)
+        self.voyage(self.boxer, self.rotterdam, self.singapore, 2, hours=None)
+        moved.arrival_time -= timedelta(days=1)
+        moved.save()
+        first.delete()
+
+        incremental = [row for row in daily_rows() if row[3]]
+        analytics.rebuild_voyage_stats()
+        self.assertEqual(incremental, daily_rows())
+        self.assertEqual(sum(row[3] for row in incremental), 2)
+
+    def test_window_filters(self):
+        self.voyage(self.tanker, self.singapore, self.rotterdam, 5)
+        self.voyage(self.boxer, self.rotterdam, self.singapore, 4, status="In Transit")
+        self.voyage(self.boxer, self.rotterdam, self.singapore, 40)
+        start = (self.now - timedelta(days=30)).date()
+
+        self.assertEqual(sum(day["arrivals"] for day in analytics.voyage_window(start)), 2)
+        tankers = analytics.voyage_window(start, vessel_type="Tanker")
+        self.assertEqual([(day["arrivals"], day["wait_sum"]) for day in tankers], [(1, 10)])
+        europe = analytics.voyage_window(start, region_id=EUROPE)
+        self.assertEqual(sum(day["in_transit"] for day in europe), 0)
+
+    def test_fleet_composition_is_cached(self):
+        self.assertEqual(sum(row.vessel_count for row in analytics.fleet_composition()), 2)
+        Vessel.objects.create(name="Late", mmsi="100000042", type="Tanker")
+        self.assertEqual(sum(row.vessel_count for row in analytics.fleet_composition()), 2)
+        self.assertEqual(sum(row.vessel_count for row in analytics.refresh_fleet_composition()), 3)
+
+
+class AnalyticsViewTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        user = get_user_model().objects.create_user(username="analyst", password="pw-123456")
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {RefreshToken.for_user(user).access_token}"
+
+    def test_kpis_from_rollups(self):
+        self.voyage(self.tanker, self.singapore, self.rotterdam, 5)
+        self.voyage(self.boxer, self.rotterdam, self.singapore, 4, status="In Transit")
+        data = self.client.get("/api/analytics/", {"days": "30"}).json()
+        self.assertEqual(data["kpis"]["total_ships"], 2)
+        self.assertEqual(data["kpis"]["active_voyages"], 1)
+        self.assertEqual(data["kpis"]["avg_wait_time"], 7.0)
+
+        data = self.client.get("/api/analytics/", {"days": "30", "type": "Tanker"}).json()
+        self.assertEqual(data["cargo_distribution"], [{"cargo_type": "Oil", "count": 1}])
+        self.assertEqual(data["kpis"]["avg_wait_time"], 10.0)
+
+
+class FlowRollupTests(AnalyticsTestCase):
+    def test_signals_match_a_rebuild(self):
+        self.voyage(self.tanker, self.singapore, self.rotterdam, 5)
+        changed = self.voyage(self.boxer, self.singapore, self.rotterdam, 3, hours=None)
+        removed = self.voyage(self.boxer, self.rotterdam, self.singapore, 2)
+        changed.arrival_time = changed.departure_time + timedelta(hours=30)
+        changed.save()
+        removed.delete()
+
+        incremental = sorted(row for row in flow_rows() if row[4])
+        analytics.rebuild_flow_stats()
+        self.assertEqual(incremental, sorted(flow_rows()))
+
+    def test_matrix(self):
+        self.voyage(self.tanker, self.singapore, self.rotterdam, 5, hours=40)
+        self.voyage(self.boxer, self.singapore, self.rotterdam, 4, hours=20)
+        self.voyage(self.boxer, self.rotterdam, self.singapore, 3, hours=None)
+        self.voyage(self.boxer, self.rotterdam, self.singapore, 60)
+        start = (self.now - timedelta(days=30)).date()
+
+        matrix = analytics.flow_matrix(start)
+        self.assertEqual([port["name"] for port in matrix["ports"]], ["Rotterdam", "Singapore"])
+        heaviest, other = matrix["flows"]
+        self.assertEqual((heaviest["from"], heaviest["to"], heaviest["voyages"]),
+                         (self.singapore.id, self.rotterdam.id, 2))
+        self.assertEqual(heaviest["avg_transit_hours"], 30.0)
+        self.assertEqual(heaviest["vessel_types"], {"Tanker": 1, "Container Ship": 1})
+        self.assertIsNone(other["avg_transit_hours"])
+
+        tankers = analytics.flow_matrix(start, vessel_type="Tanker")
+        self.assertEqual([lane["voyages"] for lane in tankers["flows"]], [1])
+        self.assertEqual(len(analytics.flow_matrix(start, region_id=EUROPE)["flows"]), 2)
+        self.assertEqual(analytics.flow_matrix(start, region_id=REGION_IDS["africa"])["flows"], [])
+
+    def test_matrix_is_cached(self):
+        start = (self.now - timedelta(days=30)).date()
+        self.assertEqual(analytics.flow_matrix(start)["flows"], [])
+        self.voyage(self.tanker, self.singapore, self.rotterdam, 5)
+        self.assertEqual(analytics.flow_matrix(start)["flows"], [])
+        cache.clear()
+        self.assertEqual(len(analytics.flow_matrix(start)["flows"]), 1)
+
+
+class TradeFlowViewTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        user = get_user_model().objects.create_user(username="flows-analyst", password="pw-123456")
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {RefreshToken.for_user(user).access_token}"
+
+    def test_flows_endpoint(self):
+        self.voyage(self.tanker, self.singapore, self.rotterdam, 5)
+        data = self.client.get("/api/analytics/flows/", {"days": "7", "region": "Europe"}).json()
+        self.assertEqual((data["days"], len(data["flows"])), (7, 1))
+        self.assertEqual(self.client.get("/api/analytics/flows/", {"region": "Atlantis"}).status_code, 400)
@@ -0,0 +1,46 @@
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from core import benchmarks
+from core.models import Notification
+from core.schema import create_unmanaged_tables
+from core.synthetic import synthetic_vessels
+
+
+def quiet(*args):
+    pass
+
+
+class SchemaTests(TestCase):
+    def test_unmanaged_tables_and_indexes_exist(self):
+        self.assertEqual(create_unmanaged_tables(), [])
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(cursor, Notification._meta.db_table)
+        for index in Notification._meta.indexes:
+            self.assertIn(index.name, indexes)
+
+
+class SeedTests(TestCase):
+    def test_reseed_keeps_real_alerts(self):
+        real = Notification.objects.create(message="Alert: Speed Drop detected", type="Alert", subject="text:real")
+        with mock.patch.dict(benchmarks.TIERS, {"tiny": {"vessels": 5, "points": 3}}):
+            self.assertTrue(benchmarks.seed_tier("tiny", log=quiet))
+            self.assertFalse(benchmarks.seed_tier("tiny", log=quiet))
+            benchmarks.seed_tier("tiny", reseed=True, log=quiet)
+
+        self.assertEqual(synthetic_vessels().count(), 5)
+        self.assertEqual(Notification.objects.filter(subject=benchmarks.BENCH_SUBJECT).count(), 10)
+        self.assertTrue(Notification.objects.filter(pk=real.pk).exists())
+
+    def test_remote_database_needs_confirmation(self):
+        with mock.patch.object(benchmarks, "is_local_database", return_value=False):
+            with self.assertRaisesMessage(CommandError, "--i-know"):
+                call_command("bench_api", "--tier", "small")
+
+    def test_sqlite_is_local(self):
+        if connection.vendor == "sqlite":
+            self.assertTrue(benchmarks.is_local_database())
@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import dashboard
+from core.models import DashboardStats, Port, RiskZone, Vessel, Voyage
+from core.regions import REGION_IDS
+
+EUROPE = REGION_IDS["europe"]
+ASIA = REGION_IDS["asia pacific"]
+
+
+class DashboardTestCase(TestCase):
+    def setUp(self):
+        rotterdam = Port.objects.create(name="Rotterdam", country="NL", location="51.95, 4.14", congestion_score=95)
+        singapore = Port.objects.create(name="Singapore", country="SG", location="1.26, 103.82", congestion_score=40)
+        vessel = Vessel.objects.create(name="Dash One", mmsi="100000030", last_position_lat=50, last_position_lon=2)
+        Vessel.objects.create(name="Dash Two", mmsi="100000031", last_position_lat=1, last_position_lon=104)
+        now = timezone.now()
+        for hours in range(7):
+            Voyage.objects.create(
+                vessel=vessel, port_from=singapore, port_to=rotterdam, status="In Transit",
+                departure_time=now - timedelta(hours=hours),
+            )
+        Voyage.objects.create(vessel=vessel, port_from=rotterdam, port_to=singapore, status="In Transit",
+                              departure_time=now - timedelta(days=1))
+        Voyage.objects.create(vessel=vessel, port_from=rotterdam, port_to=singapore, status="Completed",
+                              departure_time=now)
+        RiskZone.objects.create(name="Strait", risk_type="PIRACY", latitude=1.2, longitude=103.9, radius_km=20)
+
+
+class RefreshTests(DashboardTestCase):
+    def test_counters_per_region(self):
+        stats = dashboard.refresh_stats()
+        totals = dashboard.region_counters(stats)
+        self.assertEqual(
+            {name: totals[name] for name in dashboard.COUNTERS},
+            {"total_vessels": 2, "active_voyages": 8, "active_risks": 1, "high_congestion_ports": 1},
+        )
+        europe = dashboard.region_counters(stats, EUROPE)
+        self.assertEqual((europe["total_vessels"], europe["active_voyages"], europe["high_congestion_ports"]), (1, 7, 1))
+        asia = dashboard.region_counters(stats, ASIA)
+        self.assertEqual((asia["active_voyages"], asia["active_risks"]), (1, 1))
+        self.assertEqual(dashboard.region_counters(stats, 99)["total_vessels"], 0)
+
+    def test_recent_voyages_are_latest_first(self):
+        stats = dashboard.refresh_stats()
+        self.assertEqual(len(stats.recent_voyages), dashboard.RECENT_VOYAGES)
+        self.assertTrue(all(v["destination"] == "Rotterdam" for v in stats.recent_voyages))
+        self.assertEqual(stats.regions[str(ASIA)]["recent_voyages"][0]["destination"], "Singapore")
+
+
+class GetStatsTests(DashboardTestCase):
+    def test_fresh_row_is_read_once(self):
+        dashboard.refresh_stats()
+        with self.assertNumQueries(1):
+            self.assertEqual(dashboard.get_stats().total_vessels, 2)
+
+    def test_stale_row_is_recomputed(self):
+        dashboard.refresh_stats()
+        DashboardStats.objects.update(refreshed_at=timezone.now() - timedelta(hours=1), total_vessels=0)
+        self.assertEqual(dashboard.get_stats().total_vessels, 2)
+
+    def test_missing_row_is_built(self):
+        self.assertEqual(dashboard.get_stats().active_voyages, 8)
+
+
+class DashboardViewTests(DashboardTestCase):
+    def setUp(self):
+        super().setUp()
+        user = get_user_model().objects.create_user(username="dash-user", password="pw-123456")
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {RefreshToken.for_user(user).access_token}"
+
+    def test_region_filter(self):
+        response = self.client.get("/api/dashboard/", {"region": "Europe"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["active_voyages"], 7)
+        self.assertEqual(self.client.get("/api/dashboard/", {"region": "All Regions"}).json()["active_voyages"], 8)
+
+    def test_unknown_region_is_rejected(self):
+        self.assertEqual(self.client.get("/api/dashboard/", {"region": "Atlantis"}).status_code, 400)
@@ -0,0 +1,81 @@
+import threading
+from datetime import timedelta
+from http.server import ThreadingHTTPServer
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import enrichment
+from core.management.commands.enrichment_fixture import fixture_handler, fixture_vessel
+from core.models import Vessel, VesselEnrichment
+
+
+def quiet(*args):
+    pass
+
+
+class EnrichmentTests(TestCase):
+    """Runs enrichment against the local fixture source (enrichment_fixture)."""
+
+    def serve(self, **options):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), fixture_handler(**options))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        settings = override_settings(
+            ENRICHMENT_API_URL=f"http://127.0.0.1:{server.server_address[1]}",
+            ENRICHMENT_RATE_PER_HOST=0, ENRICHMENT_MAX_RETRIES=1, ENRICHMENT_BACKOFF_SECONDS=0,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def setUp(self):
+        enrichment._scan_after = 0
+        self.known = Vessel.objects.create(name="Known", mmsi="100000060")
+        self.nameless = Vessel.objects.create(name="No MMSI")
+        self.done = Vessel.objects.create(
+            name="Complete", mmsi="100000061", imo_number="IMO1", flag="Malta", type="Tanker", operator="MSC"
+        )
+
+    def test_found_and_missing_vessels_are_cached(self):
+        self.serve(missing_rate=0)
+        counts = enrichment.run_enrichment_batch(log=quiet)
+        self.assertEqual(
+            counts, {"fetched": 2, "found": 1, "missing": 1, "failed": 0, "updated": 1}
+        )
+        self.known.refresh_from_db()
+        expected = fixture_vessel(self.known.mmsi)
+        self.assertEqual((self.known.imo_number, self.known.flag, self.known.operator),
+                         (expected["imo"], expected["flag"], expected["operator"]))
+        missing = VesselEnrichment.objects.get(key=enrichment.vessel_key(self.nameless))
+        self.assertEqual(missing.status, VesselEnrichment.MISSING)
+        self.assertLess(missing.expires_at, timezone.now() + timedelta(hours=25))
+
+        # Both answers are cached: nothing is requested again
+        counts = enrichment.run_enrichment_batch(log=quiet)
+        self.assertEqual(counts["fetched"], 0)
+
+    def test_cached_answer_fills_a_reset_vessel(self):
+        self.serve(missing_rate=0)
+        enrichment.run_enrichment_batch(log=quiet)
+        Vessel.objects.filter(pk=self.known.pk).update(flag="Unknown")
+        counts = enrichment.run_enrichment_batch(log=quiet)
+        self.assertEqual((counts["fetched"], counts["updated"]), (0, 1))
+        self.known.refresh_from_db()
+        self.assertEqual(self.known.flag, fixture_vessel(self.known.mmsi)["flag"])
+
+    def test_failing_source_is_retried_on_a_later_run(self):
+        self.serve(fail_rate=1)
+        counts = enrichment.run_enrichment_batch(log=quiet)
+        self.assertEqual((counts["fetched"], counts["failed"]), (2, 2))
+        self.assertFalse(VesselEnrichment.objects.exists())
+        self.known.refresh_from_db()
+        self.assertIsNone(self.known.imo_number)
+
+    def test_expired_entries_are_fetched_again(self):
+        self.serve(missing_rate=0)
+        enrichment.run_enrichment_batch(log=quiet)
+        VesselEnrichment.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(enrichment.run_enrichment_batch(log=quiet)["fetched"], 1)
@@ -0,0 +1,141 @@
+import tempfile
+from contextlib import redirect_stdout
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import jobs, scheduler, tasks, track_archive
+from core.models import Job, ScheduledJob, Vessel, VoyageTrack
+
+KIND = "tests.echo"
+
+
+class JobTests(TestCase):
+    def setUp(self):
+        jobs.job(KIND, max_attempts=2)(lambda **payload: payload)
+        self.addCleanup(jobs.REGISTRY.pop, KIND)
+
+    def test_claim_respects_concurrency(self):
+        queued = jobs.enqueue(KIND, {"n": 1})
+        jobs.enqueue(KIND, {"n": 2})
+        claimed = jobs.claim("w1", [KIND])
+        self.assertEqual(claimed.pk, queued.pk)
+        self.assertEqual((claimed.status, claimed.locked_by, claimed.attempts), (Job.RUNNING, "w1", 1))
+        self.assertIsNone(jobs.claim("w2", [KIND]))
+        self.assertIsNone(jobs.enqueue(KIND, unique=True))
+
+    def test_expired_lease_is_reclaimed(self):
+        jobs.enqueue(KIND)
+        stale = jobs.claim("w1", [KIND])
+        Job.objects.filter(pk=stale.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        taken = jobs.claim("w2", [KIND])
+        self.assertEqual(taken.pk, stale.pk)
+        self.assertEqual((taken.locked_by, taken.attempts), ("w2", 2))
+        # The first worker lost its lease; its result is discarded
+        self.assertFalse(jobs._finish(stale, result={"late": True}))
+        self.assertEqual(jobs._finish(taken, result={"ok": True}), Job.DONE)
+
+    def test_lease_expiry_on_last_attempt_fails_the_job(self):
+        jobs.enqueue(KIND)
+        row = jobs.claim("w1", [KIND])
+        Job.objects.filter(pk=row.pk).update(attempts=2, locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(jobs.claim("w2", [KIND]))
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.last_error), (Job.FAILED, "Lease expired"))
+
+    @override_settings(JOB_RETRY_BACKOFF_SECONDS=30)
+    def test_failure_is_retried_with_backoff_then_failed(self):
+        jobs.enqueue(KIND)
+        row = jobs.claim("w1", [KIND])
+        before = timezone.now()
+        self.assertEqual(jobs._finish(row, error="boom"), Job.QUEUED)
+        row.refresh_from_db()
+        self.assertGreaterEqual(row.run_at, before + timedelta(seconds=30))
+        self.assertEqual(row.last_error, "boom")
+        self.assertIsNone(jobs.claim("w1", [KIND]))  # not due yet
+
+        Job.objects.filter(pk=row.pk).update(run_at=timezone.now())
+        row = jobs.claim("w1", [KIND])
+        self.assertEqual(row.attempts, 2)
+        self.assertEqual(jobs._finish(row, error="boom again"), Job.FAILED)
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        archive_dir = override_settings(TRACK_ARCHIVE_DIR=tmp.name, TRACK_ARCHIVE_AFTER_DAYS=1)
+        archive_dir.enable()
+        self.addCleanup(archive_dir.disable)
+        vessel = Vessel.objects.create(name="Retention Test", mmsi="100000070")
+        VoyageTrack.objects.create(vessel=vessel, latitude=1, longitude=2, timestamp=timezone.now() - timedelta(days=5))
+
+    @override_settings(TRACK_ARCHIVE_SHARED=False)
+    def test_archiving_waits_for_shared_storage(self):
+        with mock.patch.object(track_archive, "archive_tracks") as archive:
+            summary = tasks.apply_retention()
+        archive.assert_not_called()
+        self.assertIn("archive_skipped", summary)
+        self.assertEqual(VoyageTrack.objects.count(), 1)
+
+        with self.assertRaises(ImproperlyConfigured):
+            track_archive.archive_tracks(log=lambda *args: None)
+        with self.assertRaisesMessage(CommandError, "--keep-raw"):
+            call_command("archive_tracks")
+        self.assertEqual(VoyageTrack.objects.count(), 1)
+
+    @override_settings(TRACK_ARCHIVE_SHARED=True)
+    def test_shared_archive_is_used(self):
+        with redirect_stdout(StringIO()):
+            summary = tasks.apply_retention()
+        self.assertEqual(summary["points_archived"], 1)
+        self.assertFalse(VoyageTrack.objects.exists())
+
+
+@override_settings(SCHEDULER_JITTER=0)
+class SchedulerTests(TestCase):
+    def setUp(self):
+        jobs.job(KIND)(lambda: None)
+        self.addCleanup(jobs.REGISTRY.pop, KIND)
+
+    def test_decide_queues_once_per_interval(self):
+        now = timezone.now()
+        self.assertEqual(scheduler._decide(KIND, 60, now), now + timedelta(seconds=60))
+        self.assertEqual(scheduler._decide(KIND, 60, now + timedelta(seconds=10)), now + timedelta(seconds=60))
+        self.assertEqual(Job.objects.filter(kind=KIND).count(), 1)
+
+    def test_overlapping_run_is_skipped_and_counted(self):
+        now = timezone.now()
+        scheduler._decide(KIND, 60, now)
+        later = now + timedelta(seconds=61)
+        scheduler._decide(KIND, 60, later)
+        scheduler._decide(KIND, 60, later + timedelta(seconds=61))
+        state = ScheduledJob.objects.get(kind=KIND)
+        self.assertEqual(state.skipped, 2)
+        self.assertEqual(Job.objects.filter(kind=KIND).count(), 1)
+
+        Job.objects.filter(kind=KIND).update(status=Job.DONE)
+        scheduler._decide(KIND, 60, later + timedelta(seconds=200))
+        self.assertEqual(Job.objects.filter(kind=KIND).count(), 2)
+        self.assertEqual(ScheduledJob.objects.get(kind=KIND).skipped, 2)
+
+    @override_settings(JOB_SCHEDULE={KIND: 60})
+    def test_tick_queues_due_kinds_and_records_runs(self):
+        now = timezone.now()
+        due = scheduler.tick(now=now, kinds=[KIND])
+        self.assertEqual(due[KIND], now + timedelta(seconds=60))
+        self.assertEqual(scheduler.tick(due, now=now + timedelta(seconds=30), kinds=[KIND]), due)
+        self.assertEqual(Job.objects.filter(kind=KIND).count(), 1)
+
+        row = jobs.claim("w1", [KIND])
+        self.assertEqual(jobs.run_job(row), Job.DONE)
+        state = ScheduledJob.objects.get(kind=KIND)
+        self.assertEqual((state.runs, state.last_status), (1, Job.DONE))
+        self.assertIsNotNone(state.last_duration_ms)
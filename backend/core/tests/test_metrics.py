@@ -0,0 +1,107 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from core import metrics
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(metrics, "_store", metrics.LocalStore())
+        self.store = patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class RenderTests(MetricsTestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        for value in (3, 7, 7, 20000):
+            metrics.observe("http_request_duration_ms", value, route="/api/x/")
+        text = metrics.render_prometheus()
+        self.assertIn("# TYPE maritime_http_request_duration_ms histogram", text)
+        self.assertIn('maritime_http_request_duration_ms_bucket{route="/api/x/",le="5"} 1', text)
+        self.assertIn('maritime_http_request_duration_ms_bucket{route="/api/x/",le="10"} 3', text)
+        self.assertIn('maritime_http_request_duration_ms_bucket{route="/api/x/",le="+Inf"} 4', text)
+        self.assertIn('maritime_http_request_duration_ms_count{route="/api/x/"} 4', text)
+
+    def test_label_values_are_escaped(self):
+        self.assertEqual(metrics.series("x", route='a"b\\c'), 'x{route="a\\"b\\\\c"}')
+
+    def test_rate_counts_complete_seconds(self):
+        for second in (100, 100, 101, 105):
+            self.store.tick(second)
+        self.assertEqual(self.store.rate(5, now=105), 3 / 5)
+
+
+class MiddlewareTests(MetricsTestCase):
+    def test_requests_are_recorded_by_route(self):
+        self.client.get("/api/")
+        snapshot = self.store.snapshot()
+        self.assertEqual(snapshot['http_requests_total{route="/api/",method="GET",status="200"}'], 1)
+        self.assertEqual(snapshot['http_request_duration_ms_count{route="/api/"}'], 1)
+        self.assertGreater(snapshot['http_response_bytes_total{route="/api/"}'], 0)
+
+
+class MetricsViewTests(MetricsTestCase):
+    @override_settings(METRICS_TOKEN="secret", DEBUG=False)
+    def test_token_is_required(self):
+        self.assertEqual(self.client.get("/api/metrics").status_code, 401)
+        self.assertEqual(self.client.get("/api/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 401)
+        response = self.client.get("/api/metrics", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+    @override_settings(METRICS_TOKEN="", DEBUG=False)
+    def test_closed_without_a_token_outside_debug(self):
+        self.assertEqual(self.client.get("/api/metrics").status_code, 401)
+        self.assertEqual(self.client.get("/api/metrics", HTTP_AUTHORIZATION="Bearer ").status_code, 401)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=True)
+    def test_open_in_debug_without_a_token(self):
+        self.assertEqual(self.client.get("/api/metrics").status_code, 200)
+
+    @override_settings(METRICS_TOKEN="", DEBUG=False)
+    def test_staff_session_is_allowed(self):
+        staff = get_user_model().objects.create_user(username="metrics-staff", password="pw-123456", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get("/api/metrics").status_code, 200)
+
+
+class MmapStoreTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "metrics.mmap")
+
+    def test_counters_are_shared_between_stores(self):
+        first = metrics.MmapStore(self.path)
+        second = metrics.MmapStore(self.path)
+        first.inc("a", 2)
+        second.inc("a", 3)
+        second.inc("b", 0.5)
+        self.assertEqual(first.snapshot(), {"a": 5.0, "b": 0.5})
+
+    def test_dead_worker_slot_is_reused_with_its_counters(self):
+        store = metrics.MmapStore(self.path)
+        store.inc("a")
+        slot = store._slot()
+        # Simulate the worker exiting and a fresh process attaching
+        with mock.patch.object(metrics.MmapStore, "_alive", return_value=False):
+            successor = metrics.MmapStore(self.path)
+            with mock.patch("os.getpid", return_value=store._pid + 1):
+                successor.inc("a")
+                self.assertEqual(successor._slot(), slot)
+        self.assertEqual(successor.snapshot(), {"a": 2.0})
+
+    def test_oversized_keys_are_dropped(self):
+        store = metrics.MmapStore(self.path)
+        store.inc("x" * (metrics.MmapStore.KEY_BYTES + 1))
+        self.assertEqual(store.snapshot(), {})
+
+    def test_rate_counts_complete_seconds(self):
+        store = metrics.MmapStore(self.path)
+        store.tick(100)
+        store.tick(101)
+        self.assertEqual(store.rate(2, now=102), 1.0)
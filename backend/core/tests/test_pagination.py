@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import Event, Vessel, VoyageTrack
+from core.pagination import keyset_page
+
+UTC = dt_timezone.utc
+
+
+class KeysetPageTests(TestCase):
+    def setUp(self):
+        vessel = Vessel.objects.create(name="Paging Test", mmsi="100000003")
+        start = datetime(2024, 1, 1, tzinfo=UTC)
+        self.rows = [
+            VoyageTrack.objects.create(vessel=vessel, latitude=0, longitude=0, timestamp=start + timedelta(minutes=i))
+            for i in range(5)
+        ]
+
+    def ids(self, rows):
+        return [row.pk for row in rows]
+
+    def test_forward_and_backward(self):
+        tracks = VoyageTrack.objects.all()
+        newest = [row.pk for row in reversed(self.rows)]
+
+        page, next_cursor, prev_cursor = keyset_page(tracks, "timestamp", 2)
+        self.assertEqual(self.ids(page), newest[:2])
+        self.assertIsNone(prev_cursor)
+
+        page, next_cursor, prev_cursor = keyset_page(tracks, "timestamp", 2, next_cursor)
+        self.assertEqual(self.ids(page), newest[2:4])
+        self.assertIsNotNone(prev_cursor)
+
+        last, last_next, _ = keyset_page(tracks, "timestamp", 2, next_cursor)
+        self.assertEqual(self.ids(last), newest[4:])
+        self.assertIsNone(last_next)
+
+        page, next_cursor, prev_cursor = keyset_page(tracks, "timestamp", 2, prev_cursor)
+        self.assertEqual(self.ids(page), newest[:2])
+        self.assertIsNone(prev_cursor)
+        self.assertIsNotNone(next_cursor)
+
+    def test_equal_timestamps_break_ties_by_id(self):
+        VoyageTrack.objects.update(timestamp=datetime(2024, 1, 1, tzinfo=UTC))
+        seen = []
+        cursor = None
+        while True:
+            page, cursor, _ = keyset_page(VoyageTrack.objects.all(), "timestamp", 2, cursor)
+            seen += self.ids(page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, sorted(self.ids(self.rows), reverse=True))
+
+
+
+class PagedEndpointTests(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="pager", password="pw-123456")
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {RefreshToken.for_user(user).access_token}"
+        vessel = Vessel.objects.create(name="Paging Events", mmsi="100000004")
+        for i in range(5):
+            Event.objects.create(vessel=vessel, event_type="Port Arrival", location="0, 0")
+
+    def test_cursor_headers(self):
+        first = self.client.get("/api/events/", {"page_size": 3})
+        self.assertEqual(len(first.json()), 3)
+        self.assertEqual(first["X-Total-Count"], "5")
+        self.assertNotIn("X-Prev-Cursor", first)
+
+        second = self.client.get("/api/events/", {"page_size": 3, "cursor": first["X-Next-Cursor"]})
+        self.assertEqual(len(second.json()), 2)
+        self.assertNotIn("X-Next-Cursor", second)
+        ids = [event["id"] for event in first.json() + second.json()]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_invalid_cursor_is_rejected(self):
+        self.assertEqual(self.client.get("/api/events/", {"cursor": "not-a-cursor"}).status_code, 400)
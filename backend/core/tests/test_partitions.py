@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import partitions
+from core.models import Vessel, Voyage, VoyageTrack
+
+UTC = dt_timezone.utc
+
+
+class PartitionNamingTests(TestCase):
+    def test_period_bounds(self):
+        moment = datetime(2024, 5, 16, 13, 30, tzinfo=UTC)  # a Thursday
+        day = partitions._period_start(moment, "day")
+        week = partitions._period_start(moment, "week")
+        self.assertEqual(day, datetime(2024, 5, 16, tzinfo=UTC))
+        self.assertEqual(week, datetime(2024, 5, 13, tzinfo=UTC))
+        self.assertEqual(partitions._period_end(week, "week"), datetime(2024, 5, 20, tzinfo=UTC))
+        self.assertEqual(partitions.partition_name(day), "voyage_tracks_p20240516")
+
+    @override_settings(TRACK_PARTITION_INTERVAL="month")
+    def test_unknown_interval_is_rejected(self):
+        with self.assertRaises(ValueError):
+            partitions._interval()
+
+    def test_track_window(self):
+        now = datetime(2024, 6, 1, tzinfo=UTC)
+        departed = now - timedelta(days=3)
+        arrived = Voyage(departure_time=departed, arrival_time=now - timedelta(days=1))
+        underway = Voyage(departure_time=departed, arrival_time=now + timedelta(days=2))
+        self.assertEqual(partitions.track_window(arrived, now), (departed, now - timedelta(days=1)))
+        self.assertEqual(partitions.track_window(underway, now), (departed, now))
+
+
+@skipUnless(connection.vendor == "postgresql", "voyage_tracks is only partitioned on PostgreSQL")
+class PartitionMaintenanceTests(TestCase):
+    def partition_of(self, track):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT tableoid::regclass::text FROM voyage_tracks WHERE id = %s", [track.id])
+            return cursor.fetchone()[0]
+
+    def test_rows_in_the_default_partition_are_moved(self):
+        vessel = Vessel.objects.create(name="Partition Test", mmsi="100000010")
+        ahead = partitions._period_start(timezone.now() + timedelta(days=40), "day")
+        track = VoyageTrack.objects.create(vessel=vessel, latitude=0, longitude=0, timestamp=ahead + timedelta(hours=1))
+        self.assertEqual(self.partition_of(track), partitions.DEFAULT_PARTITION)
+
+        with override_settings(TRACK_PARTITION_INTERVAL="day"):
+            created = partitions.ensure_partitions(ahead_days=41)
+        self.assertIn((partitions.partition_name(ahead), ahead, ahead + timedelta(days=1), 1), created)
+        self.assertEqual(self.partition_of(track), partitions.partition_name(ahead))
+        # Running again finds nothing left to do
+        self.assertEqual(partitions.ensure_partitions(ahead_days=41), [])
+
+    def test_expired_partitions_are_dropped(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TABLE voyage_tracks_p20200101 PARTITION OF voyage_tracks "
+                "FOR VALUES FROM ('2020-01-01 00:00+00') TO ('2020-01-02 00:00+00')"
+            )
+        dropped = partitions.drop_expired_partitions(retention_days=30)
+        self.assertEqual([name for name, _upper in dropped], ["voyage_tracks_p20200101"])
+        self.assertNotIn("voyage_tracks_p20200101", [name for name, *_ in partitions.list_partitions()])
+        self.assertEqual(partitions.drop_expired_partitions(retention_days=0), [])
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import profiling
+
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class ProfilingTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = Path(directory.name)
+        settings = override_settings(PROFILE_DIR=directory.name, PROFILE_INTERVAL_MS=1, PROFILE_SAMPLE_RATE=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+
+class ProfileTests(ProfilingTestCase):
+    def test_profile_writes_collapsed_stacks(self):
+        with profiling.profile("GET /api/slow/") as result:
+            busy(0.05)
+        self.assertIsNotNone(result["name"])
+        content = (self.dir / result["name"]).read_text()
+        self.assertIn("test_profiling:busy", content)
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in content.splitlines()))
+        self.assertEqual([p["name"] for p in profiling.list_profiles()], [result["name"]])
+
+    def test_sampling_is_off_at_zero_rate(self):
+        with profiling.maybe_profile("GET /api/") as result:
+            busy(0.01)
+        self.assertIsNone(result["name"])
+
+    def test_oldest_profiles_are_pruned(self):
+        with override_settings(PROFILE_MAX_BYTES=8):
+            old = profiling.write_profile("old", Counter({"a;b": 1}), 1)
+            os.utime(self.dir / old, (0, 0))
+            new = profiling.write_profile("new", Counter({"a;b": 2}), 1)
+        self.assertEqual(sorted(p.name for p in self.dir.iterdir()), [new])
+
+    def test_profile_path_rejects_other_files(self):
+        name = profiling.write_profile("x", Counter({"a": 1}), 1)
+        self.assertEqual(profiling.profile_path(name), self.dir / name)
+        self.assertIsNone(profiling.profile_path("../settings.py"))
+        self.assertIsNone(profiling.profile_path("missing.collapsed"))
+
+
+class ProfilingMiddlewareTests(ProfilingTestCase):
+    def setUp(self):
+        super().setUp()
+        self.staff = get_user_model().objects.create_user(username="profile-staff", password="pw-123456", is_staff=True)
+
+    def test_staff_can_request_a_profile(self):
+        auth = f"Bearer {RefreshToken.for_user(self.staff).access_token}"
+        with mock.patch.object(profiling, "profile", wraps=profiling.profile) as profile:
+            response = self.client.get("/api/vessels/", HTTP_X_PROFILE="1", HTTP_AUTHORIZATION=auth)
+        profile.assert_called_once_with("GET /api/vessels/")
+        name = response.get("X-Profile-Id")
+        if name:  # a fast request may finish before the first sample
+            self.assertTrue((self.dir / name).is_file())
+        self.assertEqual(self.client.get("/api/profiles/", HTTP_AUTHORIZATION=auth).status_code, 200)
+
+    def test_header_is_ignored_for_anonymous_requests(self):
+        response = self.client.get("/api/", HTTP_X_PROFILE="1")
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(list(self.dir.iterdir()), [])
+
+    def test_profiles_are_admin_only(self):
+        self.assertIn(self.client.get("/api/profiles/").status_code, (401, 403))
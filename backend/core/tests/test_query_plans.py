@@ -0,0 +1,63 @@
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core import analytics, benchmarks, dashboard
+from core.models import Vessel, Voyage, VoyageTrack
+from core.query_plans import check_queries, seq_scans
+
+# Routes on the request hot path; their queries must stay on indexes
+HOT_ROUTES = {
+    "voyages/", "events/", "voyage-track/<int:voyage_id>/", "dashboard/",
+    "analytics/", "analytics/flows/", "alerts/", "alerts/search/",
+}
+# Reference and rollup tables small enough to read whole
+SMALL_TABLES = {"ports", "alert_daily_stats", "analytics_fleet_composition"}
+
+
+class SeqScanTests(TestCase):
+    def test_detects_full_scans(self):
+        self.assertEqual(seq_scans("SELECT * FROM notifications"), ["notifications"])
+        self.assertEqual(
+            seq_scans("SELECT id FROM notifications WHERE subject = 'port:1' AND timestamp > '2024-01-01'"), []
+        )
+
+
+@skipUnless(connection.vendor == "postgresql", "plans are only checked on PostgreSQL")
+class HotQueryPlanTests(TestCase):
+    def setUp(self):
+        vessel = Vessel.objects.create(name="Plan Test", mmsi="100000020")
+        Voyage.objects.create(
+            vessel=vessel, departure_time=timezone.now() - timedelta(days=2), arrival_time=timezone.now()
+        )
+        VoyageTrack.objects.create(
+            vessel=vessel, latitude=1, longitude=2, timestamp=timezone.now() - timedelta(days=1)
+        )
+        # The scheduled jobs keep these warm; a cold rebuild reads whole tables
+        analytics.refresh_fleet_composition()
+        dashboard.refresh_stats()
+        # Empty test tables make every scan cheap; with sequential scans
+        # priced out, the planner only picks one when no index applies
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+        self.addCleanup(self.reset_seqscan)
+
+    def reset_seqscan(self):
+        with connection.cursor() as cursor:
+            cursor.execute("RESET enable_seqscan")
+
+    def test_hot_routes_use_indexes(self):
+        client = benchmarks.bench_client()
+        urls = [(method, route, url) for method, route, url in benchmarks.bench_urls() if route in HOT_ROUTES]
+        self.assertEqual({route for _method, route, _url in urls}, HOT_ROUTES)
+        for method, route, url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as captured:
+                    response = benchmarks.send(client, method, url)
+                self.assertEqual(response.status_code, 200)
+                violations = check_queries(route, captured.captured_queries, 0, {})
+                self.assertEqual([(table, sql) for table, _rows, sql in violations if table not in SMALL_TABLES], [])
@@ -0,0 +1,68 @@
+import warnings
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core import regions
+from core.models import Notification, Port, Vessel, Voyage
+from core.regions import REGION_IDS, UNASSIGNED
+
+EUROPE = REGION_IDS["europe"]
+ASIA = REGION_IDS["asia pacific"]
+
+
+class RegionLookupTests(TestCase):
+    def test_known_positions(self):
+        self.assertEqual(regions.region_of(51.95, 4.14), EUROPE)  # Rotterdam
+        self.assertEqual(regions.region_of(1.26, 103.82), ASIA)  # Singapore
+        self.assertEqual(regions.region_of(40.7, -74.0), REGION_IDS["americas"])  # New York
+        self.assertEqual(regions.region_of(25.0, 55.1), REGION_IDS["middle east"])  # Jebel Ali
+        self.assertEqual(regions.region_of(-33.9, 18.4), REGION_IDS["africa"])  # Cape Town
+        self.assertEqual(regions.region_of(-70, 0), UNASSIGNED)  # Southern Ocean
+        self.assertEqual(regions.region_of(None, 4.1), UNASSIGNED)
+
+    def test_unknown_positions_in_bulk(self):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            ids = regions.region_ids([51.95, float("nan"), 1.26], [4.14, 4.14, float("nan")])
+        self.assertEqual(ids.tolist(), [EUROPE, UNASSIGNED, UNASSIGNED])
+
+    def test_parse_region(self):
+        self.assertIsNone(regions.parse_region(None))
+        self.assertIsNone(regions.parse_region(regions.ALL_REGIONS))
+        self.assertEqual(regions.parse_region(" europe "), EUROPE)
+        with self.assertRaises(ValueError):
+            regions.parse_region("Atlantis")
+
+
+class RegionTaggingTests(TestCase):
+    def test_rows_are_tagged_on_save(self):
+        rotterdam = Port.objects.create(name="Rotterdam", country="NL", location="51.95, 4.14")
+        singapore = Port.objects.create(name="Singapore", country="SG", location="1.26, 103.82")
+        vessel = Vessel.objects.create(name="Tagged", mmsi="100000050", last_position_lat=1.3, last_position_lon=104)
+        voyage = Voyage.objects.create(vessel=vessel, port_from=singapore, port_to=rotterdam)
+        alert = Notification.objects.create(message="Alert: Speed Drop", type="Alert", vessel=vessel)
+        self.assertEqual((rotterdam.region_id, vessel.region_id), (EUROPE, ASIA))
+        self.assertEqual((voyage.region_from, voyage.region_to), (ASIA, EUROPE))
+        self.assertEqual(alert.region_id, ASIA)
+
+    def test_assign_regions_backfills(self):
+        port = Port.objects.create(name="Rotterdam", country="NL", location="51.95, 4.14")
+        vessel = Vessel.objects.create(name="Old", mmsi="100000051", last_position_lat=51.9, last_position_lon=4.1)
+        unknown = Vessel.objects.create(name="Unknown", mmsi="100000052")
+        voyage = Voyage.objects.create(vessel=vessel, port_to=port)
+        alert = Notification.objects.create(message="CRITICAL: Rotterdam congestion at 95%.", type="Congestion Alert")
+        Port.objects.update(region_id=UNASSIGNED)
+        Vessel.objects.update(region_id=UNASSIGNED)
+        Voyage.objects.update(region_to=UNASSIGNED)
+
+        out = StringIO()
+        call_command("assign_regions", "--batch-size", "1", stdout=out)
+        self.assertIn("Europe: 1", out.getvalue())
+        vessel.refresh_from_db()
+        unknown.refresh_from_db()
+        voyage.refresh_from_db()
+        alert.refresh_from_db()
+        self.assertEqual((vessel.region_id, unknown.region_id), (EUROPE, UNASSIGNED))
+        self.assertEqual((voyage.region_to, alert.region_id), (EUROPE, EUROPE))
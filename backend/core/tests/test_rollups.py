@@ -0,0 +1,107 @@
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import track_archive
+from core.models import TrackRollup, Vessel, VoyageTrack
+from core.rollups import bucket_start, rebuild_rollups, record_track_points, select_resolution, stride
+
+UTC = dt_timezone.utc
+
+
+def quiet(*args):
+    pass
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.vessel = Vessel.objects.create(name="Rollup Test", mmsi="100000002")
+
+    def _track(self, start, count, every=timedelta(minutes=1)):
+        points = []
+        for i in range(count):
+            ts = start + i * every
+            VoyageTrack.objects.create(
+                vessel=self.vessel, latitude=1.0, longitude=2.0, speed=8.0, course=0.0, timestamp=ts
+            )
+            points.append((self.vessel.id, ts, 1.0, 2.0, 8.0, 0.0))
+        return points
+
+    def test_bucket_start(self):
+        moment = datetime(2024, 1, 1, 10, 7, 30, tzinfo=UTC)
+        self.assertEqual(bucket_start(moment, 60), datetime(2024, 1, 1, 10, 7, tzinfo=UTC))
+        self.assertEqual(bucket_start(moment, 900), datetime(2024, 1, 1, 10, 0, tzinfo=UTC))
+        self.assertEqual(bucket_start(moment, 3600), datetime(2024, 1, 1, 10, 0, tzinfo=UTC))
+
+    def test_record_track_points_folds_buckets(self):
+        start = datetime(2024, 1, 1, 10, 0, tzinfo=UTC)
+        record_track_points(self._track(start, 20))
+        rollups = TrackRollup.objects.filter(vessel=self.vessel)
+        self.assertEqual(rollups.filter(resolution=60).count(), 20)
+        self.assertEqual(rollups.get(resolution=900, bucket=start).point_count, 15)
+        self.assertEqual(rollups.get(resolution=3600).point_count, 20)
+
+    def test_select_resolution_picks_finest_fitting(self):
+        start = timezone.now() - timedelta(hours=2)
+        record_track_points(self._track(start, 20))
+        end = start + timedelta(hours=1)
+        self.assertIsNone(select_resolution(self.vessel.id, start, end, 50))
+        self.assertIn(select_resolution(self.vessel.id, start, end, 5), (900, 3600))
+
+    def test_select_resolution_skips_pruned_and_empty_resolutions(self):
+        now = timezone.now()
+        recent = now - timedelta(hours=2)
+        old = now - timedelta(days=40)
+        record_track_points(self._track(recent, 20) + self._track(old, 20))
+        TrackRollup.objects.exclude(resolution=60).delete()
+
+        # Only the 1-minute buckets exist: they cover a recent window...
+        self.assertEqual(select_resolution(self.vessel.id, recent, now, 5), 60)
+        # ...but not one starting before their 30-day retention
+        self.assertIsNone(select_resolution(self.vessel.id, old, now, 5))
+
+        TrackRollup.objects.all().delete()
+        self.assertIsNone(select_resolution(self.vessel.id, recent, now, 5))
+
+    def test_stride(self):
+        rows = list(range(10))
+        self.assertEqual(stride(rows, 20), rows)
+        self.assertEqual(stride(rows, 4), [0, 3, 6, 9])
+
+
+class RebuildRollupTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        archive_dir = override_settings(TRACK_ARCHIVE_DIR=self.tmp.name, TRACK_ARCHIVE_SHARED=True)
+        archive_dir.enable()
+        self.addCleanup(archive_dir.disable)
+        self.vessel = Vessel.objects.create(name="Rebuild Test", mmsi="100000004")
+
+    def test_rebuild_replaces_buckets(self):
+        start = bucket_start(timezone.now() - timedelta(days=2), 3600)
+        for minute in range(30):
+            VoyageTrack.objects.create(
+                vessel=self.vessel, latitude=1.0, longitude=2.0, speed=5.0, course=90.0,
+                timestamp=start + timedelta(minutes=minute),
+            )
+        # A stale rollup that the raw rows no longer support
+        record_track_points([(self.vessel.id, start, 1.0, 2.0, 5.0, 90.0)] * 7)
+
+        total, rebuilt_from = rebuild_rollups(start - timedelta(minutes=10), log=quiet)
+        self.assertEqual(total, 30)
+        self.assertEqual(rebuilt_from, start - timedelta(hours=1))
+        self.assertEqual(TrackRollup.objects.get(resolution=3600, bucket=start).point_count, 30)
+        self.assertEqual(TrackRollup.objects.filter(resolution=60).count(), 30)
+
+    def test_archived_days_keep_their_rollups(self):
+        watermark = datetime.combine((timezone.now() - timedelta(days=10)).date(), datetime.min.time(), tzinfo=UTC)
+        track_archive._set_watermark(watermark)
+        archived = watermark - timedelta(days=5)
+        record_track_points([(self.vessel.id, archived, 1.0, 2.0, 5.0, 90.0)])
+
+        total, rebuilt_from = rebuild_rollups(watermark - timedelta(days=20), log=quiet)
+        self.assertEqual((total, rebuilt_from), (0, watermark))
+        self.assertEqual(TrackRollup.objects.filter(bucket=archived).count(), 3)
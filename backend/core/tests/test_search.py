@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core import search
+from core.models import Notification, Vessel
+
+
+class MemoryIndexTests(TestCase):
+    def setUp(self):
+        self.index = search.MemoryIndex()
+        self.index.add(1, "CRITICAL: Rotterdam congestion at 91%", "EVER GIVEN")
+        self.index.add(2, "Storm warning near Rotterdam")
+        self.index.add(3, "Vessel delayed at Singapore", None, "Singapore")
+
+    def test_prefix_search(self):
+        self.assertEqual(set(self.index.search(["rott"])), {1, 2})
+        self.assertEqual(set(self.index.search(["rott", "cong"])), {1})
+        self.assertEqual(self.index.search(["nothing"]), {})
+
+    def test_names_weigh_less_than_message(self):
+        self.assertEqual(self.index.search(["ever"]), {1: search.NAME_WEIGHT})
+        self.assertEqual(self.index.search(["singapore"]), {3: search.MESSAGE_WEIGHT + search.NAME_WEIGHT})
+
+    def test_remove(self):
+        self.index.remove(2)
+        self.assertEqual(set(self.index.search(["rott"])), {1})
+
+    def test_broad_match_on_sqlite(self):
+        # More ids than SQLite allows as bound variables (32766)
+        Notification.objects.bulk_create(
+            [Notification(message=f"Swell report {i}", type="Alert") for i in range(33000)], batch_size=5000
+        )
+        search.reset_memory_index()
+        self.addCleanup(search.reset_memory_index)
+        self.assertEqual(search.filter_alerts(Notification.objects.all(), "swell").count(), 33000)
+        self.assertEqual(len(search.rank_alerts(Notification.objects.all(), "swell", 10)), 10)
+
+
+class AlertSearchTests(TestCase):
+    def setUp(self):
+        search.reset_memory_index()
+        self.addCleanup(search.reset_memory_index)
+        user = get_user_model().objects.create_user(username="searcher", password="pw-123456")
+        self.client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {RefreshToken.for_user(user).access_token}"
+        vessel = Vessel.objects.create(name="Rotterdam Express", mmsi="100000005")
+        self.message_hit = Notification.objects.create(message="CRITICAL: Rotterdam congestion at 95%", type="Alert")
+        self.name_hit = Notification.objects.create(message="Speed drop", type="Alert", vessel=vessel)
+        Notification.objects.create(message="Storm near Singapore", type="Alert")
+
+    def test_query_terms(self):
+        self.assertEqual(search.query_terms("  Rott,  cong!! "), ["rott", "cong"])
+        self.assertEqual(search.query_terms("!!"), [])
+
+    def test_rank_puts_message_matches_first(self):
+        ranked = search.rank_alerts(Notification.objects.all(), "rotterdam", 10)
+        self.assertEqual([n.pk for n in ranked], [self.message_hit.pk, self.name_hit.pk])
+
+    def test_new_alerts_are_indexed(self):
+        search.filter_alerts(Notification.objects.all(), "storm")  # builds the index
+        late = Notification.objects.create(message="Storm surge at Hamburg", type="Alert")
+        matches = search.filter_alerts(Notification.objects.all(), "storm surge")
+        self.assertEqual(list(matches.values_list("pk", flat=True)), [late.pk])
+
+    def test_typeahead_endpoint(self):
+        response = self.client.get("/api/alerts/search/", {"q": "rott", "limit": 1})
+        self.assertEqual([row["id"] for row in response.json()], [self.message_hit.pk])
+        self.assertEqual(self.client.get("/api/alerts/search/", {"q": "x", "region": "Atlantis"}).status_code, 400)
+        self.assertEqual(self.client.get("/api/alerts/search/", {"q": ""}).json(), [])
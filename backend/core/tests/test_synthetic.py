@@ -0,0 +1,51 @@
+from contextlib import redirect_stdout
+from io import StringIO
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core import synthetic
+from core.models import DashboardStats, Vessel, Voyage, VoyageDailyStats, VoyageTrack
+
+
+class GenerateFleetTests(TestCase):
+    def setUp(self):
+        self.end = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def generate(self, vessels=5, points=4, seed=7):
+        with redirect_stdout(StringIO()):
+            return synthetic.generate_fleet(vessels, points, seed=seed, end=self.end, chunk_size=2)
+
+    def fleet(self):
+        return list(
+            synthetic.synthetic_vessels().order_by("name")
+            .values_list("name", "type", "last_position_lat", "last_position_lon")
+        )
+
+    def test_loads_vessels_voyages_and_tracks(self):
+        self.assertEqual(self.generate(), (5, 20))
+        self.assertEqual(synthetic.synthetic_vessels().count(), 5)
+        self.assertEqual(Voyage.objects.count(), 5)
+        self.assertEqual(VoyageTrack.objects.count(), 20)
+        self.assertTrue(all(name.startswith("SYN-") for name in Vessel.objects.values_list("name", flat=True)))
+        self.assertTrue(VoyageDailyStats.objects.exists())
+        self.assertEqual(DashboardStats.objects.get().total_vessels, 5)
+
+    def test_same_seed_same_fleet(self):
+        self.generate()
+        first = self.fleet()
+        synthetic.clear_synthetic()
+        self.generate()
+        self.assertEqual(self.fleet(), first)
+
+    def test_refuses_a_second_fleet(self):
+        self.generate()
+        with self.assertRaises(ValueError):
+            self.generate()
+
+    def test_clear_removes_everything(self):
+        self.generate()
+        self.assertEqual(synthetic.clear_synthetic(), 5)
+        self.assertFalse(Vessel.objects.exists())
+        self.assertFalse(Voyage.objects.exists())
+        self.assertFalse(VoyageTrack.objects.exists())
@@ -0,0 +1,109 @@
+import math
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import track_archive
+from core.models import Vessel, VoyageTrack
+
+UTC = dt_timezone.utc
+
+
+def quiet(*args):
+    pass
+
+
+class TrackArchiveTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        archive_dir = override_settings(TRACK_ARCHIVE_DIR=self.tmp.name, TRACK_ARCHIVE_SHARED=True)
+        archive_dir.enable()
+        self.addCleanup(archive_dir.disable)
+        self.vessel = Vessel.objects.create(name="Archive Test", mmsi="100000001")
+
+    def test_segment_round_trip(self):
+        day = date(2024, 1, 2)
+        start = datetime(2024, 1, 2, 6, tzinfo=UTC)
+        timestamps = [start + timedelta(seconds=s) for s in (0, 30, 95, 4000)]
+        lats = [51.9, 51.90012, 51.9003, 52.1]
+        lons = [4.1, 4.10007, 4.1002, 3.7]
+        speeds = [12.3, None, 0.0, 18.0]
+        courses = [90.0, 91.5, None, 359.9]
+        track_archive.write_segment(self.vessel.id, day, timestamps, lats, lons, speeds, courses)
+
+        t, lat, lon, speed, course = track_archive.read_segment(self.vessel.id, day)
+        self.assertEqual(list(t), [int(ts.timestamp()) for ts in timestamps])
+        for got, want in zip(lat, lats):
+            self.assertAlmostEqual(got, want, places=5)
+        for got, want in zip(lon, lons):
+            self.assertAlmostEqual(got, want, places=5)
+        self.assertEqual(speed[0], 12.3)
+        self.assertTrue(math.isnan(speed[1]))
+        self.assertTrue(math.isnan(course[2]))
+        self.assertEqual(course[3], 359.9)
+        self.assertIsNone(track_archive.read_segment(self.vessel.id, date(2024, 1, 3)))
+
+    def test_archiving_twice_does_not_duplicate_points(self):
+        day_start = datetime.combine(
+            (timezone.now() - timedelta(days=3)).date(), datetime.min.time(), tzinfo=UTC
+        )
+        for minute in range(5):
+            VoyageTrack.objects.create(
+                vessel=self.vessel, latitude=10 + minute / 100, longitude=20.0,
+                speed=10.0, course=45.0, timestamp=day_start + timedelta(minutes=minute),
+            )
+
+        track_archive.archive_tracks(older_than_days=1, delete=False, log=quiet)
+        track_archive.archive_tracks(older_than_days=1, delete=False, log=quiet)
+        t, *_ = track_archive.read_segment(self.vessel.id, day_start.date())
+        self.assertEqual(len(t), 5)
+
+        stats = track_archive.archive_tracks(older_than_days=1, log=quiet)
+        self.assertEqual(stats["points"], 5)
+        self.assertFalse(VoyageTrack.objects.exists())
+        t, *_ = track_archive.read_segment(self.vessel.id, day_start.date())
+        self.assertEqual(len(t), 5)
+        self.assertIsNotNone(track_archive.archived_until())
+
+    def _archived_day(self):
+        return datetime.combine((timezone.now() - timedelta(days=3)).date(), datetime.min.time(), tzinfo=UTC)
+
+    def test_points_within_one_second_are_kept_apart(self):
+        day_start = self._archived_day()
+        moments = [day_start + timedelta(seconds=10, microseconds=us) for us in (0, 250_000, 750_000)]
+        for i, moment in enumerate(moments):
+            VoyageTrack.objects.create(vessel=self.vessel, latitude=10 + i, longitude=20.0, timestamp=moment)
+
+        track_archive.archive_tracks(older_than_days=1, delete=False, log=quiet)
+        track_archive.archive_tracks(older_than_days=1, log=quiet)
+        points = track_archive.read_points(self.vessel, day_start, day_start + timedelta(days=1))
+        self.assertEqual([p["timestamp"] for p in points], moments)
+        self.assertEqual([p["latitude"] for p in points], [10.0, 11.0, 12.0])
+        self.assertEqual(track_archive.count_points(self.vessel.id, day_start, moments[1]), 1)
+
+    def test_rows_written_during_a_run_are_not_deleted(self):
+        day_start = self._archived_day()
+        VoyageTrack.objects.create(vessel=self.vessel, latitude=1.0, longitude=2.0, timestamp=day_start)
+        late = day_start + timedelta(hours=1)
+        write_segment = track_archive.write_segment
+
+        def write_then_insert(*args):
+            written = write_segment(*args)
+            if not VoyageTrack.objects.filter(timestamp=late).exists():
+                VoyageTrack.objects.create(vessel=self.vessel, latitude=3.0, longitude=4.0, timestamp=late)
+            return written
+
+        with mock.patch.object(track_archive, "write_segment", side_effect=write_then_insert):
+            stats = track_archive.archive_tracks(older_than_days=1, log=quiet)
+        self.assertEqual(stats["points"], 1)
+        self.assertEqual(list(VoyageTrack.objects.values_list("timestamp", flat=True)), [late])
+
+        # The next run archives it next to the first point
+        track_archive.archive_tracks(older_than_days=1, log=quiet)
+        t, *_ = track_archive.read_segment(self.vessel.id, day_start.date())
+        self.assertEqual(list(t), [day_start.timestamp(), late.timestamp()])
+        self.assertFalse(VoyageTrack.objects.exists())
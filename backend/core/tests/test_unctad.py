@@ -0,0 +1,65 @@
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+from django.test import TestCase
+
+from core import alerts, unctad_loader
+from core.models import AlertDailyStats, AppUser, DashboardStats, Notification, Port, RiskZone
+from core.regions import REGION_IDS
+
+
+class UnctadRefreshTests(TestCase):
+    def setUp(self):
+        alerts.reset_recent_alerts()
+        self.addCleanup(alerts.reset_recent_alerts)
+        AppUser.objects.create(username="system", email="system@example.com", password="-")
+        self.rotterdam = Port.objects.create(name="Rotterdam", country="NL", location="51.95, 4.14")
+        self.inland = Port.objects.create(name="Inland", country="XX", location="unknown")
+        self.quiet = Port.objects.create(name="Quiet", country="XX", location="10, 10")
+        self.scores = {}
+
+    def refresh(self):
+        """One refresh with congestion scores taken from self.scores by port."""
+        ports = iter(Port.objects.order_by("id").values_list("name", flat=True))
+        randomness = mock.Mock()
+        randomness.randint.side_effect = lambda low, high: self.scores.get(next(ports), 10)
+        randomness.uniform.return_value = 12.0
+        with mock.patch.object(unctad_loader, "random", randomness), redirect_stdout(StringIO()):
+            return unctad_loader.fetch_unctad_ports()
+
+    def test_congested_ports_get_zones_and_alerts(self):
+        self.scores = {"Rotterdam": 95, "Inland": 90}
+        counts = self.refresh()
+        self.assertEqual(
+            {key: counts[key] for key in ("ports", "congested", "zones_created", "zones_skipped", "alerts_created")},
+            {"ports": 3, "congested": 2, "zones_created": 1, "zones_skipped": 1, "alerts_created": 2},
+        )
+        self.rotterdam.refresh_from_db()
+        self.assertEqual((self.rotterdam.congestion_score, self.rotterdam.avg_wait_time), (95, 12.0))
+        zone = RiskZone.objects.get()
+        self.assertEqual(
+            (zone.name, zone.latitude, zone.region_id), ("Congestion: Rotterdam", 51.95, REGION_IDS["europe"])
+        )
+        alert = Notification.objects.get(port=self.rotterdam)
+        self.assertEqual((alert.severity, alert.wait_hours), ("critical", 12.0))
+        # Bulk writes skip the receivers; the rollups are applied directly
+        self.assertEqual(sum(AlertDailyStats.objects.values_list("count", flat=True)), 2)
+        self.assertTrue(DashboardStats.objects.exists())
+
+    def test_repeat_refresh_updates_zones_and_folds_alerts(self):
+        self.scores = {"Rotterdam": 95}
+        self.refresh()
+        self.scores = {"Rotterdam": 97}
+        counts = self.refresh()
+        self.assertEqual((counts["zones_created"], counts["zones_updated"]), (0, 1))
+        self.assertEqual((counts["alerts_created"], counts["alerts_folded"]), (0, 1))
+        self.assertEqual(RiskZone.objects.count(), 1)
+        self.assertEqual(Notification.objects.get().occurrences, 2)
+
+    def test_alerts_need_a_system_user(self):
+        AppUser.objects.all().delete()
+        self.scores = {"Rotterdam": 95}
+        counts = self.refresh()
+        self.assertEqual((counts["zones_created"], counts["alerts_created"]), (1, 0))
+        self.assertFalse(Notification.objects.exists())
@@ -0,0 +1,333 @@
+import json
+import os
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from itertools import groupby
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import VoyageTrack
+
+# -------------------------
+# COLD TRACK ARCHIVE
+# -------------------------
+# Tracks older than TRACK_ARCHIVE_AFTER_DAYS move out of Postgres into one
+# segment per vessel per day:
+#
+#   <TRACK_ARCHIVE_DIR>/<vessel_id>/<YYYYMMDD>.seg   column data
+#   <TRACK_ARCHIVE_DIR>/<vessel_id>/<YYYYMMDD>.idx   JSON: count + column layout
+#
+# Time (seconds into the day) and lat/lon (1e-5 degrees, ~1 m) are int32
+# fixed-point values stored as deltas from the first point; a column is
+# narrowed to int16 when all of its deltas fit. Speed and course are uint16
+# tenths. Sub-second parts of the timestamps go in an optional uint32
+# microsecond column, written only when a point has one. A typical point
+# costs 10 bytes instead of ~100 in Postgres, and reads are numpy.memmap
+# slices of the segment file.
+
+COORD_SCALE = 100_000
+TENTHS = 10
+NULL_U16 = 0xFFFF
+
+WATERMARK_FILE = "_watermark"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def archive_root():
+    return Path(settings.TRACK_ARCHIVE_DIR)
+
+
+def _day_start(day):
+    return datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+
+
+def _segment_paths(vessel_id, day):
+    base = archive_root() / str(vessel_id) / f"{day:%Y%m%d}"
+    return base.with_suffix(".seg"), base.with_suffix(".idx")
+
+
+def archived_until():
+    """
+    Everything strictly before this instant lives in the archive; the
+    database is authoritative from here on. None if nothing is archived.
+    """
+    try:
+        return datetime.fromisoformat((archive_root() / WATERMARK_FILE).read_text().strip())
+    except FileNotFoundError:
+        return None
+
+
+def _set_watermark(moment):
+    path = archive_root() / WATERMARK_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(moment.isoformat())
+    os.replace(tmp, path)
+
+
+def _encode_delta(values):
+    deltas = np.diff(values, prepend=values[0])
+    if deltas.size == 0 or (deltas.min() >= np.iinfo(np.int16).min and deltas.max() <= np.iinfo(np.int16).max):
+        return deltas.astype(np.int16)
+    return deltas.astype(np.int32)
+
+
+def _encode_tenths(values):
+    out = np.full(len(values), NULL_U16, dtype=np.uint16)
+    for i, value in enumerate(values):
+        if value is not None:
+            out[i] = min(int(round(value * TENTHS)), NULL_U16 - 1)
+    return out
+
+
+def write_segment(vessel_id, day, timestamps, lats, lons, speeds, courses):
+    """
+    Writes (or replaces) a vessel-day segment. Inputs must be sorted by time.
+    Files are written to a temp name and renamed so readers never see a
+    half-written segment.
+    """
+    day_start = _day_start(day)
+    offsets = [ts - day_start for ts in timestamps]
+    seconds = np.array([d.days * 86400 + d.seconds for d in offsets], dtype=np.int64)
+    micros = np.array([d.microseconds for d in offsets], dtype=np.uint32)
+    lat_fixed = np.round(np.asarray(lats, dtype=np.float64) * COORD_SCALE).astype(np.int64)
+    lon_fixed = np.round(np.asarray(lons, dtype=np.float64) * COORD_SCALE).astype(np.int64)
+
+    columns = [
+        ("time", int(seconds[0]), _encode_delta(seconds)),
+        ("lat", int(lat_fixed[0]), _encode_delta(lat_fixed)),
+        ("lon", int(lon_fixed[0]), _encode_delta(lon_fixed)),
+        ("speed", None, _encode_tenths(speeds)),
+        ("course", None, _encode_tenths(courses)),
+    ]
+    if micros.any():
+        columns.append(("usec", None, micros))
+
+    seg_path, idx_path = _segment_paths(vessel_id, day)
+    seg_path.parent.mkdir(parents=True, exist_ok=True)
+
+    layout = []
+    offset = 0
+    tmp_seg = seg_path.with_suffix(".seg.tmp")
+    with open(tmp_seg, "wb") as fh:
+        for name, base, array in columns:
+            fh.write(array.tobytes())
+            layout.append({"name": name, "dtype": array.dtype.str, "offset": offset, "base": base})
+            offset += array.nbytes
+
+    tmp_idx = idx_path.with_suffix(".idx.tmp")
+    tmp_idx.write_text(json.dumps({"count": len(seconds), "day": f"{day:%Y-%m-%d}", "columns": layout}))
+    os.replace(tmp_seg, seg_path)
+    os.replace(tmp_idx, idx_path)
+    return offset
+
+
+def _read_index(vessel_id, day):
+    _seg_path, idx_path = _segment_paths(vessel_id, day)
+    try:
+        return json.loads(idx_path.read_text())
+    except FileNotFoundError:
+        return None
+
+
+def read_segment(vessel_id, day):
+    """
+    Decodes a segment into numpy arrays: epoch seconds (float when the
+    segment has sub-second times), lat, lon, speed, course (NaN where
+    unknown). Returns None if the segment does not exist.
+    """
+    index = _read_index(vessel_id, day)
+    if not index or not index["count"]:
+        return None
+
+    seg_path, _idx_path = _segment_paths(vessel_id, day)
+    count = index["count"]
+    decoded = {}
+    for column in index["columns"]:
+        raw = np.memmap(seg_path, dtype=np.dtype(column["dtype"]), mode="r",
+                        offset=column["offset"], shape=(count,))
+        if column["base"] is not None:
+            decoded[column["name"]] = column["base"] + np.cumsum(raw, dtype=np.int64)
+        elif column["name"] == "usec":
+            decoded["usec"] = raw.astype(np.int64)
+        else:
+            values = raw.astype(np.float64) / TENTHS
+            values[raw == NULL_U16] = np.nan
+            decoded[column["name"]] = values
+
+    epoch = int(_day_start(datetime.strptime(index["day"], "%Y-%m-%d").date()).timestamp())
+    t = epoch + decoded["time"]
+    if "usec" in decoded:
+        t = t + decoded["usec"] / 1_000_000
+    return (
+        t,
+        decoded["lat"] / COORD_SCALE,
+        decoded["lon"] / COORD_SCALE,
+        decoded["speed"],
+        decoded["course"],
+    )
+
+
+def _moment(epoch_seconds):
+    return _EPOCH + timedelta(seconds=float(epoch_seconds))
+
+
+def _days(start, end):
+    day = start.astimezone(dt_timezone.utc).date()
+    last = end.astimezone(dt_timezone.utc).date()
+    while day <= last:
+        yield day
+        day += timedelta(days=1)
+
+
+def _archived_days(vessel_id):
+    folder = archive_root() / str(vessel_id)
+    if not folder.is_dir():
+        return []
+    return sorted(datetime.strptime(p.stem, "%Y%m%d").date() for p in folder.glob("*.idx"))
+
+
+def _clamp(vessel_id, start, end):
+    """Restricts [start, end) to the archived range; None if they don't overlap."""
+    watermark = archived_until()
+    if watermark is None:
+        return None
+    end = min(end, watermark)
+    if start is None:
+        days = _archived_days(vessel_id)
+        if not days:
+            return None
+        start = _day_start(days[0])
+    if start >= end:
+        return None
+    return start, end
+
+
+def count_points(vessel_id, start, end):
+    """
+    Archived point count in [start, end). Whole days are answered from the
+    index files; only the two edge days are decoded.
+    """
+    window = _clamp(vessel_id, start, end)
+    if window is None:
+        return 0
+    start, end = window
+    total = 0
+    for day in _days(start, end):
+        index = _read_index(vessel_id, day)
+        if not index or not index["count"]:
+            continue
+        if _day_start(day) >= start and _day_start(day) + timedelta(days=1) <= end:
+            total += index["count"]
+        else:
+            segment = read_segment(vessel_id, day)
+            t = segment[0]
+            total += int(((t >= start.timestamp()) & (t < end.timestamp())).sum())
+    return total
+
+
+def read_points(vessel, start, end):
+    """
+    Archived points in [start, end), shaped like VoyageTrackSerializer output.
+    """
+    window = _clamp(vessel.id, start, end)
+    if window is None:
+        return []
+    start, end = window
+    lo, hi = start.timestamp(), end.timestamp()
+
+    points = []
+    for day in _days(start, end):
+        segment = read_segment(vessel.id, day)
+        if segment is None:
+            continue
+        t, lat, lon, speed, course = segment
+        mask = (t >= lo) & (t < hi)
+        for ts, la, lo_, sp, co in zip(t[mask], lat[mask], lon[mask], speed[mask], course[mask]):
+            points.append({
+                "id": None,
+                "vessel": vessel.id,
+                "vessel_name": vessel.name,
+                "latitude": float(la),
+                "longitude": float(lo_),
+                "speed": None if np.isnan(sp) else float(sp),
+                "course": None if np.isnan(co) else float(co),
+                "timestamp": _moment(ts),
+            })
+    return points
+
+
+def archive_tracks(older_than_days=None, delete=True, log=print):
+    """
+    Moves every voyage_tracks row older than the cutoff (midnight UTC,
+    `older_than_days` ago) into archive segments, one UTC day at a time.
+    Each day's reads and deletes carry its range predicate, so on the
+    partitioned table they touch exactly one partition, and only the rows
+    that were written to a segment are deleted.
+
+    Deleting needs TRACK_ARCHIVE_SHARED: segments on a disk the web service
+    cannot read would take the points out of every replay.
+    """
+    if delete and not settings.TRACK_ARCHIVE_SHARED:
+        raise ImproperlyConfigured(
+            f"TRACK_ARCHIVE_DIR ({settings.TRACK_ARCHIVE_DIR}) is not marked as shared persistent storage; "
+            "set TRACK_ARCHIVE_SHARED=true once every service mounts it, or keep the raw rows"
+        )
+    if older_than_days is None:
+        older_than_days = settings.TRACK_ARCHIVE_AFTER_DAYS
+    cutoff = _day_start((timezone.now() - timedelta(days=older_than_days)).date())
+
+    stats = {"points": 0, "segments": 0, "bytes": 0}
+    oldest = VoyageTrack.objects.filter(timestamp__lt=cutoff).order_by("timestamp").values_list("timestamp", flat=True).first()
+    days = _days(oldest, cutoff - timedelta(seconds=1)) if oldest else []
+
+    for day in days:
+        day_start = _day_start(day)
+        day_rows = VoyageTrack.objects.filter(timestamp__gte=day_start, timestamp__lt=day_start + timedelta(days=1))
+        rows = day_rows.order_by("vessel_id", "timestamp").values_list(
+            "id", "vessel_id", "timestamp", "latitude", "longitude", "speed", "course"
+        )
+
+        archived_ids = []
+        for vessel_id, group in groupby(rows.iterator(chunk_size=20000), key=lambda r: r[1]):
+            points = []
+            for row in group:
+                archived_ids.append(row[0])
+                points.append(row[1:])
+            existing = read_segment(vessel_id, day)
+            if existing is not None:
+                t, lat, lon, speed, course = existing
+                # Late rows for an already archived day (or rows kept with
+                # delete=False): merge by timestamp, the database row winning
+                merged = {
+                    moment: (vessel_id, moment, float(la), float(lo),
+                             None if np.isnan(sp) else float(sp), None if np.isnan(co) else float(co))
+                    for moment, la, lo, sp, co in zip(map(_moment, t), lat, lon, speed, course)
+                }
+                merged.update((point[1], point) for point in points)
+                points = sorted(merged.values(), key=lambda p: p[1])
+            _vessel, timestamps, lats, lons, speeds, courses = zip(*points)
+            stats["bytes"] += write_segment(vessel_id, day, timestamps, lats, lons, speeds, courses)
+            stats["segments"] += 1
+
+        # Only the rows written above are deleted: a row inserted for this
+        # day since it was read stays in the table for the next run
+        day_points = len(archived_ids)
+        if delete and archived_ids:
+            with transaction.atomic():
+                for i in range(0, len(archived_ids), 10_000):
+                    day_rows.filter(id__in=archived_ids[i:i + 10_000]).delete()
+
+        stats["points"] += day_points
+        log(f"📦 Archived {day:%Y-%m-%d}: {day_points} points")
+
+    # Reads switch to the archive below the watermark whether or not the raw
+    # rows were kept, so replays never see a point twice.
+    previous = archived_until()
+    _set_watermark(max(cutoff, previous) if previous else cutoff)
+    return stats
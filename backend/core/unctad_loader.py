@@ -1,58 +1,126 @@
 import random
+import time
+from django.db import transaction
 from django.utils import timezone
-from core.models import Port, Notification, RiskZone, AppUser
+from core.models import Port, RiskZone, AppUser
+from core.alerts import build_alert, raise_alerts
+from core.dashboard import refresh_stats
+from core.geo import parse_location
+from core.regions import region_of
+
+# -------------------------
+# UNCTAD REFRESH
+# -------------------------
+# A refresh works out every port update, congestion zone and alert in
+# memory, then writes them in one transaction: one bulk_update for the
+# ports, one upsert (bulk_update + bulk_create) for the zones and one
+# bulk_create for the alerts. Readers see the whole refresh or none of it.
+
+CONGESTION_THRESHOLD = 85
+ZONE_RADIUS_KM = 20
+PORT_FIELDS = ["congestion_score", "avg_wait_time", "last_update"]
+ZONE_FIELDS = ["risk_type", "latitude", "longitude", "radius_km", "severity", "description", "region_id"]
+
+
+def _congestion_zone(port, coords):
+    lat, lon = coords
+    return RiskZone(
+        name=f"Congestion: {port.name}",
+        risk_type='CONGESTION',
+        latitude=lat,
+        longitude=lon,
+        radius_km=ZONE_RADIUS_KM,
+        severity='High',
+        description=f"Critical congestion at {port.name}",
+        region_id=region_of(lat, lon),  # bulk writes skip the pre_save tagging
+    )
+
+
+def _upsert_zones(zones):
+    """Writes `zones` by name. Returns (created, updated)."""
+    existing = {}
+    for zone in RiskZone.objects.filter(name__in=[z.name for z in zones]).order_by("id"):
+        existing.setdefault(zone.name, zone)
+    to_update, to_create = [], []
+    for zone in zones:
+        current = existing.get(zone.name)
+        if current is None:
+            to_create.append(zone)
+            continue
+        for field in ZONE_FIELDS:
+            setattr(current, field, getattr(zone, field))
+        to_update.append(current)
+    RiskZone.objects.bulk_update(to_update, ZONE_FIELDS, batch_size=1000)
+    RiskZone.objects.bulk_create(to_create, batch_size=1000)
+    return len(to_create), len(to_update)
+
 
 def fetch_unctad_ports():
     """
-    Simulates fetching trade/congestion stats, updates Ports,
-    and creates notifications linked to a system user.
+    Simulates fetching trade/congestion stats, updates Ports, marks congested
+    ports with a RiskZone and alerts a system user. Returns per-run counts.
     """
     print("Simulating UNCTAD Data Stream...")
-    
-    # 1. FIX: Get a valid user from the database to assign alerts to
-    # We use AppUser because your SQL maps the 'users' table to the AppUser model
+    started = time.monotonic()
+
+    # Notifications need a user; AppUser maps the 'users' table
     system_user = AppUser.objects.first()
-    
-    # If no user exists, we cannot create notifications due to DB constraints
     if not system_user:
         print("CRITICAL WARNING: No users found in 'users' table. Notifications skipped to prevent crash.")
-    
-    ports = Port.objects.all()
-    
+
+    now = timezone.now()
+    # Id order: concurrent refreshes lock the port rows in the same order
+    ports = list(Port.objects.only("id", "name", "location", "region_id", *PORT_FIELDS).order_by("id"))
+    zones, alerts, unlocated = [], [], 0
     for port in ports:
         # Simulate data updates
-        new_congestion = random.randint(10, 95)
-        new_wait_time = round(random.uniform(2.5, 72.0), 1)
-        
-        port.congestion_score = new_congestion
-        port.avg_wait_time = new_wait_time
-        port.last_update = timezone.now()
-        port.save()
-
-        # Check for High Congestion (Task 3)
-        if new_congestion > 85:
-            # Create Map Overlay (Risk Zone)
-            RiskZone.objects.get_or_create(
-                name=f"Congestion: {port.name}",
-                defaults={
-                    'risk_type': 'CONGESTION',
-                    'latitude': 0.0, # ideally fetch real lat/lon from Port model
-                    'longitude': 0.0,
-                    'radius_km': 20,
-                    'severity': 'High',
-                    'description': f"Critical congestion at {port.name}"
-                }
-            )
-            
-            # Create Notification ONLY if we have a user
-            if system_user:
-                Notification.objects.create(
-                    user=system_user,  # <--- This fixes the IntegrityError
-                    vessel=None,       
-                    event=None,
-                    message=f"CRITICAL: {port.name} congestion at {new_congestion}%. Wait time {new_wait_time}h.",
-                    type="Congestion Alert",
-                    timestamp=timezone.now()
-                )
-
-    print("UNCTAD Data Integrated and Notifications Processed.")
\ No newline at end of file
+        port.congestion_score = random.randint(10, 95)
+        port.avg_wait_time = round(random.uniform(2.5, 72.0), 1)
+        port.last_update = now
+        if port.congestion_score <= CONGESTION_THRESHOLD:
+            continue
+
+        # Map overlay at the port itself; a port without usable coordinates gets none
+        coords = parse_location(port.location)
+        if coords:
+            zones.append(_congestion_zone(port, coords))
+        else:
+            unlocated += 1
+
+        # A port that stays congested bumps its open alert instead of adding another
+        if system_user:
+            alerts.append(build_alert(
+                message=(
+                    f"CRITICAL: {port.name} congestion at {port.congestion_score}%. "
+                    f"Wait time {port.avg_wait_time}h."
+                ),
+                type="Congestion Alert",
+                severity="critical",
+                port=port,
+                wait_hours=port.avg_wait_time,
+                user=system_user,
+                timestamp=now,
+            ))
+
+    with transaction.atomic():
+        Port.objects.bulk_update(ports, PORT_FIELDS, batch_size=1000)
+        zones_created, zones_updated = _upsert_zones(zones)
+        created, folded = raise_alerts(alerts)
+
+    refresh_stats()
+    counts = {
+        "ports": len(ports),
+        "congested": len(zones) + unlocated,
+        "zones_created": zones_created,
+        "zones_updated": zones_updated,
+        "zones_skipped": unlocated,
+        "alerts_created": len(created),
+        "alerts_folded": folded,
+        "seconds": round(time.monotonic() - started, 3),
+    }
+    print(
+        f"🌐 UNCTAD: {counts['ports']} ports updated, {counts['congested']} congested, "
+        f"{zones_created} zones created, {zones_updated} updated, {unlocated} without coordinates, "
+        f"{counts['alerts_created']} alerts raised, {folded} repeats folded in {counts['seconds']}s"
+    )
+    return counts
@@ -1,14 +1,15 @@
 from django.urls import path
 from .views import (
-    home, RegisterView, LoginView,
+    home, metrics_view, RegisterView, LoginView,
     VesselListView, PortListView, VoyageListView, EventListView, VoyageTrackView,
-    RiskZoneListView, DashboardStatsView, get_analyst_analytics,
-    get_all_users, get_audit_logs, delete_user, toggle_user_status, update_user_role,
-    get_alerts, update_alert_status, create_alert
+    RiskZoneListView, DashboardStatsView, get_analyst_analytics, get_trade_flows,
+    get_all_users, get_audit_logs, list_profiles, download_profile, delete_user, toggle_user_status, update_user_role,
+    get_alerts, search_alerts, update_alert_status, bulk_update_alert_status, create_alert, alert_stream
 )
 
 urlpatterns = [
     path("", home),
+    path("metrics", metrics_view),
     path("register/", RegisterView.as_view()),
     path("login/", LoginView.as_view()),
     path("vessels/", VesselListView.as_view()),
@@ -19,6 +20,7 @@ urlpatterns = [
     path("dashboard/", DashboardStatsView.as_view()),
     path("risks/", RiskZoneListView.as_view()),
     path("analytics/", get_analyst_analytics),
+    path("analytics/flows/", get_trade_flows),
     
     # Admin Panel
     path("users/", get_all_users), 
@@ -26,9 +28,14 @@ urlpatterns = [
     path("users/<int:user_id>/delete/", delete_user),
     path("users/<int:user_id>/status/", toggle_user_status),
     path("users/<int:user_id>/role/", update_user_role),
+    path("profiles/", list_profiles),
+    path("profiles/<str:name>/", download_profile),
 
     # Alerts System
     path("alerts/", get_alerts),
+    path("alerts/search/", search_alerts),
+    path("alerts/status/", bulk_update_alert_status),
+    path("alerts/stream/", alert_stream),
     path("alerts/create/", create_alert), # ✅ NEW
     path("alerts/<int:alert_id>/status/", update_alert_status),
 ]
\ No newline at end of file
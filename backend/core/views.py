@@ -1,18 +1,23 @@
+import hmac
+import json
+import math
 import re
+import threading
 from datetime import timedelta
 from django.utils import timezone
-from django.db.models import Count, Avg
-from django.db.models.functions import TruncDate
+from django.db.models import Avg
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import update_last_login
-from django.http import JsonResponse
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.conf import settings
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.permissions import AllowAny, BasePermission, IsAdminUser
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.core.paginator import Paginator
 
 from .models import Vessel, Port, Voyage, Event, VoyageTrack, RiskZone, Alert, Notification
 from .serializers import (
@@ -20,7 +25,9 @@ from .serializers import (
     VoyageSerializer, EventSerializer, VoyageTrackSerializer, RiskZoneSerializer,
     AlertSerializer
 )
-from .unctad_loader import fetch_unctad_ports
+from .partitions import track_window
+from .rollups import select_resolution, rollup_track, stride
+from . import alerts, analytics, dashboard, metrics, pagination, profiling, regions, search, track_archive
 from django.db.models import Q
 
 import time
@@ -32,7 +39,24 @@ from django.core.cache import cache
 def home(request):
     return JsonResponse({"message": "Backend API is running"})
 
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint (text exposition format).
+    Needs METRICS_TOKEN as a bearer token or a staff session; it is only
+    open without a token in DEBUG.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        allowed = hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}")
+    else:
+        allowed = settings.DEBUG
+    if not (allowed or request.user.is_staff):
+        return HttpResponse(status=401)
+    return HttpResponse(metrics.render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
 class RegisterView(APIView):
+    permission_classes = [AllowAny]
+
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
@@ -41,6 +65,8 @@ class RegisterView(APIView):
         return Response(serializer.errors, status=400)
 
 class LoginView(APIView):
+    permission_classes = [AllowAny]
+
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
@@ -77,13 +103,28 @@ class PortListView(APIView):
 
 class VoyageListView(APIView):
     def get(self, request):
-        voyages = Voyage.objects.order_by("-departure_time")[:10]
-        return Response(VoyageSerializer(voyages, many=True).data)
+        # Newest departures first, paged by cursor (X-Next-Cursor / X-Prev-Cursor)
+        try:
+            voyages, next_cursor, prev_cursor = pagination.keyset_page(
+                Voyage.objects.select_related("vessel", "port_from", "port_to"), "departure_time",
+                pagination.page_size_param(request, 10), request.GET.get("cursor"),
+            )
+        except pagination.InvalidCursor as exc:
+            return Response({"error": str(exc)}, status=400)
+        response = Response(VoyageSerializer(voyages, many=True).data)
+        return pagination.cursor_headers(response, next_cursor, prev_cursor, pagination.estimated_count(Voyage))
 
 class EventListView(APIView):
     def get(self, request):
-        events = Event.objects.order_by("-timestamp")[:20]
-        return Response(EventSerializer(events, many=True).data)
+        try:
+            events, next_cursor, prev_cursor = pagination.keyset_page(
+                Event.objects.select_related("vessel"), "timestamp",
+                pagination.page_size_param(request, 20), request.GET.get("cursor"),
+            )
+        except pagination.InvalidCursor as exc:
+            return Response({"error": str(exc)}, status=400)
+        response = Response(EventSerializer(events, many=True).data)
+        return pagination.cursor_headers(response, next_cursor, prev_cursor, pagination.estimated_count(Event))
 
 class RiskZoneListView(APIView):
     def get(self, request):
@@ -96,21 +137,49 @@ class RiskZoneListView(APIView):
 
 class VoyageTrackView(APIView):
     """
-    Returns AIS track points for a voyage (via vessel)
+    Returns AIS track points for a voyage (via vessel).
+    Long voyages are served from track rollups so the response never
+    exceeds `max_points` (default TRACK_MAX_POINTS).
     """
     def get(self, request, voyage_id):
         try:
-            voyage = Voyage.objects.get(id=voyage_id)
+            voyage = Voyage.objects.select_related("vessel").get(id=voyage_id)
         except Voyage.DoesNotExist:
             return Response({"message": "Voyage not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        tracks = VoyageTrack.objects.filter(vessel=voyage.vessel).order_by("timestamp")
+        if voyage.vessel is None:
+            return Response({"message": "No voyage track data found"}, status=status.HTTP_404_NOT_FOUND)
 
-        if not tracks.exists():
+        try:
+            max_points = max(2, int(request.GET.get("max_points", settings.TRACK_MAX_POINTS)))
+        except ValueError:
+            return Response({"message": "max_points must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        start, end = track_window(voyage)
+
+        # Points before the archive watermark are read from cold segments
+        watermark = track_archive.archived_until()
+        hot_start = max(start, watermark) if start and watermark else (start or watermark)
+        archived = track_archive.count_points(voyage.vessel_id, start, end) if watermark else 0
+        resolution = select_resolution(voyage.vessel_id, hot_start, end, max_points, archived_points=archived)
+
+        if resolution is None:
+            tracks = VoyageTrack.objects.filter(vessel=voyage.vessel, timestamp__lte=end)
+            if hot_start:
+                tracks = tracks.filter(timestamp__gte=hot_start)
+            data = track_archive.read_points(voyage.vessel, start, end) if archived else []
+            data += VoyageTrackSerializer(tracks.select_related("vessel").order_by("timestamp"), many=True).data
+            # No rollup covers the window: thin the raw points instead
+            data = stride(data, max_points)
+        else:
+            data = rollup_track(voyage.vessel, start, end, resolution, max_points)
+
+        if not data:
             return Response({"message": "No voyage track data found"}, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = VoyageTrackSerializer(tracks, many=True)
-        return Response(serializer.data)
+        response = Response(data)
+        response["X-Track-Resolution"] = str(resolution or "raw")
+        return response
 
 
 
@@ -121,44 +190,25 @@ class VoyageTrackView(APIView):
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from .models import Vessel, RiskZone, Port, Voyage 
-import time
-from django.core.cache import cache
 
 class DashboardStatsView(APIView):
     def get(self, request):
-        # 1. Basic Counts
-        total_vessels = Vessel.objects.count()
-        active_risks = RiskZone.objects.count()
-        active_voyages_count = Voyage.objects.filter(status='In Transit').count()
-        high_congestion = Port.objects.filter(congestion_score__gt=90).count()
-
-        # 2. Throughput Simulation
-        last_second = int(time.time()) - 1
-        real_http_requests = cache.get(f"throughput_{last_second}", 0)
-        background_processing = int(total_vessels / 5) if total_vessels > 0 else 0
-        total_throughput = real_http_requests + background_processing
-
-        # 3. ✅ NEW: Get Recent Voyages List for the Table
-        # We grab the last 5 'In Transit' voyages
-        recent_qs = Voyage.objects.filter(status='In Transit').select_related('vessel', 'port_from', 'port_to').order_by('-departure_time')[:5]
-        
-        recent_data = []
-        for v in recent_qs:
-            recent_data.append({
-                "id": v.id,
-                "vessel_name": v.vessel.name if v.vessel else "Unknown",
-                "origin": v.port_from.name if v.port_from else "Sea",
-                "destination": v.port_to.name if v.port_to else "Sea",
-                "status": v.status
-            })
+        # Counters and the recent voyages table come from the materialized
+        # stats row (core/dashboard.py); throughput is live from the metrics store.
+        try:
+            region_id = regions.parse_region(request.GET.get('region'))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+        stats = dashboard.get_stats()
+        counters = dashboard.region_counters(stats, region_id)
 
         return Response({
-            "total_vessels": total_vessels,
-            "active_voyages": active_voyages_count,
-            "active_risks": active_risks,
-            "high_congestion_ports": high_congestion,
-            "throughput": total_throughput,
-            "recent_voyages": recent_data, # 👈 Sending the list to frontend!
+            "total_vessels": counters["total_vessels"],
+            "active_voyages": counters["active_voyages"],
+            "active_risks": counters["active_risks"],
+            "high_congestion_ports": counters["high_congestion_ports"],
+            "throughput": round(metrics.requests_per_second(window=10), 1),
+            "recent_voyages": counters["recent_voyages"],
             "system_status": "Operational"
         })
 # -------------------------
@@ -170,37 +220,48 @@ def get_analyst_analytics(request):
     days_param = request.GET.get('days', '7')
     vessel_type_param = request.GET.get('type', 'All Vessel Types')
     region_param = request.GET.get('region', 'All Regions')
+    try:
+        region_id = regions.parse_region(region_param)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
 
     days_match = re.search(r'\d+', days_param)
     days = int(days_match.group()) if days_match else 7
     
     start_date = timezone.now() - timedelta(days=days)
+    vessel_type = vessel_type_param if vessel_type_param != 'All Vessel Types' else None
 
-    vessels = Vessel.objects.all()
-    voyages = Voyage.objects.filter(arrival_time__gte=start_date)
-
-    if vessel_type_param != 'All Vessel Types':
-        vessels = vessels.filter(type=vessel_type_param)
-        voyages = voyages.filter(vessel__type=vessel_type_param)
+    # Served from the analytics rollups (core/analytics.py)
+    window = analytics.voyage_window(start_date.date(), vessel_type, region_id)
+    fleet = [
+        row for row in analytics.fleet_composition()
+        if (vessel_type is None or row.vessel_type == vessel_type)
+        and (region_id is None or row.region_id == region_id)
+    ]
 
     # Calculate KPIs
-    total_ships = vessels.count()
-    active_voyages = voyages.filter(status='In Transit').count()
-    
-    avg_wait = Port.objects.aggregate(Avg('avg_wait_time'))['avg_wait_time__avg']
+    total_ships = sum(row.vessel_count for row in fleet)
+    active_voyages = sum(day['in_transit'] for day in window)
+
+    wait_sum = sum(day['wait_sum'] or 0 for day in window)
+    wait_count = sum(day['wait_count'] or 0 for day in window)
+    if wait_count:
+        avg_wait = wait_sum / wait_count
+    else:
+        avg_wait = Port.objects.aggregate(Avg('avg_wait_time'))['avg_wait_time__avg']
     avg_wait_time = round(avg_wait, 1) if avg_wait else 0
-    
+
     ships_at_risk = int(total_ships * 0.05)
 
-    cargo_counts = vessels.values('cargo_type').annotate(count=Count('id'))
+    cargo_totals = {}
+    for row in fleet:
+        cargo_totals[row.cargo_type] = cargo_totals.get(row.cargo_type, 0) + row.vessel_count
+    cargo_counts = [{'cargo_type': cargo, 'count': count} for cargo, count in cargo_totals.items()]
 
-    daily_traffic = voyages \
-        .annotate(date=TruncDate('arrival_time')) \
-        .values('date') \
-        .annotate(count=Count('id')) \
-        .order_by('date')
+    daily_traffic = [{'date': day['date'], 'count': day['arrivals']} for day in window if day['arrivals']]
 
-    congested_ports = Port.objects.order_by('-congestion_score')[:5].values(
+    ports = Port.objects.all() if region_id is None else Port.objects.filter(region_id=region_id)
+    congested_ports = ports.order_by('-congestion_score')[:5].values(
         'name', 'country', 'congestion_score', 'avg_wait_time'
     )
 
@@ -211,12 +272,28 @@ def get_analyst_analytics(request):
             "avg_wait_time": avg_wait_time,
             "ships_at_risk": ships_at_risk
         },
-        "cargo_distribution": list(cargo_counts),
+        "cargo_distribution": cargo_counts,
         "congested_ports": list(congested_ports),
-        "daily_traffic": list(daily_traffic)
+        "daily_traffic": daily_traffic
     }
     return Response(data)
 
+@api_view(['GET'])
+def get_trade_flows(request):
+    days_match = re.search(r'\d+', request.GET.get('days', '30'))
+    days = int(days_match.group()) if days_match else 30
+    vessel_type_param = request.GET.get('type', 'All Vessel Types')
+    vessel_type = vessel_type_param if vessel_type_param != 'All Vessel Types' else None
+    try:
+        region_id = regions.parse_region(request.GET.get('region'))
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
+
+    start_date = (timezone.now() - timedelta(days=days)).date()
+    # Origin-destination matrix from the flow rollup (core/analytics.py)
+    matrix = analytics.flow_matrix(start_date, vessel_type, region_id)
+    return Response({"days": days, **matrix})
+
 # -------------------------
 # ADMIN: USER MANAGEMENT
 # -------------------------
@@ -305,6 +382,23 @@ def get_audit_logs(request):
 
     return Response(logs[:50])
 
+# -------------------------
+# ADMIN: PROFILES
+# -------------------------
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def list_profiles(request):
+    return Response(profiling.list_profiles())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def download_profile(request, name):
+    path = profiling.profile_path(name)
+    if path is None:
+        return Response({"error": "Profile not found"}, status=404)
+    return FileResponse(open(path, "rb"), as_attachment=True, filename=name, content_type="text/plain")
+
 # -------------------------
 # ALERT SYSTEM (Paginated & Linked to Notifications)
 # -------------------------
@@ -315,105 +409,240 @@ def get_alerts(request):
     # 1. Base Query
     query = request.GET.get('search', '')
     severity_filter = request.GET.get('severity', 'all')
-    page_size = int(request.GET.get('page_size', 10)) # ✅ Support dynamic size
+    status_filter = request.GET.get('status', 'all')
+    page_size = pagination.page_size_param(request, 10) # ✅ Support dynamic size
+    try:
+        region_id = regions.parse_region(request.GET.get('region'))
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
+    if status_filter != 'all' and status_filter not in alerts.STATUSES:
+        return Response({"error": f"Unknown status '{status_filter}'"}, status=400)
     
-    notifications = Notification.objects.all().order_by('-timestamp')
+    notifications = Notification.objects.select_related('vessel')
+    if region_id is not None:
+        notifications = notifications.filter(region_id=region_id)
 
-    # 2. Search & Filter
+    # 2. Search & Filter (full-text, prefix per term; core/search.py)
     if query:
-        notifications = notifications.filter(message__icontains=query)
-    
-    if severity_filter == 'critical':
-        notifications = notifications.filter(message__icontains='CRITICAL')
-    elif severity_filter == 'warning':
-        notifications = notifications.exclude(message__icontains='CRITICAL')
-
-    # 3. Insights (Last 100 records)
-    recent_batch = notifications[:100]
-    total_wait = 0
-    wait_count = 0
-    port_congestion = {}
+        notifications = search.filter_alerts(notifications, query)
     
-    for n in recent_batch:
-        wait_match = re.search(r'Wait time (\d+\.?\d*)h', n.message)
-        if wait_match:
-            total_wait += float(wait_match.group(1))
-            wait_count += 1
-            
-        port_match = re.search(r'Port of (.*?) congestion', n.message)
-        if port_match:
-            port = port_match.group(1)
-            port_congestion[port] = port_congestion.get(port, 0) + 1
+    # Structured columns set on write (core/alerts.py)
+    if severity_filter in alerts.SEVERITY_FILTERS:
+        notifications = notifications.filter(alerts.SEVERITY_FILTERS[severity_filter])
+    if status_filter != 'all':
+        # new / acknowledged queues read their partial indexes
+        notifications = notifications.filter(status=status_filter)
 
-    avg_wait = round(total_wait / wait_count, 1) if wait_count > 0 else 0
-    worst_port = max(port_congestion, key=port_congestion.get) if port_congestion else "None"
-    
-    # 4. Pagination
-    paginator = Paginator(notifications, page_size)
-    page_number = request.GET.get('page', 1)
-    page_obj = paginator.get_page(page_number)
+    # 3. Stats & insights (rollup or one aggregate, cached per filter)
+    stats = alerts.alert_stats(notifications, query, severity_filter, region_id, status_filter)
+
+    # 4. Pagination: keyset on (timestamp, id); the total comes from the stats
+    try:
+        page_obj, next_cursor, prev_cursor = pagination.keyset_page(
+            notifications, 'timestamp', page_size, request.GET.get('cursor')
+        )
+    except pagination.InvalidCursor as exc:
+        return Response({"error": str(exc)}, status=400)
 
     # 5. Format Data
     alert_data = []
     for n in page_obj:
-        msg_upper = n.message.upper()
-        severity = "warning"
-        if "CRITICAL" in msg_upper or "SOS" in msg_upper:
-            severity = "critical"
-        elif "INFO" in msg_upper:
-            severity = "info"
-
         alert_data.append({
             "id": n.id,
             "vessel_name": n.vessel.name if n.vessel else "System",
             "message": n.message,
             "timestamp": n.timestamp,
-            "severity": severity,
-            "status": "New"
+            "severity": n.severity or "warning",
+            "category": n.category,
+            "occurrences": n.occurrences,
+            "last_seen": n.last_seen or n.timestamp,
+            "status": n.status
         })
 
     return Response({
         "results": alert_data,
         "pagination": {
-            "count": paginator.count,
-            "total_pages": paginator.num_pages,
-            "current_page": int(page_number),
+            "count": stats["total"],
+            "total_pages": max(1, math.ceil(stats["total"] / page_size)),
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
             "page_size": page_size
         },
-        "stats": {
-            "critical": notifications.filter(message__icontains='CRITICAL').count(),
-            "warning": notifications.exclude(message__icontains='CRITICAL').count(),
-            "avg_wait": avg_wait,
-            "worst_port": worst_port,
-            "total": notifications.count()
-        }
+        "stats": stats
     })
 
-# ... keep update_alert_status and create_alert ...
-@api_view(['POST'])
-def update_alert_status(request, alert_id):
-    return Response({"message": "Status update simulated"})
+@api_view(['GET'])
+def search_alerts(request):
+    """Typeahead for the alerts search box: best matches first."""
+    query = request.GET.get('q', '')
+    try:
+        limit = max(1, min(20, int(request.GET.get('limit', 8))))
+    except ValueError:
+        limit = 8
+    try:
+        region_id = regions.parse_region(request.GET.get('region'))
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
+
+    notifications = Notification.objects.select_related('vessel')
+    if region_id is not None:
+        notifications = notifications.filter(region_id=region_id)
+
+    return Response([
+        {
+            "id": n.id,
+            "vessel_name": n.vessel.name if n.vessel else "System",
+            "message": n.message,
+            "timestamp": n.timestamp,
+            "severity": n.severity or "warning",
+            "rank": round(n.rank, 4),
+        }
+        for n in search.rank_alerts(notifications, query, limit)
+    ])
+
+def _has_role(user, *roles):
+    return bool(user and user.is_authenticated and (getattr(user, "role", "") or "").lower() in roles)
+
+
+class IsAlertOperator(BasePermission):
+    """Acknowledging and resolving alerts is an operator action."""
+    message = "Only operators can change alert status."
+
+    def has_permission(self, request, view):
+        return _has_role(request.user, "operator")
+
+
+class IsAlertAdmin(BasePermission):
+    """Broadcasting alerts is an admin action."""
+    message = "Only admins can create alerts."
+
+    def has_permission(self, request, view):
+        return _has_role(request.user, "admin") or bool(request.user and request.user.is_superuser)
+
+
+def _status_response(ids, new_status):
+    try:
+        changed = alerts.set_status(ids, new_status)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
+    return Response({"updated": changed, "status": new_status})
 
-@api_view(['POST'])
-def create_alert(request):
-    return Response({"message": "Alert created"}, status=201)
 
-# ... (keep update_alert_status and create_alert functions below) ...
 @api_view(['POST'])
+@permission_classes([IsAlertOperator])
 def update_alert_status(request, alert_id):
-    return Response({"message": "Status update simulated"})
+    if not Notification.objects.filter(pk=alert_id).exists():
+        return Response({"error": "Alert not found"}, status=404)
+    return _status_response([alert_id], request.data.get('status'))
 
-@api_view(['POST'])
-def create_alert(request):
-    return Response({"message": "Alert created"}, status=201)
 
 @api_view(['POST'])
-def update_alert_status(request, alert_id):
-    # Since we are using read-only Notifications, we return success 
-    # so the frontend doesn't break.
-    return Response({"message": "Status update simulated"})
+@permission_classes([IsAlertOperator])
+def bulk_update_alert_status(request):
+    """Acknowledge/resolve many alerts in one UPDATE: {"ids": [...], "status": "..."}."""
+    ids = request.data.get('ids')
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+        return Response({"error": "ids must be a non-empty list of alert ids"}, status=400)
+    if len(ids) > alerts.MAX_STATUS_BATCH:
+        return Response({"error": f"At most {alerts.MAX_STATUS_BATCH} ids per request"}, status=400)
+    return _status_response(ids, request.data.get('status'))
+
 
 @api_view(['POST'])
+@permission_classes([IsAlertAdmin])
 def create_alert(request):
-    # Dummy endpoint to prevent URL errors
-    return Response({"message": "Alert created"}, status=201)
\ No newline at end of file
+    message = (request.data.get('message') or '').strip()
+    if not message:
+        return Response({"error": "message is required"}, status=400)
+    severity = request.data.get('severity')
+    if severity is not None and severity not in alerts.SEVERITIES:
+        return Response({"error": f"Unknown severity '{severity}'"}, status=400)
+
+    port = None
+    if request.data.get('port_id') is not None:
+        port = Port.objects.filter(pk=request.data['port_id']).first()
+        if port is None:
+            return Response({"error": "Port not found"}, status=400)
+    vessel_id = request.data.get('vessel_id')
+    if vessel_id is not None and not Vessel.objects.filter(pk=vessel_id).exists():
+        return Response({"error": "Vessel not found"}, status=400)
+
+    notification = alerts.raise_alert(
+        message, request.data.get('type') or "Alert", severity=severity, port=port, vessel_id=vessel_id,
+    )
+    if notification is None:
+        # Folded into an open alert on the same subject
+        return Response({"suppressed": True}, status=200)
+    return Response({"id": notification.id, "status": notification.status}, status=201)
+
+
+class EventStreamRenderer(BaseRenderer):
+    media_type = "text/event-stream"
+    format = "txt"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only error responses are rendered; the stream itself is raw
+        return json.dumps(data).encode()
+
+
+_stream_slots = threading.BoundedSemaphore(max(1, settings.ALERT_STREAM_MAX_PER_WORKER))
+
+
+class _SlotStream:
+    """Streaming content that frees its stream slot when the response is closed."""
+
+    def __init__(self, events):
+        self._events = events
+        self._held = True
+
+    def __iter__(self):
+        return self._events
+
+    def close(self):
+        self._events.close()
+        if self._held:
+            self._held = False
+            _stream_slots.release()
+
+
+@api_view(['GET'])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def alert_stream(request):
+    """
+    Server-sent events for alert status changes. Each connection lasts
+    ALERT_STREAM_SECONDS; clients resume from the Last-Event-ID header
+    (or ?since=) and otherwise start from now. At most
+    ALERT_STREAM_MAX_PER_WORKER streams are open per worker; beyond that
+    the answer is 503 with Retry-After.
+    """
+    since = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    try:
+        position = pagination.decode_cursor(since)[:2] if since else (timezone.now(), 0)
+    except pagination.InvalidCursor as exc:
+        return Response({"error": str(exc)}, status=400)
+
+    def events(position):
+        yield f"retry: 1000\nid: {pagination.encode_cursor(*position)}\nevent: ready\ndata: {{}}\n\n"
+        deadline = time.monotonic() + settings.ALERT_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            batches, position = alerts.status_changes(position)
+            for batch in batches:
+                data = json.dumps({**batch, "changed_at": batch["changed_at"].isoformat()})
+                yield f"id: {pagination.encode_cursor(*position)}\nevent: status\ndata: {data}\n\n"
+            if not batches:
+                yield ": keepalive\n\n"
+            time.sleep(settings.ALERT_STREAM_POLL_SECONDS)
+
+    # Every open stream pins a worker thread; past the per-worker cap the
+    # client is told to come back when a window has likely ended
+    if not _stream_slots.acquire(blocking=False):
+        busy = HttpResponse(
+            f"retry: {settings.ALERT_STREAM_SECONDS * 1000}\n\n", status=503, content_type="text/event-stream"
+        )
+        busy["Retry-After"] = str(settings.ALERT_STREAM_SECONDS)
+        return busy
+
+    response = StreamingHttpResponse(_SlotStream(events(position)), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
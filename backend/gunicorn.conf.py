@@ -0,0 +1,53 @@
+# Gunicorn serving profile for Render (see start.sh).
+#
+# The API is mostly I/O bound (Postgres round trips), so each worker runs a
+# thread pool. Sizing comes from, in order of precedence:
+#   1. WEB_CONCURRENCY / GUNICORN_THREADS environment variables
+#   2. serving_profile.json written by `manage.py loadtest --write-profile`
+#   3. 2 x CPU + 1 workers with 4 threads each
+
+import json
+import multiprocessing
+import os
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+PROFILE_PATH = os.environ.get("SERVING_PROFILE", str(BASE_DIR / "serving_profile.json"))
+
+
+def _load_profile():
+    try:
+        with open(PROFILE_PATH) as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+_profile = _load_profile()
+_cpus = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY") or _profile.get("workers") or 2 * _cpus + 1)
+threads = int(os.environ.get("GUNICORN_THREADS") or _profile.get("threads") or 4)
+
+# Long enough for the heavier analytics queries, short enough to shed stuck workers
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+# Browsers poll every few seconds; keep their connections open between polls
+keepalive = 15
+
+# Recycle workers periodically so slow leaks cannot accumulate
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    source = "environment" if os.environ.get("WEB_CONCURRENCY") else (
+        PROFILE_PATH if _profile else "CPU default"
+    )
+    server.log.info(f"Serving with {workers} {worker_class} workers x {threads} threads ({source})")
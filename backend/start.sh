@@ -1,6 +1,7 @@
 #!/bin/bash
 # Start script for Render deployment
 # This ensures the correct Python path and starts Gunicorn
+# Worker/thread sizing lives in gunicorn.conf.py
 
 cd "$(dirname "$0")"
-exec gunicorn backend.wsgi:application --bind 0.0.0.0:$PORT
+exec gunicorn backend.wsgi:application -c gunicorn.conf.py
@@ -26,6 +26,59 @@ const parseMessage = (msg) => {
     };
 };
 
+const authHeaders = () => {
+    const token = localStorage.getItem("access_token");
+    return {
+        "ngrok-skip-browser-warning": "true",
+        "Content-Type": "application/json",
+        ...(token ? { Authorization: `Bearer ${token}` } : {})
+    };
+};
+
+// Reads the alert status stream (server-sent events over fetch so the auth
+// header can be sent). The server closes each connection after a short
+// while; we reconnect from the last event id until aborted.
+const followStatusStream = async (signal, onChange) => {
+    let lastId = "";
+    while (!signal.aborted) {
+        try {
+            const res = await fetch(`${API_BASE}/alerts/stream/`, {
+                headers: { ...authHeaders(), Accept: "text/event-stream", ...(lastId ? { "Last-Event-ID": lastId } : {}) },
+                signal
+            });
+            if (res.status === 503) {
+                // Server is at its stream cap; come back when it says a slot frees up
+                const wait = (parseInt(res.headers.get("Retry-After"), 10) || 25) * 1000;
+                await new Promise(resolve => setTimeout(resolve, wait * (1 + Math.random() / 2)));
+                continue;
+            }
+            if (!res.ok) throw new Error(`HTTP Error: ${res.status}`);
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = "";
+            for (;;) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const events = buffer.split("\n\n");
+                buffer = events.pop();
+                for (const raw of events) {
+                    const fields = {};
+                    raw.split("\n").forEach(line => {
+                        const i = line.indexOf(": ");
+                        if (i > 0) fields[line.slice(0, i)] = line.slice(i + 2);
+                    });
+                    if (fields.id) lastId = fields.id;
+                    if (fields.event === "status") onChange(JSON.parse(fields.data));
+                }
+            }
+        } catch (err) {
+            if (signal.aborted) return;
+            await new Promise(resolve => setTimeout(resolve, 5000));
+        }
+    }
+};
+
 const formatTime = (isoString) => new Date(isoString).toLocaleString([], { month: 'short', day: 'numeric', hour: '2-digit', minute: '2-digit' });
 
 // ✅ UPDATED: Checks if date is strictly TODAY
@@ -40,13 +93,14 @@ const isRecent = (dateString) => {
 const AlertsPage = () => {
   const navigate = useNavigate();
   
-  // ✅ NEW: ROLE STATE (Simulated Login)
+  // ROLE STATE: starts from the signed-in role (the server enforces it;
+  // the switcher below only changes what this page offers)
   // Options: 'OPERATOR', 'ADMIN', 'ANALYST'
-  const [userRole, setUserRole] = useState("OPERATOR"); 
+  const [userRole, setUserRole] = useState(() => (localStorage.getItem("userRole") || "OPERATOR").toUpperCase()); 
 
   // Data State
   const [alerts, setAlerts] = useState([]);
-  const [pagination, setPagination] = useState({ count: 0, total_pages: 1, current_page: 1 });
+  const [pagination, setPagination] = useState({ count: 0, total_pages: 1, current_page: 1, next_cursor: null, prev_cursor: null });
   const [stats, setStats] = useState({ critical: 0, warning: 0, total: 0, avg_wait: 0, worst_port: '-' });
   const [loading, setLoading] = useState(false);
   const [toast, setToast] = useState(null);
@@ -62,23 +116,55 @@ const AlertsPage = () => {
   const [selectedAlert, setSelectedAlert] = useState(null); 
 
   // Persistence
-  const [ackedAlerts, setAckedAlerts] = useState(() => JSON.parse(localStorage.getItem("ackedAlerts") || "[]"));
   const [notes, setNotes] = useState(() => JSON.parse(localStorage.getItem("alertNotes") || "{}"));
 
   // --- ACTIONS ---
   const showToast = (msg) => { setToast(msg); setTimeout(() => setToast(null), 3000); };
 
+  // Applies a status change to the rows on screen (ours or streamed)
+  const applyStatus = useCallback((ids, status) => {
+    setAlerts(prev => prev.map(a => ids.includes(a.id) ? { ...a, status } : a));
+    setSelectedAlert(prev => prev && ids.includes(prev.id) ? { ...prev, status } : prev);
+  }, []);
+
+  // Many alerts, one request (and one UPDATE on the server)
+  const updateStatus = useCallback(async (ids, status) => {
+    try {
+      const res = await fetch(`${API_BASE}/alerts/status/`, {
+          method: "POST",
+          headers: authHeaders(),
+          body: JSON.stringify({ ids, status })
+      });
+      if (res.status === 403) {
+          showToast("⛔ Permission Denied: only operators can change alert status.");
+          return false;
+      }
+      if (!res.ok) throw new Error(`HTTP Error: ${res.status}`);
+      applyStatus(ids, status);
+      return true;
+    } catch (err) {
+      console.error("Status update failed", err);
+      showToast("❌ Status update failed");
+      return false;
+    }
+  }, [applyStatus]);
+
   // 🔒 SECURITY CHECK: Only Operator can acknowledge
-  const handleAcknowledge = useCallback((id) => {
+  const handleAcknowledge = useCallback(async (id) => {
     if (userRole !== 'OPERATOR') {
         showToast("⛔ Permission Denied: Admins/Analysts cannot acknowledge.");
         return; 
     }
-    const newAcked = [...ackedAlerts, id];
-    setAckedAlerts(newAcked);
-    localStorage.setItem("ackedAlerts", JSON.stringify(newAcked));
-    showToast("✅ Alert Acknowledged");
-  }, [ackedAlerts, userRole]);
+    if (await updateStatus([id], "acknowledged")) showToast("✅ Alert Acknowledged");
+  }, [userRole, updateStatus]);
+
+  const handleResolve = useCallback(async (id) => {
+    if (userRole !== 'OPERATOR') {
+        showToast("⛔ Permission Denied: Admins/Analysts cannot resolve.");
+        return;
+    }
+    if (await updateStatus([id], "resolved")) showToast("✔️ Alert Resolved");
+  }, [userRole, updateStatus]);
 
   // 🔒 SECURITY CHECK: Analyst cannot edit notes
   const handleAddNote = (id, noteText) => {
@@ -89,11 +175,12 @@ const AlertsPage = () => {
   };
 
   // --- LOAD DATA ---
-  const loadAlerts = useCallback(async (page = 1) => {
+  // Pages are addressed by cursor; the page number is only kept for display
+  const loadAlerts = useCallback(async (cursor = "", page = 1) => {
     setLoading(true);
     try {
-      const res = await fetch(`${API_BASE}/alerts/?page=${page}&page_size=${pageSize}&severity=${filter}&search=${searchQuery}`, {
-          headers: { "ngrok-skip-browser-warning": "true", "Content-Type": "application/json" }
+      const res = await fetch(`${API_BASE}/alerts/?page_size=${pageSize}&severity=${filter}&search=${searchQuery}&cursor=${cursor || ""}`, {
+          headers: authHeaders()
       });
       if (!res.ok) throw new Error(`HTTP Error: ${res.status}`);
       const data = await res.json();
@@ -108,7 +195,7 @@ const AlertsPage = () => {
       }
 
       setAlerts(sortedResults);
-      setPagination(data.pagination);
+      setPagination({ ...data.pagination, current_page: page });
       setStats(data.stats);
       setSelectedIds([]); 
     } catch (err) { console.error("Load failed", err); }
@@ -116,11 +203,17 @@ const AlertsPage = () => {
   }, [filter, sortMode, searchQuery, pageSize]);
 
   useEffect(() => { 
-      const timer = setTimeout(() => loadAlerts(1), 500); 
+      const timer = setTimeout(() => loadAlerts(), 500); 
       return () => clearTimeout(timer);
   }, [filter, sortMode, searchQuery, pageSize, loadAlerts]);
 
-  useEffect(() => { if (pagination.current_page > 1) loadAlerts(pagination.current_page); }, [pagination.current_page, loadAlerts]);
+  // Live status changes from other operators
+  useEffect(() => {
+      const controller = new AbortController();
+      followStatusStream(controller.signal, (change) => applyStatus(change.ids, change.status));
+      return () => controller.abort();
+  }, [applyStatus]);
+
 
   // --- BULK ACTIONS ---
   const toggleSelect = (id) => {
@@ -133,12 +226,15 @@ const AlertsPage = () => {
     else setSelectedIds(alerts.map(a => a.id));
   };
 
-  const handleBulkAction = (action) => {
+  const handleBulkAction = async (action) => {
+    if ((action === 'ack' || action === 'resolve') && userRole !== 'OPERATOR') {
+        showToast("⛔ Permission Denied: only operators can change alert status.");
+        return;
+    }
     if (action === 'ack') {
-        const newAcked = [...ackedAlerts, ...selectedIds];
-        setAckedAlerts(newAcked);
-        localStorage.setItem("ackedAlerts", JSON.stringify(newAcked));
-        showToast(`✅ ${selectedIds.length} Alerts Acknowledged`);
+        if (await updateStatus(selectedIds, "acknowledged")) showToast(`✅ ${selectedIds.length} Alerts Acknowledged`);
+    } else if (action === 'resolve') {
+        if (await updateStatus(selectedIds, "resolved")) showToast(`✔️ ${selectedIds.length} Alerts Resolved`);
     } else if (action === 'export') {
         showToast(`📥 Exporting ${selectedIds.length} items to CSV...`);
     } else {
@@ -228,6 +324,7 @@ const AlertsPage = () => {
                     <span className="count">{selectedIds.length} Selected</span>
                     <div className="bulk-btns">
                         <button onClick={() => handleBulkAction('ack')}>✅ Acknowledge</button>
+                        <button onClick={() => handleBulkAction('resolve')}>✔️ Resolve</button>
                         <button onClick={() => handleBulkAction('assign')}>👤 Assign</button>
                     </div>
                     <button className="clear-btn" onClick={() => setSelectedIds([])}>Clear</button>
@@ -257,7 +354,7 @@ const AlertsPage = () => {
             {loading ? <div className="loading-skeleton">Loading...</div> : (
                 <div className={`alerts-list ${viewMode}`}>
                     {alerts.map((alert) => {
-                        const isAcked = ackedAlerts.includes(alert.id);
+                        const isAcked = alert.status !== 'new';
                         const isSelected = selectedIds.includes(alert.id);
                         const isActive = selectedAlert?.id === alert.id;
                         const { port, congestion, highRiskCongestion } = parseMessage(alert.message);
@@ -303,8 +400,8 @@ const AlertsPage = () => {
                 </div>
                 <span className="showing-text">Showing {((pagination.current_page-1)*pageSize)+1}–{Math.min(pagination.current_page*pageSize, pagination.count)} of {pagination.count}</span>
                 <div className="page-controls">
-                    <button disabled={pagination.current_page === 1} onClick={() => setPagination({...pagination, current_page: pagination.current_page - 1})}>Prev</button>
-                    <button disabled={pagination.current_page === pagination.total_pages} onClick={() => setPagination({...pagination, current_page: pagination.current_page + 1})}>Next</button>
+                    <button disabled={!pagination.prev_cursor} onClick={() => loadAlerts(pagination.prev_cursor, pagination.current_page - 1)}>Prev</button>
+                    <button disabled={!pagination.next_cursor} onClick={() => loadAlerts(pagination.next_cursor, pagination.current_page + 1)}>Next</button>
                 </div>
             </div>
         </div>
@@ -353,9 +450,12 @@ const AlertsPage = () => {
                         <button className="action-btn map" onClick={() => navigate('/map')}>📍 Locate on Map</button>
                         
                         {/* ACKNOWLEDGE: Only for OPERATOR */}
-                        {userRole === 'OPERATOR' && !ackedAlerts.includes(selectedAlert.id) && (
+                        {userRole === 'OPERATOR' && selectedAlert.status === 'new' && (
                             <button className="action-btn ack" onClick={() => handleAcknowledge(selectedAlert.id)}>✅ Acknowledge</button>
                         )}
+                        {userRole === 'OPERATOR' && selectedAlert.status !== 'resolved' && (
+                            <button className="action-btn ack" onClick={() => handleResolve(selectedAlert.id)}>✔️ Resolve</button>
+                        )}
                         
                         {/* EXPORT: Only for ADMIN & ANALYST */}
                         {(userRole === 'ADMIN' || userRole === 'ANALYST') && (